@@ -1,15 +1,44 @@
 #!/usr/bin/env python3
 """
 Apply refinements to rule descriptions based on codebase verification.
+
+Refinements and catalog patches (catalog_diff.py) are applied the same way:
+as Rule ID-keyed column edits, in one streaming pass over the catalog. The
+result goes to a temporary file next to the output, which is then renamed
+over it, so an interrupted run leaves the old catalog intact. Rows that are
+not edited are copied through byte for byte. Edited rows are rewritten, and
+rows missing their SKU cell come back realigned.
+
+An edit carries the value it expects to replace. A cell that holds neither
+the old nor the new value is a conflict, and so is a column the patch adds
+that the catalog does not have. Nothing is written unless --force is given.
+The applied patch is kept as an audit record under <repo>/.catalog_patches,
+with the catalog's checksum before and after.
+
+Usage:
+    python tools/apply_rule_refinements.py
+    python tools/apply_rule_refinements.py --patch v2-to-v3.patch.jsonl --catalog documentation/TA_TM_PCS_product_health_rules_v2.tsv
+    python tools/apply_rule_refinements.py --patch edits.jsonl --catalog in.tsv --output out.tsv --dry-run
 """
 
-import pandas as pd
+import argparse
+import csv
+import hashlib
 import os
+import sys
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from catalog_diff import PATCH_FORMAT, CatalogReader, read_patch, write_patch
+from instrumentation import METRICS
+from profiling import profile_from_argv
 
 # Path to the TSV file
 INPUT_FILE = '/home/ec2-user/de_app_1/documentation/PCS_TM_TA_rules_with_cursor_descriptions.tsv'
 OUTPUT_FILE = '/home/ec2-user/de_app_1/documentation/PCS_TM_TA_rules_with_cursor_descriptions.tsv'
 
+DEFAULT_AUDIT_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '.catalog_patches'))
+
 # Refinements based on codebase review
 REFINEMENTS = {
     'profile_skills_quality': {
@@ -30,42 +59,206 @@ REFINEMENTS = {
     }
 }
 
-def apply_refinements():
+
+def refinement_edits(refinements=REFINEMENTS):
+    """REFINEMENTS as patch edits on the Cursor Generated Description of every row of each rule."""
+    return [
+        {"op": "change", "rule_id": rule_id,
+         "changes": {"cursor_description": [None, f"**Purpose:** {r['purpose']} **Impact:** {r['impact']}"]}}
+        for rule_id, r in refinements.items()
+    ]
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _stream_patch(catalog, tmp_path, by_key, by_rule, adds, counts, conflicts, added_columns=()):
+    """Copy catalog to tmp_path with the indexed edits applied; returns the CatalogReader.
+
+    added_columns are the columns the patch's target has and its base lacks.
+    The catalog must have them too, or their cells would be dropped.
+    """
+    # A missing row is a conflict for a change; a removed row may already be gone
+    pending = {key for key, edit in by_key.items() if edit["op"] == "change"}
+    with METRICS.stage('refine'), open(catalog, 'r', encoding='utf-8', newline='') as f:
+        reader = CatalogReader(f, catalog)
+        fields = reader.fields
+        columns = {field: i for i, field in enumerate(fields) if field}
+        missing_columns = [field for field in added_columns if field not in columns]
+        conflicts.extend(f"no {field} column (added by the patch)" for field in missing_columns)
+        terminator = '\r\n' if reader.header_raw.endswith('\r\n') else '\n'
+        seen, added = set(), {}
+        with open(tmp_path, 'w', encoding='utf-8', newline='') as out:
+            writer = csv.writer(out, delimiter='\t', lineterminator=terminator)
+
+            def write_added(after):
+                for edit in adds.pop(after, ()):
+                    if edit["key"] in seen:
+                        conflicts.append(f"{edit['key']}: added row already exists")
+                        continue
+                    dropped = [field for field, value in edit["row"].items()
+                               if value and field not in columns and field not in missing_columns]
+                    conflicts.extend(f"{edit['key']}: no {field} column" for field in dropped)
+                    writer.writerow([edit["row"].get(field, '') if field else '' for field in fields])
+                    counts["added"] += 1
+                    seen.add(edit["key"])
+                    added[edit["key"]] = edit["row"]
+                    write_added(edit["key"])
+
+            out.write(reader.preamble + reader.header_raw)
+            write_added(None)
+            for key, values, cols, raw in reader:
+                if key is None:
+                    out.write(raw)
+                    continue
+                counts["rows"] += 1
+                if key in added:
+                    # Already added further up: the patch was applied before.
+                    if any(values.get(field, '') != value for field, value in added[key].items() if field in columns):
+                        conflicts.append(f"{key}: added row already exists")
+                    counts["added"] -= 1
+                    continue
+                seen.add(key)
+                edit = by_key.get(key)
+                pending.discard(key)
+                if edit is not None and edit["op"] == "remove":
+                    counts["removed"] += 1
+                    write_added(key)
+                    continue
+                row_edits = ([edit] if edit else []) + by_rule.get(values.get("rule_id", ""), [])
+                cells = list(cols) + [''] * (len(fields) - len(cols))
+                edited = False
+                for row_edit in row_edits:
+                    for field, (old, new) in row_edit["changes"].items():
+                        if field not in columns:
+                            conflicts.append(f"{key}: no {field} column")
+                            continue
+                        current = values[field]
+                        if current == new:
+                            continue
+                        if old is not None and current != old:
+                            conflicts.append(f"{key}: {field} is {current[:60]!r}, expected {old[:60]!r}")
+                            continue
+                        cells[columns[field]] = new
+                        edited = True
+                if edited:
+                    writer.writerow(cells)
+                    counts["changed"] += 1
+                else:
+                    out.write(raw)
+                    counts["unchanged"] += 1
+                write_added(key)
+            # Rows added after a row that is not in this catalog go at the end
+            for after in list(adds):
+                write_added(after)
+            out.flush()
+            os.fsync(out.fileno())
+    conflicts.extend(f"{key}: not in {os.path.basename(catalog)}" for key in sorted(pending))
+    return reader
+
+
+def apply_patch(catalog, edits, output=None, header=None, audit_dir=DEFAULT_AUDIT_DIR, force=False, dry_run=False):
+    """Apply edits to a catalog TSV in one pass; returns a summary dict.
+
+    Edits are catalog_diff.py edits. A change may name a "rule_id" instead of
+    a "key" to edit every row of that rule, and an old value of None
+    replaces the cell whatever it holds. A column the patch header lists as
+    added, or an added row's cell, that the catalog has no column for is a
+    conflict too. Raises ValueError on conflicts unless force is set, in
+    which case conflicting edits are skipped. A patch that changes nothing
+    (one applied before) leaves the catalog untouched and writes no audit
+    record.
+    """
+    output = output or catalog
+    by_key, by_rule, adds = {}, defaultdict(list), defaultdict(list)
+    for edit in edits:
+        if edit["op"] == "add":
+            adds[edit.get("after")].append(edit)
+        elif edit.get("key") is not None:
+            by_key[edit["key"]] = edit
+        else:
+            by_rule[edit["rule_id"]].append(edit)
+    conflicts = []
+    counts = {"rows": 0, "changed": 0, "added": 0, "removed": 0, "unchanged": 0}
+
+    tmp_path = f"{output}.{os.getpid()}.tmp"
+    METRICS.bytes_read('refine', os.path.getsize(catalog))
+    try:
+        added_columns = (header or {}).get("columns", {}).get("added", ())
+        reader = _stream_patch(catalog, tmp_path, by_key, by_rule, adds, counts, conflicts, added_columns)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    counts["conflicts"] = conflicts
+    METRICS.count('refine', 'rows', counts["rows"])
+    METRICS.count('refine', 'refined', counts["changed"])
+
+    unchanged = not (counts["changed"] or counts["added"] or counts["removed"])
+    if dry_run or (conflicts and not force) or (unchanged and output == catalog):
+        # An already-applied patch leaves the catalog and the audit log alone.
+        os.remove(tmp_path)
+        if conflicts and not force:
+            raise ValueError(f"{len(conflicts)} conflicting edit(s), {output} not written:\n  " + '\n  '.join(conflicts))
+        return counts
+    os.replace(tmp_path, output)
+    METRICS.bytes_written('refine', os.path.getsize(output))
+
+    if audit_dir and not unchanged:
+        applied_at = datetime.now(timezone.utc)
+        record = dict(header or {"format": PATCH_FORMAT, "key": "rule_id"})
+        record["applied"] = {
+            "at": applied_at.isoformat(timespec='seconds'),
+            "catalog": os.path.abspath(catalog),
+            "output": os.path.abspath(output),
+            "before_sha256": reader.digest.hexdigest(),
+            "after_sha256": file_sha256(output),
+            **counts,
+        }
+        os.makedirs(audit_dir, exist_ok=True)
+        name = f"{applied_at.strftime('%Y%m%dT%H%M%S%fZ')}-{os.path.basename(output)}.patch.jsonl"
+        counts["audit"] = os.path.join(audit_dir, name)
+        write_patch(counts["audit"], record, edits)
+    return counts
+
+
+def apply_refinements(input_file=INPUT_FILE, output_file=OUTPUT_FILE, audit_dir=DEFAULT_AUDIT_DIR):
     """Apply refinements to the TSV file."""
-    # Read the TSV file
-    df = pd.read_csv(INPUT_FILE, sep='\t', dtype=str)
-    
-    # Find the Rule ID and Cursor Generated Description columns
-    rule_id_col = None
-    cursor_desc_col = None
-    
-    for col in df.columns:
-        if 'Rule ID' in col:
-            rule_id_col = col
-        if 'Cursor Generated Description' in col:
-            cursor_desc_col = col
-    
-    if not rule_id_col or not cursor_desc_col:
-        print(f"Could not find required columns. Found: {df.columns.tolist()}")
-        return
-    
-    print(f"Found columns: Rule ID='{rule_id_col}', Cursor Desc='{cursor_desc_col}'")
-    
-    # Apply refinements
-    updated_count = 0
-    for idx, row in df.iterrows():
-        rule_id = str(row[rule_id_col]).strip() if pd.notna(row[rule_id_col]) else ''
-        
-        if rule_id in REFINEMENTS:
-            refinement = REFINEMENTS[rule_id]
-            new_desc = f"**Purpose:** {refinement['purpose']} **Impact:** {refinement['impact']}"
-            df.at[idx, cursor_desc_col] = new_desc
-            print(f"Updated: {rule_id}")
-            updated_count += 1
-    
-    # Save the updated TSV
-    df.to_csv(OUTPUT_FILE, sep='\t', index=False)
-    print(f"\nApplied {updated_count} refinements to {OUTPUT_FILE}")
+    header = {"format": PATCH_FORMAT, "key": "rule_id", "source": "apply_rule_refinements.REFINEMENTS"}
+    counts = apply_patch(input_file, refinement_edits(), output_file, header, audit_dir)
+    print(f"\nApplied refinements to {counts['changed']} rows of {output_file}")
+    return counts
+
 
 if __name__ == '__main__':
-    apply_refinements()
+    profile_from_argv()
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--patch', help="Patch file from catalog_diff.py (default: the built-in REFINEMENTS)")
+    parser.add_argument('--catalog', default=INPUT_FILE, help="Catalog TSV to update")
+    parser.add_argument('--output', help="Write here instead of updating the catalog in place")
+    parser.add_argument('--audit-dir', default=DEFAULT_AUDIT_DIR, help="Where applied patches are kept ('' to disable)")
+    parser.add_argument('--force', action='store_true', help="Skip conflicting edits instead of aborting")
+    parser.add_argument('--dry-run', action='store_true', help="Check the patch without writing anything")
+    args = parser.parse_args()
+
+    if args.patch:
+        header, edits = read_patch(args.patch)
+    else:
+        header = {"format": PATCH_FORMAT, "key": "rule_id", "source": "apply_rule_refinements.REFINEMENTS"}
+        edits = refinement_edits()
+    try:
+        counts = apply_patch(args.catalog, edits, args.output, header, args.audit_dir or None,
+                             force=args.force, dry_run=args.dry_run)
+    except ValueError as e:
+        sys.exit(str(e))
+    print(f"{counts['rows']} rows: {counts['changed']} changed, {counts['added']} added, "
+          f"{counts['removed']} removed, {counts['unchanged']} copied unchanged")
+    for conflict in counts["conflicts"]:
+        print(f"  skipped: {conflict}", file=sys.stderr)
+    if counts.get("audit"):
+        print(f"Audit record: {counts['audit']}", file=sys.stderr)
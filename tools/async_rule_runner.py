@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Asyncio rule runner with a separate concurrency limit per backend.
+
+Each backend type (gate, config, integration, Solr, analytics) gets its own
+semaphore, so a handful of slow Redshift queries only ever occupy the analytics
+slots and the config and gate rules keep flowing. Rules still honour the
+scheduler's preconditions: a rule waits for its precondition results and is
+skipped if they did not pass. Results are streamed as they finish, every
+backend call has a timeout, and stopping the consumer cancels all work still
+in flight.
+
+Backends are pluggable: anything with an `async evaluate(rule, instance)`
+method. FixtureBackend serves verdicts from a JSON instance fixture (see
+rule_evaluation.py). An optional "latency_seconds" map in the fixture
+simulates slow backends for local testing:
+
+    {"latency_seconds": {"analytics": 2.0, "solr": 0.2}, ...}
+
+With a cost model (rule_cost_model.py), rules are started cheapest-first by
+observed cost, so interactive views fill in quickly. Every timed evaluation,
+including timeouts, is recorded back into the model.
+
+With a results store (rule_results_store.py), --deadline bounds page
+latency instead of cutting the run short. Rules finished by the deadline
+return live results. The rest return their last stored result marked
+"stale": true, or status "pending" if the tenant has never been evaluated.
+They keep running in the background, and the complete run is appended to
+the store for the next page load.
+
+Usage:
+    python tools/async_rule_runner.py instance.json
+    python tools/async_rule_runner.py instance.json --concurrency analytics=1 --timeout 5
+    python tools/async_rule_runner.py instance.json --cost-model .rule_costs.json
+    python tools/async_rule_runner.py instance.json --deadline 2 --store .rule_results
+    python tools/async_rule_runner.py instance.json --environment-plan
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import sys
+import time
+from collections import Counter
+from contextlib import nullcontext
+
+from environment_profile import PlanCache
+from instrumentation import METRICS
+from profiling import profile_from_argv
+from rule_catalog import load_catalog, unique_rules
+from rule_cost_model import UNTIMED_STATUSES, RuleCostModel, tenant_size_class
+from rule_evaluation import BACKEND_EVALUATORS, load_instance, make_result, rule_backend
+from rule_results_store import RuleResultsStore
+from rule_scheduler import RuleGraph
+
+BACKEND_CONCURRENCY = {
+    "gate": 32,
+    "config": 32,
+    "integration": 4,
+    "solr": 8,
+    "analytics": 2,
+}
+
+BACKEND_TIMEOUT_SECONDS = {
+    "gate": 5,
+    "config": 5,
+    "integration": 30,
+    "solr": 60,
+    "analytics": 300,
+}
+
+
+class FixtureBackend:
+    """Stand-in backend that serves results from the instance fixture."""
+
+    def __init__(self, backend_type, evaluator=None, latency_seconds=0.0):
+        self.backend_type = backend_type
+        self.evaluator = evaluator or BACKEND_EVALUATORS[backend_type]
+        self.latency_seconds = latency_seconds
+
+    async def evaluate(self, rule, instance):
+        """Evaluate one rule after the simulated backend latency."""
+        delay = instance.get("latency_seconds", {}).get(self.backend_type, self.latency_seconds)
+        if delay:
+            await asyncio.sleep(delay)
+        return self.evaluator(rule, instance)
+
+
+def fixture_backends():
+    """One FixtureBackend per backend type."""
+    return {backend_type: FixtureBackend(backend_type) for backend_type in BACKEND_EVALUATORS}
+
+
+class AsyncRuleRunner:
+    """Evaluates a rule set concurrently, bounded per backend."""
+
+    def __init__(self, backends=None, concurrency=None, timeouts=None, cost_model=None):
+        self.backends = backends or fixture_backends()
+        self.concurrency = {**BACKEND_CONCURRENCY, **(concurrency or {})}
+        self.timeouts = {**BACKEND_TIMEOUT_SECONDS, **(timeouts or {})}
+        self.cost_model = cost_model
+
+    async def _run_rule(self, graph, rule_id, instance, tasks, results, semaphores):
+        """Wait for preconditions, then evaluate within the backend's limits."""
+        backend = graph.backends[rule_id]
+        rule = graph.rules[rule_id]
+        for precondition in graph.preconditions[rule_id]:
+            await tasks[precondition]
+
+        reason = graph.skip_reason(rule_id, results, instance)
+        if reason:
+            result = make_result(rule, backend, "skipped", reason=reason)
+        else:
+            # Batching adapters coalesce calls and bound concurrency with their
+            # own connection pool; a semaphore would only shrink their batches.
+            implementation = self.backends[backend]
+            limiter = nullcontext() if getattr(implementation, "bounds_concurrency", False) else semaphores[backend]
+            async with limiter:
+                started = time.perf_counter()
+                try:
+                    result = await asyncio.wait_for(
+                        implementation.evaluate(rule, instance), self.timeouts[backend]
+                    )
+                except asyncio.TimeoutError:
+                    result = make_result(rule, backend, "timeout",
+                                         reason=f"no result within {self.timeouts[backend]}s")
+                except Exception as exc:  # a failing backend should not take the run down
+                    result = make_result(rule, backend, "error", reason=f"{type(exc).__name__}: {exc}")
+                result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 3)
+            if self.cost_model is not None and result["status"] not in UNTIMED_STATUSES:
+                self.cost_model.observe(rule_id, graph.handlers[rule_id], backend, result["elapsed_ms"],
+                                        graph.size_class)
+        METRICS.count('async_run', result["status"])
+        results[rule_id] = result
+        return result
+
+    async def stream(self, rules, instance):
+        """Async generator yielding each rule result as soon as it is ready."""
+        graph = RuleGraph(rules, self.cost_model, tenant_size_class(instance))
+        semaphores = {backend: asyncio.Semaphore(limit) for backend, limit in self.concurrency.items()}
+        tasks = {}
+        results = {}
+        # Preconditions come first in evaluation order, so their tasks exist
+        # before any dependent task awaits them.
+        for rule_id in graph.evaluation_order():
+            tasks[rule_id] = asyncio.create_task(
+                self._run_rule(graph, rule_id, instance, tasks, results, semaphores)
+            )
+        with METRICS.stage('async_run'):
+            try:
+                for next_done in asyncio.as_completed(list(tasks.values())):
+                    yield await next_done
+            finally:
+                for task in tasks.values():
+                    task.cancel()
+                await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+    async def run(self, rules, instance):
+        """Collect every result (in completion order)."""
+        return [result async for result in self.stream(rules, instance)]
+
+
+async def run_to_stream(rules, instance, output_stream, runner=None, deadline=None):
+    """Write results as JSONL while they complete; stop at the optional deadline (seconds)."""
+    runner = runner or AsyncRuleRunner()
+    results = []
+    started = time.perf_counter()
+
+    async def consume():
+        async for result in runner.stream(rules, instance):
+            output_stream.write(json.dumps(result) + '\n')
+            output_stream.flush()
+            results.append(result)
+
+    try:
+        await asyncio.wait_for(consume(), deadline)
+    except asyncio.TimeoutError:
+        print(f"Deadline of {deadline}s reached; cancelled remaining rules", file=sys.stderr)
+
+    elapsed = time.perf_counter() - started
+    counts = Counter(r["status"] for r in results)
+    print(f"Completed {len(results)} rules in {elapsed:.2f}s: {dict(counts)}", file=sys.stderr)
+    return results
+
+
+def stale_result(rule, backend, stored):
+    """Result record for a rule still running at the deadline, from its last stored result."""
+    if stored is None:
+        result = make_result(rule, backend, "pending", reason="still evaluating; no earlier result")
+    else:
+        result = make_result(rule, backend, stored["status"], stored["metric_value"], stored["threshold"],
+                             reason=f"still evaluating; result from {stored['date']}")
+        result["as_of"] = stored["date"]
+    result["stale"] = True
+    return result
+
+
+async def evaluate_with_deadline(rules, instance, deadline, runner=None, store=None):
+    """(results at the deadline, task finishing the run in the background).
+
+    Rules done within the deadline are live. The others are served stale from
+    the store's latest results. The background task resolves to the complete
+    live results after appending them to the store under today's date.
+    """
+    runner = runner or AsyncRuleRunner()
+    live = {}
+
+    async def finish():
+        async for result in runner.stream(rules, instance):
+            live[result["rule_id"]] = result
+        if store is not None:
+            store.append(datetime.date.today(), instance.get("group_id"), live.values())
+        return list(live.values())
+
+    background = asyncio.create_task(finish())
+    await asyncio.wait({background}, timeout=deadline)
+    results = list(live.values())
+    waiting = [rule for rule in unique_rules(rules) if rule["rule_id"] not in live]
+    if waiting:
+        stored = store.latest(instance.get("group_id"), [r["rule_id"] for r in waiting]) if store else {}
+        results += [stale_result(rule, rule_backend(rule), stored.get(rule["rule_id"])) for rule in waiting]
+    return results, background
+
+
+async def run_partial(rules, instance, output_stream, runner, deadline, store):
+    """Write deadline-bounded results as JSONL, then wait for the background run to land in the store."""
+    started = time.perf_counter()
+    results, background = await evaluate_with_deadline(rules, instance, deadline, runner, store)
+    for result in results:
+        output_stream.write(json.dumps(result) + '\n')
+    output_stream.flush()
+    stale = Counter(r["status"] for r in results if r.get("stale"))
+    print(f"Served {len(results)} rules in {time.perf_counter() - started:.2f}s: "
+          f"{len(results) - sum(stale.values())} live, {sum(stale.values())} stale {dict(stale)}", file=sys.stderr)
+    final = await background
+    print(f"Background run finished in {time.perf_counter() - started:.2f}s; "
+          f"{len(final)} results appended to {store.root}", file=sys.stderr)
+    return results
+
+
+def parse_limits(values, cast):
+    """Parse repeated backend=value options into a dict."""
+    limits = {}
+    for value in values or []:
+        backend, _, limit = value.partition('=')
+        limits[backend.strip()] = cast(limit)
+    return limits
+
+
+if __name__ == '__main__':
+    profile_from_argv()
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('instance', help="Instance fixture JSON")
+    parser.add_argument('--catalog', action='append', help="Catalog TSV (repeatable)")
+    parser.add_argument('--concurrency', action='append', metavar='BACKEND=N', help="Per-backend concurrency limit")
+    parser.add_argument('--timeout', action='append', metavar='BACKEND=SECONDS', help="Per-backend timeout")
+    parser.add_argument('--deadline', type=float,
+                        help="Cancel whatever is still running after this many seconds (with --store: serve it stale)")
+    parser.add_argument('--store', help="Results store for stale results and background completion")
+    parser.add_argument('--cost-model', help="Order by (and record into) this observed-cost model")
+    parser.add_argument('--environment-plan', action='store_true',
+                        help="Only rules that apply to the instance's environment, SKUs and integration")
+    args = parser.parse_args()
+
+    runner = AsyncRuleRunner(
+        concurrency=parse_limits(args.concurrency, int),
+        timeouts=parse_limits(args.timeout, float),
+        cost_model=RuleCostModel(args.cost_model) if args.cost_model else None,
+    )
+    instance = load_instance(args.instance)
+    if args.environment_plan:
+        rules = PlanCache(catalog_paths=args.catalog).rules_for(instance)
+    else:
+        rules = load_catalog(args.catalog)
+    try:
+        if args.store and args.deadline is not None:
+            asyncio.run(run_partial(rules, instance, sys.stdout, runner, args.deadline, RuleResultsStore(args.store)))
+        else:
+            asyncio.run(run_to_stream(rules, instance, sys.stdout, runner, args.deadline))
+    except KeyboardInterrupt:
+        print("Cancelled", file=sys.stderr)
+    finally:
+        if runner.cost_model is not None:
+            runner.cost_model.save()
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+Connection-pooled, batched backend adapters for Solr and analytics data rules.
+
+Instead of one solr_fq_term query per data rule, every rule that targets the
+same Solr collection for a group_id is coalesced into a single request with
+one facet.query per rule. numFound gives the denominator and each facet count
+gives a rule's numerator. Analytics rules on the same table are folded into
+one SQL statement with a COUNT(CASE ...) column per rule. Per-tenant data
+health therefore costs one round-trip per collection or table, however many
+rules there are.
+
+The adapters plug into AsyncRuleRunner as backends. Rules whose query cannot
+be derived from the catalog fall back to the fixture evaluator. HTTP
+connections are pooled and kept alive, and the pool size bounds the real
+concurrency against each service.
+
+Usage (against the local stand-in from backend_stand_in.py):
+    python tools/backend_stand_in.py data.json --port 8983 &
+    python tools/backend_adapters.py instance.json --solr-url http://localhost:8983 \\
+        --analytics-url http://localhost:8983
+"""
+
+import abc
+import argparse
+import asyncio
+import http.client
+import json
+import queue
+import re
+import sys
+import threading
+import urllib.parse
+
+from instrumentation import METRICS
+from profiling import profile_from_argv
+from rule_evaluation import BACKEND_EVALUATORS, make_result, rule_backend
+
+# Solr fq terms documented in the technical reference; other rules derive
+# theirs from the config reference field.
+SOLR_FQ_TERMS = {
+    "employee_manager_email_quality": "profile.data_json.employee.manager_email:[* TO *]",
+}
+
+# Rule ID prefix -> Solr collection (AuditDataSource.SEARCH_* indexes)
+SOLR_COLLECTIONS = [
+    ("internal_positions", "positions"),
+    ("position_", "positions"),
+    ("claimed_employee", "employee_profiles"),
+    ("mentor_", "employee_profiles"),
+    ("employee_", "employee_profiles"),
+    ("role_", "roles"),
+    ("course", "courses"),
+    ("project", "projects"),
+    ("profile_", "candidate_profiles"),
+]
+
+# Config reference entity -> analytics table (AuditDataSource.ANALYTICS_DB_*)
+ANALYTICS_TABLES = {
+    "application": "applications",
+    "position": "positions",
+    "employee": "employees",
+    "profile": "profiles",
+}
+
+# Rule-specific pass thresholds; data rules default to 95%
+DATA_RULE_THRESHOLDS = {
+    "profile_skills_quality": 75,
+}
+DEFAULT_DATA_THRESHOLD = 95
+
+FIELD_REFERENCE_PATTERN = re.compile(r'→\s*([a-z_]+(?:\.[a-z_]+)+)')
+COLUMN_PATTERN = re.compile(r'^[a-z_][a-z0-9_]*$')
+
+# Analytics rules that are not a plain "column populated" ratio over the whole
+# table (discrepancies between columns, funnels, open positions only); they
+# go to the fallback evaluator instead of a batch.
+UNBATCHABLE_RULE_PATTERN = re.compile(r'discrepancy|funnel|(^|_)open_')
+# Populated-ratio rules measured over a subset of rows only
+SUBSET_RULES = {
+    "application_rejection_reason_quality",  # rejected applications
+    "application_hired_ts_quality",  # hired applications
+}
+# Timestamp, ID, count and boolean columns; only text columns get <> ''
+NON_TEXT_COLUMN_PATTERN = re.compile(r'(_ts|_at|_date|_time|_id|_count)$|^(is|has)_')
+
+
+class BackendError(Exception):
+    """A backend request failed with an HTTP error status."""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+    @property
+    def query_error(self):
+        """Whether the service rejected the request itself (4xx), not just failed to serve it."""
+        return self.status is not None and 400 <= self.status < 500
+
+
+def referenced_field(rule):
+    """Dotted field path from the config reference (e.g. position.location), or None."""
+    match = FIELD_REFERENCE_PATTERN.search(rule.get("config_reference", ""))
+    return match.group(1) if match else None
+
+
+def solr_query(rule):
+    """(collection, fq term) for a Solr data rule, or None if it cannot be derived."""
+    rule_id = rule["rule_id"]
+    collection = next((c for prefix, c in SOLR_COLLECTIONS if rule_id.startswith(prefix)), None)
+    if collection is None:
+        return None
+    if rule_id in SOLR_FQ_TERMS:
+        return collection, SOLR_FQ_TERMS[rule_id]
+    field = referenced_field(rule)
+    if field is None:
+        return None
+    entity, _, rest = field.partition('.')
+    if entity in ('position', 'course', 'project', 'employee', 'role'):
+        field = rest
+    return collection, f"{field}:[* TO *]"
+
+
+def analytics_query(rule):
+    """(table, column) for a populated-column analytics rule, or None if it is not one."""
+    if UNBATCHABLE_RULE_PATTERN.search(rule["rule_id"]) or rule["rule_id"] in SUBSET_RULES:
+        return None
+    field = referenced_field(rule)
+    # "employee.is_alumni / employee.termination_date", "application.status = 'active'"
+    reference = rule.get("config_reference", "").split('→', 1)[-1]
+    if field is None or '/' in reference or '=' in reference:
+        return None
+    entity, _, column = field.partition('.')
+    table = ANALYTICS_TABLES.get(entity)
+    if table is None or not COLUMN_PATTERN.match(column):
+        return None
+    return table, column
+
+
+def metric_result(rule, backend, numerator, total):
+    """Percentage-of-records result against the rule threshold."""
+    threshold = DATA_RULE_THRESHOLDS.get(rule["rule_id"], DEFAULT_DATA_THRESHOLD)
+    if not total:
+        return make_result(rule, backend, "error", threshold=threshold, reason="no records")
+    value = round(100.0 * numerator / total, 2)
+    return make_result(rule, backend, "pass" if value >= threshold else "fail", value, threshold)
+
+
+class HTTPConnectionPool:
+    """Thread-safe keep-alive connection pool for one HTTP service."""
+
+    def __init__(self, base_url, max_connections=4, timeout=30):
+        parsed = urllib.parse.urlsplit(base_url)
+        connection_class = http.client.HTTPSConnection if parsed.scheme == 'https' else http.client.HTTPConnection
+        self._connect = lambda: connection_class(parsed.hostname, parsed.port, timeout=timeout)
+        self.base_path = parsed.path.rstrip('/')
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections_opened = 0
+
+    def _checkout(self):
+        """Reuse an idle connection or open a new one."""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                self.connections_opened += 1
+            return self._connect()
+
+    def request_json(self, method, path, body=None, content_type='application/json'):
+        """Send a request and decode the JSON response."""
+        headers = {'Content-Type': content_type, 'Connection': 'keep-alive'}
+        with self._slots:
+            for attempt in range(2):
+                connection = self._checkout()
+                try:
+                    connection.request(method, self.base_path + path, body=body, headers=headers)
+                    response = connection.getresponse()
+                    payload = response.read()
+                except (http.client.HTTPException, OSError):
+                    connection.close()
+                    if attempt:
+                        raise
+                    continue  # stale keep-alive connection; retry once on a fresh one
+                with self._lock:
+                    self.requests += 1
+                METRICS.count('backend_http', 'requests')
+                METRICS.bytes_written('backend_http', len(body.encode('utf-8') if isinstance(body, str) else body or b''))
+                METRICS.bytes_read('backend_http', len(payload))
+                if response.status >= 400:
+                    connection.close()
+                    raise BackendError(f"{method} {path} returned {response.status}: {payload[:200]!r}",
+                                       response.status)
+                self._idle.put(connection)
+                return json.loads(payload)
+
+    def close(self):
+        """Close every idle connection."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class BatchingAdapter(abc.ABC):
+    """Coalesces concurrent evaluate() calls that share a batch key into one request.
+
+    Calls arriving in the same event-loop turn (or within batch_window_seconds)
+    are grouped. The pool, not the runner's semaphore, bounds concurrency.
+    A batch the service rejects (4xx) is bisected, so only the rules whose
+    query fails error. Any other failure (connection refused, timeout, 5xx)
+    fails the whole batch at once.
+    """
+
+    backend_type = None
+    bounds_concurrency = True
+
+    def __init__(self, pool, fallback=None, batch_window_seconds=0.0):
+        self.pool = pool
+        self.fallback = fallback or BACKEND_EVALUATORS[self.backend_type]
+        self.batch_window_seconds = batch_window_seconds
+        self._pending = {}
+
+    @abc.abstractmethod
+    def batch_key(self, rule, instance):
+        """Hashable key for rules that can share a request, or None."""
+
+    @abc.abstractmethod
+    def fetch_batch(self, key, rules, instance):
+        """Run one request for a batch; returns {rule_id: result}. Blocking."""
+
+    def fetch_isolated(self, key, rules, instance):
+        """fetch_batch, bisecting on query errors; returns {rule_id: result or exception}."""
+        stage = f'{self.backend_type}_batch'
+        try:
+            with METRICS.stage(stage):
+                results = self.fetch_batch(key, rules, instance)
+            METRICS.count(stage, 'rules', len(rules))
+            return results
+        except Exception as exc:
+            if len(rules) == 1 or not (isinstance(exc, BackendError) and exc.query_error):
+                METRICS.count(stage, 'rule_errors', len(rules))
+                return {rule["rule_id"]: exc for rule in rules}
+        METRICS.count(stage, 'bisections')
+        middle = len(rules) // 2
+        results = self.fetch_isolated(key, rules[:middle], instance)
+        results.update(self.fetch_isolated(key, rules[middle:], instance))
+        return results
+
+    async def evaluate(self, rule, instance):
+        """Evaluate one rule, coalescing with other pending rules for the same key."""
+        key = self.batch_key(rule, instance)
+        if key is None:
+            return self.fallback(rule, instance)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        batch = self._pending.setdefault(key, [])
+        batch.append((rule, future))
+        if len(batch) == 1:
+            loop.call_later(self.batch_window_seconds,
+                            lambda: asyncio.ensure_future(self._flush(key, instance)))
+        return await future
+
+    async def _flush(self, key, instance):
+        """Send the pending batch for a key and resolve its futures."""
+        batch = self._pending.pop(key, [])
+        results = await asyncio.to_thread(self.fetch_isolated, key, [rule for rule, _ in batch], instance)
+        for rule, future in batch:
+            if future.done():
+                continue
+            result = results[rule["rule_id"]]
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def evaluate_many(self, rules, instance):
+        """Synchronous batch evaluation for callers outside an event loop."""
+        batches = {}
+        results = {}
+        for rule in rules:
+            key = self.batch_key(rule, instance)
+            if key is None:
+                results[rule["rule_id"]] = self.fallback(rule, instance)
+            else:
+                batches.setdefault(key, []).append(rule)
+        for key, batch in batches.items():
+            fetched = self.fetch_isolated(key, batch, instance)
+            for rule in batch:
+                outcome = fetched[rule["rule_id"]]
+                if isinstance(outcome, Exception):
+                    outcome = make_result(rule, self.backend_type, "error", reason=f"{type(outcome).__name__}: {outcome}")
+                results[rule["rule_id"]] = outcome
+        return results
+
+
+class SolrBatchAdapter(BatchingAdapter):
+    """One faceted select per (group_id, collection)."""
+
+    backend_type = "solr"
+
+    def batch_key(self, rule, instance):
+        query = solr_query(rule)
+        return (instance.get("group_id"), query[0]) if query else None
+
+    def fetch_batch(self, key, rules, instance):
+        group_id, collection = key
+        params = [
+            ('q', '*:*'),
+            ('rows', '0'),
+            ('wt', 'json'),
+            ('fq', f'group_id:"{group_id}"'),
+            ('facet', 'true'),
+        ]
+        for rule in rules:
+            params.append(('facet.query', f"{{!key={rule['rule_id']}}}{solr_query(rule)[1]}"))
+        response = self.pool.request_json(
+            'POST', f'/solr/{collection}/select',
+            body=urllib.parse.urlencode(params), content_type='application/x-www-form-urlencoded',
+        )
+        total = response["response"]["numFound"]
+        counts = response.get("facet_counts", {}).get("facet_queries", {})
+        return {rule["rule_id"]: metric_result(rule, "solr", counts.get(rule["rule_id"], 0), total) for rule in rules}
+
+
+class AnalyticsBatchAdapter(BatchingAdapter):
+    """One SQL statement with a COUNT(CASE ...) column per rule, per (group_id, table).
+
+    paramstyle is 'qmark' for the stand-in (SQLite) and 'format' for Redshift.
+    """
+
+    backend_type = "analytics"
+
+    def __init__(self, pool, fallback=None, batch_window_seconds=0.0, paramstyle='qmark'):
+        super().__init__(pool, fallback, batch_window_seconds)
+        self.placeholder = '?' if paramstyle == 'qmark' else '%s'
+
+    def batch_key(self, rule, instance):
+        query = analytics_query(rule)
+        return (instance.get("group_id"), query[0]) if query else None
+
+    def build_sql(self, table, rules):
+        """COUNT(*) plus one populated-count column per rule (non-empty for text columns)."""
+        columns = ['COUNT(*) AS total']
+        for rule in rules:
+            column = analytics_query(rule)[1]
+            populated = f"{column} IS NOT NULL"
+            if not NON_TEXT_COLUMN_PATTERN.search(column):
+                populated += f" AND {column} <> ''"
+            columns.append(f"COUNT(CASE WHEN {populated} THEN 1 END) AS \"{rule['rule_id']}\"")
+        return f"SELECT {', '.join(columns)} FROM {table} WHERE group_id = {self.placeholder}"
+
+    def fetch_batch(self, key, rules, instance):
+        group_id, table = key
+        body = json.dumps({"sql": self.build_sql(table, rules), "params": [group_id]})
+        response = self.pool.request_json('POST', '/analytics/query', body=body)
+        row = dict(zip(response["columns"], response["rows"][0])) if response["rows"] else {}
+        total = row.get("total", 0)
+        return {rule["rule_id"]: metric_result(rule, "analytics", row.get(rule["rule_id"], 0), total) for rule in rules}
+
+
+def batched_backends(solr_url=None, analytics_url=None, max_connections=4):
+    """Fixture backends with pooled, batched Solr and analytics adapters swapped in."""
+    from async_rule_runner import fixture_backends
+    backends = fixture_backends()
+    if solr_url:
+        backends["solr"] = SolrBatchAdapter(HTTPConnectionPool(solr_url, max_connections))
+    if analytics_url:
+        backends["analytics"] = AnalyticsBatchAdapter(HTTPConnectionPool(analytics_url, max_connections))
+    return backends
+
+
+def batchable_summary(rules):
+    """How many data rules each adapter can serve in batches."""
+    solr = [r for r in rules if rule_backend(r) == "solr"]
+    analytics = [r for r in rules if rule_backend(r) == "analytics"]
+    return {
+        "solr": (sum(1 for r in solr if solr_query(r)), len(solr)),
+        "analytics": (sum(1 for r in analytics if analytics_query(r)), len(analytics)),
+    }
+
+
+if __name__ == '__main__':
+    profile_from_argv()
+    from async_rule_runner import AsyncRuleRunner, run_to_stream
+    from rule_catalog import load_catalog, unique_rules
+    from rule_evaluation import load_instance
+
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('instance', help="Instance fixture JSON")
+    parser.add_argument('--catalog', action='append', help="Catalog TSV (repeatable)")
+    parser.add_argument('--solr-url', help="Solr base URL")
+    parser.add_argument('--analytics-url', help="Analytics query service base URL")
+    parser.add_argument('--max-connections', type=int, default=4)
+    args = parser.parse_args()
+
+    rules = load_catalog(args.catalog)
+    for backend, (batchable, total) in batchable_summary(unique_rules(rules)).items():
+        print(f"{backend}: {batchable} of {total} rules batchable", file=sys.stderr)
+
+    backends = batched_backends(args.solr_url, args.analytics_url, args.max_connections)
+    asyncio.run(run_to_stream(rules, load_instance(args.instance), sys.stdout, AsyncRuleRunner(backends)))
+    for backend in ("solr", "analytics"):
+        adapter = backends[backend]
+        if isinstance(adapter, BatchingAdapter):
+            print(f"{backend}: {adapter.pool.requests} requests over "
+                  f"{adapter.pool.connections_opened} connections", file=sys.stderr)
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Local HTTP stand-in for the Solr and analytics backends.
+
+Serves the two endpoints the batched adapters in backend_adapters.py call,
+from a JSON data file, so batching and pooling can be exercised without a
+tenant:
+
+    {
+        "solr": {"employee_profiles": [{"group_id": "acme.com", "profile": {...}}]},
+        "analytics": {"applications": [{"group_id": "acme.com", "source_type": "referral"}]}
+    }
+
+POST /solr/<collection>/select answers q=*:* with fq and facet.query terms
+of the form field.path:[* TO *] or field.path:value. POST /analytics/query
+runs the SQL against an in-memory SQLite copy of the analytics tables.
+Every request is counted and reported at GET /stats.
+
+Usage:
+    python tools/backend_stand_in.py data.json --port 8983
+"""
+
+import argparse
+import json
+import re
+import sqlite3
+import sys
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from profiling import profile_from_argv
+
+LOCAL_PARAMS_PATTERN = re.compile(r'^\{!key=([^}\s]+)\}')
+
+
+def field_value(document, field_path):
+    """Resolve a dotted field path in a Solr document; None when absent."""
+    value = document
+    for key in field_path.split('.'):
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+
+def matches(document, term):
+    """Whether a document satisfies a field:[* TO *] or field:value term."""
+    field_path, _, expected = term.partition(':')
+    value = field_value(document, field_path)
+    if expected == '[* TO *]':
+        return value not in (None, "", [], {})
+    return str(value) == expected.strip('"')
+
+
+def load_analytics(tables):
+    """In-memory SQLite database holding the analytics tables."""
+    db = sqlite3.connect(':memory:', check_same_thread=False)
+    for table, rows in tables.items():
+        columns = sorted({column for row in rows for column in row})
+        db.execute(f"CREATE TABLE {table} ({', '.join(columns)})")
+        db.executemany(
+            f"INSERT INTO {table} VALUES ({', '.join('?' * len(columns))})",
+            [[row.get(column) for column in columns] for row in rows],
+        )
+    return db
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Answers Solr select and analytics query requests from the data file."""
+
+    protocol_version = 'HTTP/1.1'  # keep-alive, so connection pooling is visible
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _count(self, path):
+        with self.server.lock:
+            self.server.stats[path] = self.server.stats.get(path, 0) + 1
+
+    def do_GET(self):
+        if self.path == '/stats':
+            self._send_json(200, self.server.stats)
+        else:
+            self._send_json(404, {"error": f"unknown path {self.path}"})
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0))).decode('utf-8')
+        parts = self.path.strip('/').split('/')
+        if len(parts) == 3 and parts[0] == 'solr' and parts[2] == 'select':
+            self._count('solr')
+            self._send_json(*self.solr_select(parts[1], urllib.parse.parse_qs(body)))
+        elif self.path == '/analytics/query':
+            self._count('analytics')
+            self._send_json(*self.analytics_query(json.loads(body)))
+        else:
+            self._send_json(404, {"error": f"unknown path {self.path}"})
+
+    def solr_select(self, collection, params):
+        """numFound over the fq-filtered documents plus one count per facet.query."""
+        if collection not in self.server.data.get("solr", {}):
+            return 404, {"error": f"unknown collection {collection}"}
+        documents = self.server.data["solr"][collection]
+        for term in params.get('fq', []):
+            documents = [d for d in documents if matches(d, term)]
+        facet_queries = {}
+        for query in params.get('facet.query', []):
+            match = LOCAL_PARAMS_PATTERN.match(query)
+            key, term = (match.group(1), query[match.end():]) if match else (query, query)
+            facet_queries[key] = sum(1 for d in documents if matches(d, term))
+        return 200, {"response": {"numFound": len(documents)}, "facet_counts": {"facet_queries": facet_queries}}
+
+    def analytics_query(self, request):
+        """Run one SQL statement against the SQLite tables."""
+        try:
+            with self.server.lock:
+                cursor = self.server.db.execute(request["sql"], request.get("params", []))
+                rows = cursor.fetchall()
+        except sqlite3.Error as exc:
+            return 400, {"error": str(exc)}
+        return 200, {"columns": [c[0] for c in cursor.description], "rows": [list(r) for r in rows]}
+
+
+def make_server(data, host='127.0.0.1', port=0):
+    """Stand-in server for a data dict; port 0 picks a free port."""
+    server = ThreadingHTTPServer((host, port), StandInHandler)
+    server.data = data
+    server.db = load_analytics(data.get("analytics", {}))
+    server.stats = {}
+    server.lock = threading.Lock()
+    return server
+
+
+def start_in_background(data, host='127.0.0.1', port=0):
+    """Start a stand-in on a daemon thread; returns (server, base URL)."""
+    server = make_server(data, host, port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == '__main__':
+    profile_from_argv()
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('data', help="JSON data file with solr collections and analytics tables")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8983)
+    args = parser.parse_args()
+
+    with open(args.data, 'r', encoding='utf-8') as f:
+        server = make_server(json.load(f), args.host, args.port)
+    print(f"Serving Solr and analytics stand-in on http://{args.host}:{server.server_address[1]}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"Requests served: {server.stats}", file=sys.stderr)
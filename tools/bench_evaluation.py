@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+Benchmark rule evaluation per handler class on synthetic tenant fixtures.
+
+Builds one tenant fixture per size. Each fixture holds config documents with
+every field the catalog's config rules read, gates, and Solr and analytics
+snapshots with employee, position, candidate profile and application
+records:
+
+    size  employees  positions  profiles  applications  config list items
+    S         1,000        200     2,000         5,000                  5
+    M        10,000      2,000    20,000        50,000                 20
+    L        50,000     10,000   100,000       250,000                100
+    XL      150,000     30,000   300,000       750,000                500
+
+The snapshots use backend_stand_in.py's data layout. Solr and analytics
+rules are evaluated by scanning them, as SolrBaseRule and AnalyticsBaseRule
+do against the real indexes and tables. The query is the one
+backend_adapters.py derives from the rule's config reference. Rules it
+cannot derive get a stable documented field of the rule's collection or
+table, so every data rule pays for a scan. Config, gate and integration
+rules use the rule_evaluation.py evaluators.
+
+For every handler class (rule_evaluation.rule_handler) it reports latency
+percentiles per rule evaluation, throughput, and peak traced memory from a
+separate tracemalloc pass. The run fails (exit 1) when a --budget limit is
+exceeded, or when p50 latency grew by more than --max-slowdown against a
+--compare baseline. --cost-model records every timed evaluation into a
+rule_cost_model.py model under the fixture's size class, to seed the
+scheduler's ordering. A budget file maps size and handler (or "*") to limits:
+
+    {"M": {"SolrBaseRule": {"p99_ms": 50}, "*": {"peak_bytes": 50000000}},
+     "*": {"GateEnabledRule": {"p50_ms": 0.05, "min_rules_per_second": 100000}}}
+
+Usage:
+    python tools/bench_evaluation.py --sizes S M L --output bench/evaluation.json
+    python tools/bench_evaluation.py --sizes M --budget bench/evaluation_budget.json --compare bench/main.json
+    python tools/bench_evaluation.py --sizes S M L --cost-model .rule_costs.json
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+import zlib
+from collections import defaultdict
+
+from backend_adapters import analytics_query, metric_result, solr_query
+from backend_stand_in import matches
+from bench_pipeline import git_commit
+from profiling import profile_from_argv
+from rule_catalog import load_catalog, unique_rules
+from rule_cost_model import RuleCostModel
+from rule_evaluation import BACKEND_EVALUATORS, config_fields, rule_backend, rule_handler
+
+SIZES = {
+    "S": {"employees": 1_000, "positions": 200, "profiles": 2_000, "applications": 5_000, "list_items": 5},
+    "M": {"employees": 10_000, "positions": 2_000, "profiles": 20_000, "applications": 50_000, "list_items": 20},
+    "L": {"employees": 50_000, "positions": 10_000, "profiles": 100_000, "applications": 250_000, "list_items": 100},
+    "XL": {"employees": 150_000, "positions": 30_000, "profiles": 300_000, "applications": 750_000, "list_items": 500},
+}
+
+# Documented fields per Solr collection and analytics table, with the SIZES
+# record count (and divisor) that sizes each one.
+SOLR_FIELDS = {
+    "employee_profiles": ("employees", 1, [
+        "level", "location", "title", "job_code", "hiring_band", "internal_candidate_id", "mentorship.enabled",
+        "profile.data_json.employee.manager_email", "profile.data_json.employee.location_country",
+        "profile.data_json.employee.first_name", "profile.data_json.employee.last_name", "skills",
+    ]),
+    "positions": ("positions", 1, ["location", "title", "hiring_band", "business_unit", "status"]),
+    "candidate_profiles": ("profiles", 1, ["first_name", "last_name", "email", "skills"]),
+    "roles": ("positions", 10, ["title", "level", "skills"]),
+    "courses": ("positions", 10, ["title", "skills"]),
+    "projects": ("positions", 10, ["title", "skills"]),
+}
+ANALYTICS_COLUMNS = {
+    "applications": ("applications", 1, [
+        "application_id", "profile_id", "status", "source_type", "rejection_reason", "hired_ts",
+        "application_ts", "stage_ts",
+    ]),
+    "positions": ("positions", 1, [
+        "status", "location_country", "hiring_manager_name", "hiring_manager_email", "title", "business_unit",
+        "recruiter_name", "recruiter_email", "job_function", "creation_ts",
+    ]),
+    "employees": ("employees", 1, ["is_alumni", "location", "title", "job_code", "manager_email"]),
+    "profiles": ("profiles", 1, ["first_name", "last_name", "email"]),
+}
+# Rule ID prefix -> analytics table for rules without a derivable query
+ANALYTICS_PREFIXES = [("application", "applications"), ("position", "positions"),
+                      ("employee", "employees"), ("profile", "profiles")]
+
+PERCENTILES = (50, 90, 99)
+DEFAULT_MAX_SLOWDOWN = 0.20
+
+
+def stable_choice(rule_id, options):
+    return options[zlib.crc32(rule_id.encode('utf-8')) % len(options)]
+
+
+def bench_solr_query(rule):
+    """(collection, fq term) the benchmark scans for a Solr rule."""
+    query = solr_query(rule)
+    if query is not None and query[0] in SOLR_FIELDS:
+        return query
+    collection = query[0] if query else "employee_profiles"
+    return collection, f"{stable_choice(rule['rule_id'], SOLR_FIELDS[collection][2])}:[* TO *]"
+
+
+def bench_analytics_query(rule):
+    """(table, column) the benchmark scans for an analytics rule."""
+    query = analytics_query(rule)
+    if query is not None and query[0] in ANALYTICS_COLUMNS:
+        return query
+    rule_id = rule["rule_id"]
+    table = next((t for prefix, t in ANALYTICS_PREFIXES if rule_id.startswith(prefix)), "applications")
+    return table, stable_choice(rule_id, ANALYTICS_COLUMNS[table][2])
+
+
+def set_path(document, field_path, value):
+    keys = field_path.split('.')
+    for key in keys[:-1]:
+        child = document.get(key)
+        if not isinstance(child, dict):
+            child = document[key] = {}
+        document = child
+    document[keys[-1]] = value
+
+
+def tenant_fixture(rules, size, seed=0):
+    """Instance fixture with configs, gates and Solr/analytics snapshots for one size."""
+    rng = random.Random(f"{seed}:{size}")
+    counts = SIZES[size]
+    group_id = f"bench-{size.lower()}.com"
+    items = counts["list_items"]
+
+    configs, gates, metrics = defaultdict(dict), {}, {}
+    solr_fields = {collection: set(fields) for collection, (_, _, fields) in SOLR_FIELDS.items()}
+    analytics_columns = {table: set(columns) for table, (_, _, columns) in ANALYTICS_COLUMNS.items()}
+    for rule in rules:
+        backend = rule_backend(rule)
+        handler = rule_handler(rule, backend)
+        if backend == "gate":
+            gates[rule["rule_id"]] = rng.random() < 0.9
+        elif backend == "config":
+            for name, field_path in config_fields(rule):
+                if rng.random() < 0.1:
+                    continue  # leave some fields unset so failures are exercised too
+                if field_path is None:
+                    configs[name].setdefault("enabled", True)
+                elif handler == "ProductConfigHealthListSizeRule":
+                    set_path(configs[name], field_path, [{"id": i, "enabled": True} for i in range(items)])
+                elif handler == "ProductConfigHealthCompareValueRule":
+                    set_path(configs[name], field_path, True)
+                else:
+                    set_path(configs[name], field_path, {"enabled": True, "order": rng.randrange(items)})
+        elif backend == "solr":
+            collection, term = bench_solr_query(rule)
+            solr_fields[collection].add(term.partition(':')[0])
+        elif backend == "analytics":
+            table, column = bench_analytics_query(rule)
+            analytics_columns[table].add(column)
+        else:
+            metrics[rule["rule_id"]] = {"metric_value": round(rng.uniform(80, 100), 1), "threshold": 95}
+    # Bulk a config up with the tenant size, as job_req templates grow in real tenants.
+    configs["ats_config"]["job_req_templates"] = [{"id": i, "stages": list(range(8))} for i in range(items * 10)]
+
+    def records(count, fields, nested):
+        fill = {field: rng.uniform(0.85, 0.999) for field in fields}
+        rows = []
+        for i in range(count):
+            row = {"group_id": group_id}
+            for field, rate in fill.items():
+                if rng.random() < rate:
+                    value = f"{field.rsplit('.', 1)[-1]}_{i % 97}"
+                    if nested:
+                        set_path(row, field, value)
+                    else:
+                        row[field] = value
+            rows.append(row)
+        return rows
+
+    def sized(layout, name):
+        records_key, divisor, _ = layout[name]
+        return counts[records_key] // divisor
+
+    solr = {c: records(sized(SOLR_FIELDS, c), sorted(fields), nested=True) for c, fields in solr_fields.items()}
+    analytics = {t: records(sized(ANALYTICS_COLUMNS, t), sorted(columns), nested=False)
+                 for t, columns in analytics_columns.items()}
+    return {
+        "group_id": group_id,
+        "environment": "prod",
+        "configs": dict(configs),
+        "gates": {**gates, "talent_lake_provisioned": True},
+        "metrics": metrics,
+        "solr": solr,
+        "analytics": analytics,
+    }
+
+
+def evaluate_solr_snapshot(rule, instance):
+    """SolrBaseRule analogue: share of collection documents matching the rule's fq term."""
+    collection, term = bench_solr_query(rule)
+    documents = instance["solr"].get(collection, [])
+    return metric_result(rule, "solr", sum(1 for d in documents if matches(d, term)), len(documents))
+
+
+def evaluate_analytics_snapshot(rule, instance):
+    """AnalyticsBaseRule analogue: share of table rows with the rule's column set."""
+    table, column = bench_analytics_query(rule)
+    rows = instance["analytics"].get(table, [])
+    return metric_result(rule, "analytics", sum(1 for r in rows if r.get(column) not in (None, "")), len(rows))
+
+
+def snapshot_evaluators():
+    """BACKEND_EVALUATORS with Solr and analytics rules scanning the fixture snapshots."""
+    return {**BACKEND_EVALUATORS, "solr": evaluate_solr_snapshot, "analytics": evaluate_analytics_snapshot}
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def bench_handlers(rules, instance, repeat, evaluators=None, cost_model=None, size_class=None):
+    """Latency percentiles, throughput and peak memory per handler class."""
+    evaluators = evaluators or snapshot_evaluators()
+    groups = defaultdict(list)
+    for rule in rules:
+        backend = rule_backend(rule)
+        groups[rule_handler(rule, backend)].append((rule, backend, evaluators[backend]))
+
+    report = {}
+    for handler, members in sorted(groups.items()):
+        latencies, statuses = [], defaultdict(int)
+        for _ in range(repeat):
+            for rule, backend, evaluate in members:
+                started = time.perf_counter_ns()
+                result = evaluate(rule, instance)
+                latencies.append((time.perf_counter_ns() - started) / 1e6)
+                statuses[result["status"]] += 1
+                if cost_model is not None:
+                    cost_model.observe(rule["rule_id"], handler, backend, latencies[-1], size_class)
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+        for rule, _, evaluate in members:
+            evaluate(rule, instance)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        latencies.sort()
+        total_ms = sum(latencies)
+        report[handler] = {
+            "rules": len(members),
+            "evaluations": len(latencies),
+            **{f"p{p}_ms": round(percentile(latencies, p), 4) for p in PERCENTILES},
+            "max_ms": round(latencies[-1], 4),
+            "mean_ms": round(statistics.fmean(latencies), 4),
+            "rules_per_second": round(1000 * len(latencies) / total_ms, 1) if total_ms else None,
+            "peak_bytes": peak,
+            "statuses": {s: c // repeat for s, c in sorted(statuses.items())},
+        }
+        entry = report[handler]
+        print(f"  {instance['group_id']:<16} {handler:<36} {entry['rules']:>4} rules  "
+              f"p50 {entry['p50_ms']:9.3f} ms  p99 {entry['p99_ms']:9.3f} ms  "
+              f"{entry['rules_per_second'] or 0:>12,.0f} rules/s  peak {peak / 1e3:8.1f} KB", file=sys.stderr)
+    return report
+
+
+def check_budget(runs, budget):
+    """Budget violations as messages; limits are max except min_* keys."""
+    violations = []
+    for run in runs:
+        for handler, entry in run["handlers"].items():
+            limits = {}
+            for size_key in ("*", run["size"]):
+                for handler_key in ("*", handler):
+                    limits.update(budget.get(size_key, {}).get(handler_key, {}))
+            for key, limit in limits.items():
+                if key.startswith("min_"):
+                    value = entry.get(key[4:])
+                    if value is not None and value < limit:
+                        violations.append(f"{run['size']} {handler}: {key[4:]} {value} < {limit}")
+                else:
+                    value = entry.get(key)
+                    if value is not None and value > limit:
+                        violations.append(f"{run['size']} {handler}: {key} {value} > {limit}")
+    return violations
+
+
+def compare(runs, baseline, max_slowdown):
+    """p50 slowdowns beyond max_slowdown against a baseline report, as messages."""
+    before = {(run["size"], handler): entry["p50_ms"]
+              for run in baseline["runs"] for handler, entry in run["handlers"].items()}
+    violations = []
+    for run in runs:
+        for handler, entry in run["handlers"].items():
+            old = before.get((run["size"], handler))
+            if not old:
+                continue
+            change = (entry["p50_ms"] - old) / old
+            print(f"  {run['size']:<3} {handler:<36} p50 {old:9.3f} -> {entry['p50_ms']:9.3f} ms  {change:+7.1%}",
+                  file=sys.stderr)
+            if change > max_slowdown:
+                violations.append(f"{run['size']} {handler}: p50 {old} -> {entry['p50_ms']} ms ({change:+.1%})")
+    return violations
+
+
+if __name__ == '__main__':
+    profile_from_argv()
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--sizes', nargs='+', choices=list(SIZES), default=["S", "M"])
+    parser.add_argument('--catalog', action='append', help="Catalog TSV (repeatable)")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed passes over the catalog per size")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Write results JSON here (default: stdout)")
+    parser.add_argument('--budget', help="JSON budget of per-size, per-handler limits")
+    parser.add_argument('--compare', help="Baseline results JSON to compare p50 latency against")
+    parser.add_argument('--max-slowdown', type=float, default=DEFAULT_MAX_SLOWDOWN)
+    parser.add_argument('--save-fixtures', help="Also write each fixture as <dir>/tenant_<size>.json")
+    parser.add_argument('--cost-model', help="Record evaluation times into this observed-cost model")
+    args = parser.parse_args()
+
+    cost_model = RuleCostModel(args.cost_model) if args.cost_model else None
+
+    rules = unique_rules(load_catalog(args.catalog))
+    commit, dirty = git_commit()
+    report = {"commit": commit, "dirty": dirty, "python": sys.version.split()[0], "repeat": args.repeat,
+              "seed": args.seed, "rules": len(rules), "runs": []}
+    for size in args.sizes:
+        started = time.perf_counter()
+        tracemalloc.start()
+        instance = tenant_fixture(rules, size, args.seed)
+        fixture_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        build_seconds = time.perf_counter() - started
+        print(f"{size}: fixture built in {build_seconds:.1f}s ({fixture_bytes / 1e6:.0f} MB)", file=sys.stderr)
+        if args.save_fixtures:
+            os.makedirs(args.save_fixtures, exist_ok=True)
+            with open(os.path.join(args.save_fixtures, f"tenant_{size}.json"), 'w', encoding='utf-8') as f:
+                json.dump(instance, f)
+        report["runs"].append({
+            "size": size,
+            "records": {k: v for k, v in SIZES[size].items() if k != "list_items"},
+            "fixture_bytes": fixture_bytes,
+            "fixture_build_seconds": round(build_seconds, 3),
+            "handlers": bench_handlers(rules, instance, args.repeat, cost_model=cost_model, size_class=size),
+        })
+        del instance
+    if cost_model is not None:
+        cost_model.save()
+        print(f"Observed costs recorded in {args.cost_model}", file=sys.stderr)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+        print(f"Results written to {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+    violations = []
+    if args.budget:
+        with open(args.budget, 'r', encoding='utf-8') as f:
+            violations += check_budget(report["runs"], json.load(f))
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            violations += compare(report["runs"], json.load(f), args.max_slowdown)
+    for violation in violations:
+        print(f"BUDGET EXCEEDED: {violation}", file=sys.stderr)
+    if violations:
+        sys.exit(1)
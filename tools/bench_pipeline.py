@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Benchmark the description pipeline stage by stage on synthetic catalogs.
+
+For each size, synthetic_catalog.py generates an input TSV, and each stage
+then runs on the previous stage's output:
+
+    parse        csv-read the input TSV and locate the header (as process_tsv does)
+    extract      generate_cursor_descriptions.extract_purpose_impact per description
+    enhance      generate_cursor_description plus process_new_136_rules.generate_enhanced_description
+    write        csv-write the processed layout with the Cursor column
+    refine       apply_rule_refinements.apply_refinements, then
+                 enhance_all_rule_descriptions.enhance_descriptions, in place
+    process_tsv  generate_cursor_descriptions.process_tsv end to end
+    process_rules process_new_136_rules.process_rules end to end
+
+Timings are the best and median of --repeat runs, without tracing. Peak
+memory comes from one extra tracemalloc pass per stage, so tracing does not
+inflate the timings. The pipeline's own prints go to os.devnull.
+
+Results are JSON with the git commit, Python version and per-stage seconds,
+rows/s and peak bytes. --compare reads an earlier results file and fails
+(exit 1) when a stage's best time grew by more than --max-slowdown.
+
+Usage:
+    python tools/bench_pipeline.py --rows 1000 10000 --output bench/HEAD.json
+    python tools/bench_pipeline.py --rows 10000 --stages extract enhance --compare bench/main.json
+"""
+
+import argparse
+import contextlib
+import csv
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from apply_rule_refinements import apply_refinements
+from enhance_all_rule_descriptions import enhance_descriptions
+from generate_cursor_descriptions import extract_purpose_impact, generate_cursor_description, process_tsv
+from process_new_136_rules import generate_enhanced_description, get_code_reference, process_rules
+from profiling import profile_from_argv
+from rule_catalog import COLUMN_MAP
+from rule_record import RuleRecord
+from synthetic_catalog import PROCESSED_HEADER, write_catalog
+
+STAGES = ["parse", "extract", "enhance", "write", "refine", "process_tsv", "process_rules"]
+DEFAULT_MAX_SLOWDOWN = 0.10
+
+
+def git_commit():
+    """(commit, dirty) of the working tree, or (None, None) outside git."""
+    root = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=root, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=root,
+                                capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit, bool(status.strip())
+
+
+class Pipeline:
+    """Stage callables over one synthetic input, each consuming the previous stage's output."""
+
+    def __init__(self, input_path, workdir):
+        self.input_path = input_path
+        self.processed_path = os.path.join(workdir, 'processed.tsv')
+        self.scratch_path = os.path.join(workdir, 'scratch.tsv')
+        self.header = self.rows = self.records = self.extracted = self.processed = None
+
+    def parse(self):
+        with open(self.input_path, 'r', newline='', encoding='utf-8') as f:
+            rows = list(csv.reader(f, delimiter='\t'))
+        start = next(i for i, cols in enumerate(rows) if 'SKU' in cols)
+        self.header, self.rows = rows[start], rows[start + 1:]
+        return len(self.rows)
+
+    def extract(self):
+        column = self.header.index('Description')
+        self.extracted = [extract_purpose_impact(cols[column]) for cols in self.rows]
+        return len(self.extracted)
+
+    def enhance(self):
+        fields = [COLUMN_MAP.get(col.strip()) for col in self.header]
+        self.records = [RuleRecord.from_columns(fields, cols) for cols in self.rows]
+        self.processed = []
+        for row in self.records:
+            rule_id = row.rule_id
+            self.processed.append([
+                row.sku, row.product_area, row.rule_name, rule_id, row.config_reference,
+                row.description, generate_cursor_description(row), get_code_reference(rule_id),
+                row.current_feature_id, row.current_feature_name, row.action, row.new_feature,
+                generate_enhanced_description(rule_id, row.rule_name, row.description, row.product_area),
+            ])
+        return len(self.processed)
+
+    def write(self):
+        with open(self.processed_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f, delimiter='\t')
+            writer.writerow(PROCESSED_HEADER)
+            writer.writerows(self.processed)
+        return len(self.processed)
+
+    def refine(self):
+        apply_refinements(self.processed_path, self.processed_path, audit_dir=None)
+        enhance_descriptions(self.processed_path, self.processed_path)
+        return len(self.processed)
+
+    def process_tsv(self):
+        process_tsv(self.input_path, self.scratch_path)
+        return len(self.rows)
+
+    def process_rules(self):
+        process_rules(self.input_path, self.scratch_path)
+        return len(self.rows)
+
+
+def run_stage(stage, quiet):
+    """(seconds, rows) for one call of a stage."""
+    with contextlib.redirect_stdout(quiet):
+        started = time.perf_counter()
+        rows = stage()
+        return time.perf_counter() - started, rows
+
+
+def bench_size(rows, stages, repeat, seed, workdir):
+    """Per-stage timing and peak memory for one synthetic catalog size."""
+    input_path = os.path.join(workdir, f'input_{rows}.tsv')
+    input_bytes = write_catalog(input_path, rows, seed)
+    pipeline = Pipeline(input_path, workdir)
+    # Every stage depends on the ones before it, so run the prefix once untimed.
+    needed = STAGES[:max(STAGES.index(s) for s in stages) + 1]
+    results = {}
+    with open(os.devnull, 'w') as quiet:
+        for name in needed:
+            stage = getattr(pipeline, name)
+            if name not in stages:
+                run_stage(stage, quiet)
+                continue
+            times = [run_stage(stage, quiet)[0] for _ in range(repeat)]
+            tracemalloc.start()
+            tracemalloc.reset_peak()
+            _, processed = run_stage(stage, quiet)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            best = min(times)
+            results[name] = {
+                "seconds": round(best, 6),
+                "median_seconds": round(statistics.median(times), 6),
+                "rows_per_second": round(processed / best, 1) if best else None,
+                "peak_bytes": peak,
+            }
+            print(f"  {rows:>9,} rows  {name:<13} {best:8.3f}s  {processed / best if best else 0:>12,.0f} rows/s  "
+                  f"peak {peak / 1e6:8.1f} MB", file=sys.stderr)
+    return {"rows": rows, "input_bytes": input_bytes, "stages": results}
+
+
+def compare(current, baseline, max_slowdown):
+    """Slowdowns beyond max_slowdown as (rows, stage, before, after) tuples."""
+    before = {(run["rows"], name): stage["seconds"]
+              for run in baseline["runs"] for name, stage in run["stages"].items()}
+    regressions = []
+    for run in current["runs"]:
+        for name, stage in run["stages"].items():
+            old = before.get((run["rows"], name))
+            if old is None:
+                continue
+            change = (stage["seconds"] - old) / old if old else 0.0
+            print(f"  {run['rows']:>9,} rows  {name:<13} {old:8.3f}s -> {stage['seconds']:8.3f}s  {change:+7.1%}",
+                  file=sys.stderr)
+            if change > max_slowdown:
+                regressions.append((run["rows"], name, old, stage["seconds"]))
+    return regressions
+
+
+if __name__ == '__main__':
+    profile_from_argv()
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000], help="Catalog sizes (1k-1M)")
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES)
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per stage")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Write results JSON here (default: stdout)")
+    parser.add_argument('--compare', help="Baseline results JSON to compare against")
+    parser.add_argument('--max-slowdown', type=float, default=DEFAULT_MAX_SLOWDOWN,
+                        help="Allowed relative slowdown per stage with --compare")
+    args = parser.parse_args()
+
+    commit, dirty = git_commit()
+    report = {
+        "commit": commit,
+        "dirty": dirty,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "seed": args.seed,
+        "runs": [],
+    }
+    with tempfile.TemporaryDirectory(prefix='bench_pipeline_') as workdir:
+        for rows in args.rows:
+            report["runs"].append(bench_size(rows, args.stages, args.repeat, args.seed, workdir))
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+        print(f"Results written to {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"Compared with {(baseline.get('commit') or 'baseline')[:12]}:", file=sys.stderr)
+        regressions = compare(report, baseline, args.max_slowdown)
+        if regressions:
+            for rows, name, old, new in regressions:
+                print(f"REGRESSION: {name} at {rows:,} rows {old:.3f}s -> {new:.3f}s", file=sys.stderr)
+            sys.exit(1)
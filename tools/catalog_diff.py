@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Keyed diff between two versions of a rule catalog TSV, written as an applicable patch.
+
+documentation/ keeps several versions of the catalog side by side: _v2,
+_v3, the input catalogs and the cursor-description exports. Rows are matched
+by Rule ID, not by line, so a reordered or re-sorted catalog shows only its
+real edits. The base version is indexed in a hash table and the target
+version is streamed against it, so a diff is linear in the two files'
+size. Only the base rows are held in memory.
+
+Columns are compared by rule field, not position. Headers are mapped through
+rule_catalog.COLUMN_MAP, so "Description" in one layout matches
+"Original Description" in another. Columns COLUMN_MAP does not know are
+compared by their header name. Rows shifted one column left are realigned
+first, the same way rule_catalog reads them. A Rule ID that occurs on several
+rows (one rule mapped to several features) is keyed by its occurrence:
+rule_id, rule_id#2, ... so removing or reordering one of its rows shows as
+edits to its siblings. Rows without a Rule ID are keyed #1, #2, ... in file
+order.
+
+The patch is JSON Lines. The first line describes the two versions, and
+each following line is one edit:
+
+    {"format": "rule-catalog-patch/1", "key": "rule_id",
+     "base": {"name": ..., "sha256": ..., "rows": ..., "fields": [...]},
+     "target": {...}, "columns": {"added": [...], "removed": [...]}}
+    {"op": "change", "key": "valid_manager_email",
+     "changes": {"description": ["old text", "new text"]}}
+    {"op": "add", "key": "new_rule", "after": "previous_rule", "row": {...}}
+    {"op": "remove", "key": "old_rule", "row": {...}}
+
+"after" is the key of the row the added row follows in the target (null for
+the first row). apply_rule_refinements.py --patch applies a patch to a
+catalog in one streaming pass.
+
+Usage:
+    python tools/catalog_diff.py documentation/TA_TM_PCS_product_health_rules_v2.tsv \\
+        documentation/TA_TM_PCS_product_health_rules_v3.tsv
+    python tools/catalog_diff.py base.tsv target.tsv --patch v2-to-v3.patch.jsonl --show-values
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import re
+import sys
+from collections import Counter
+
+from profiling import profile_from_argv
+from rule_catalog import COLUMN_MAP, align_columns, alignment_indices
+
+PATCH_FORMAT = "rule-catalog-patch/1"
+
+# Header cell that marks the header row (some inputs start with a title row)
+HEADER_MARKER = "Rule ID"
+
+# Free-text fields whose numeric thresholds are reported separately
+TEXT_FIELDS = ("description", "cursor_description", "updated_description", "updates")
+
+# "75%", ">= 90 percent", "30 days", "24 hours", "5 minutes"
+THRESHOLD_PATTERN = re.compile(
+    r'(?:[<>]=?|[≤≥]|at least|at most|more than|less than|over|under)?\s*'
+    r'\d+(?:\.\d+)?\s*(?:%|percent\b|days?\b|hours?\b|minutes?\b)',
+    re.IGNORECASE,
+)
+
+
+def column_fields(header):
+    """Rule field per header column: the COLUMN_MAP name, else the header text (None for blank headers).
+
+    A column that maps to a field an earlier column already took keeps its
+    header text, so no two columns share a field.
+    """
+    fields = []
+    for name in header:
+        name = name.strip()
+        field = COLUMN_MAP.get(name) or name or None
+        fields.append(name if field in fields else field)
+    return fields
+
+
+def row_key(rule_id, occurrence):
+    """Key of the occurrence-th row (1-based) carrying a Rule ID."""
+    if not rule_id:
+        return f"#{occurrence}"
+    return rule_id if occurrence == 1 else f"{rule_id}#{occurrence}"
+
+
+def thresholds(text):
+    """Numeric thresholds mentioned in a description, normalized for comparison."""
+    return [re.sub(r'\s+', ' ', match.strip().lower()) for match in THRESHOLD_PATTERN.findall(text or '')]
+
+
+class CatalogReader:
+    """One streaming pass over a catalog TSV file object.
+
+    The constructor reads up to the header row; text before it is kept in
+    preamble. Iterating yields (key, values, cols, raw) per record:
+    values maps each field to its stripped cell, cols are the realigned
+    cells, and raw is the record's exact text, so unchanged records can be
+    copied through byte for byte. Blank records have key None.
+    """
+
+    def __init__(self, f, name=None):
+        self.name = name or getattr(f, 'name', '<catalog>')
+        self.digest = hashlib.sha256()
+        self.rows = 0
+        self._lines = []
+        self._reader = csv.reader(self._tap(f), delimiter='\t')
+        self.preamble = ''
+        for cols, raw in self._records():
+            if HEADER_MARKER in (c.strip() for c in cols):
+                self.header, self.header_raw = cols, raw
+                break
+            self.preamble += raw
+        else:
+            raise ValueError(f"{self.name}: no header row with a {HEADER_MARKER!r} column")
+        self.fields = column_fields(self.header)
+
+    def _tap(self, f):
+        for line in f:
+            self.digest.update(line.encode('utf-8'))
+            self._lines.append(line)
+            yield line
+
+    def _records(self):
+        for cols in self._reader:
+            raw = ''.join(self._lines)
+            self._lines.clear()
+            yield cols, raw
+
+    def __iter__(self):
+        occurrences = Counter()
+        fields = self.fields
+        indices = alignment_indices(fields)
+        for cols, raw in self._records():
+            if not any(c.strip() for c in cols):
+                yield None, None, cols, raw
+                continue
+            cols = align_columns(fields, cols, *indices)
+            values = {field: (cols[i].strip() if i < len(cols) else '')
+                      for i, field in enumerate(fields) if field}
+            rule_id = values.get("rule_id", "")
+            occurrences[rule_id] += 1
+            self.rows += 1
+            yield row_key(rule_id, occurrences[rule_id]), values, cols, raw
+
+    def info(self):
+        """Name, checksum, row count and fields (after a full pass)."""
+        return {
+            "name": os.path.basename(self.name),
+            "sha256": self.digest.hexdigest(),
+            "rows": self.rows,
+            "fields": [field for field in self.fields if field],
+        }
+
+
+def diff_catalogs(base_path, target_path):
+    """(patch header, edits) turning the base catalog into the target."""
+    with open(base_path, 'r', encoding='utf-8', newline='') as f:
+        base = CatalogReader(f)
+        index = {key: values for key, values, _, _ in base if key is not None}
+    edits = []
+    with open(target_path, 'r', encoding='utf-8', newline='') as f:
+        target = CatalogReader(f)
+        shared = [field for field in target.fields if field and field in base.fields]
+        previous = None
+        for key, values, _, _ in target:
+            if key is None:
+                continue
+            old = index.pop(key, None)
+            if old is None:
+                edits.append({"op": "add", "key": key, "after": previous, "row": values})
+            else:
+                changes = {field: [old[field], values[field]] for field in shared if old[field] != values[field]}
+                if changes:
+                    edits.append({"op": "change", "key": key, "changes": changes})
+            previous = key
+    edits.extend({"op": "remove", "key": key, "row": values} for key, values in index.items())
+    base_info, target_info = base.info(), target.info()
+    header = {
+        "format": PATCH_FORMAT,
+        "key": "rule_id",
+        "base": base_info,
+        "target": target_info,
+        "columns": {
+            "added": [field for field in target_info["fields"] if field not in base_info["fields"]],
+            "removed": [field for field in base_info["fields"] if field not in target_info["fields"]],
+        },
+    }
+    return header, edits
+
+
+def write_patch(path, header, edits):
+    """Write a patch as JSON Lines, atomically."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for entry in [header] + edits:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+    os.replace(tmp_path, path)
+
+
+def read_patch(path):
+    """(header, edits) from a patch file."""
+    with open(path, 'r', encoding='utf-8') as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    if not entries or entries[0].get("format") != PATCH_FORMAT:
+        raise ValueError(f"{path} is not a {PATCH_FORMAT} patch")
+    return entries[0], entries[1:]
+
+
+def threshold_changes(edits):
+    """(key, field, old thresholds, new thresholds) for changed descriptions whose numbers moved."""
+    moved = []
+    for edit in edits:
+        if edit["op"] != "change":
+            continue
+        for field in TEXT_FIELDS:
+            if field in edit["changes"]:
+                old, new = (thresholds(text) for text in edit["changes"][field])
+                if old != new:
+                    moved.append((edit["key"], field, old, new))
+    return moved
+
+
+def summarize(header, edits, show_values=False, out=sys.stdout):
+    """Print a per-column report of a diff."""
+    ops = Counter(edit["op"] for edit in edits)
+    columns = Counter(field for edit in edits if edit["op"] == "change" for field in edit["changes"])
+    base, target = header["base"], header["target"]
+    print(f"{base['name']} ({base['rows']} rows) -> {target['name']} ({target['rows']} rows)", file=out)
+    print(f"  {ops['add']} added, {ops['remove']} removed, {ops['change']} changed", file=out)
+    for label in ("added", "removed"):
+        if header["columns"][label]:
+            print(f"  Columns {label}: {', '.join(header['columns'][label])}", file=out)
+    if columns:
+        print("  Changed rules per column:", file=out)
+        for field, count in columns.most_common():
+            print(f"    {field:<28} {count}", file=out)
+    moved = threshold_changes(edits)
+    if moved:
+        print("  Threshold changes:", file=out)
+        for key, field, old, new in moved:
+            print(f"    {key} ({field}): {', '.join(old) or '-'} -> {', '.join(new) or '-'}", file=out)
+    for op, sign in (("add", "+"), ("remove", "-"), ("change", "~")):
+        keys = [edit for edit in edits if edit["op"] == op]
+        if keys:
+            print(f"\n{sign} {len(keys)} {op}{'d' if op.endswith('e') else 'ed'}:", file=out)
+        for edit in keys:
+            if op == "change":
+                print(f"  {edit['key']}: {', '.join(edit['changes'])}", file=out)
+                if show_values:
+                    for field, (old, new) in edit["changes"].items():
+                        print(f"      {field}: {old[:100]!r}\n{'':>{len(field) + 6}}-> {new[:100]!r}", file=out)
+            else:
+                print(f"  {edit['key']}  {edit['row'].get('rule_name', '')}", file=out)
+
+
+if __name__ == '__main__':
+    profile_from_argv()
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('base', help="Older catalog TSV")
+    parser.add_argument('target', help="Newer catalog TSV")
+    parser.add_argument('--patch', help="Write the edits as a patch file (JSON Lines)")
+    parser.add_argument('--show-values', action='store_true', help="Print old and new values of changed cells")
+    args = parser.parse_args()
+
+    header, edits = diff_catalogs(args.base, args.target)
+    summarize(header, edits, args.show_values)
+    if args.patch:
+        write_patch(args.patch, header, edits)
+        print(f"Wrote {len(edits)} edits to {args.patch}", file=sys.stderr)
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Checkpoint readiness across many instances, with rule bitmasks.
+
+RAG_KNOWLEDGE_BASE.md groups health rules into four delivery checkpoints
+(1 Pre-project Readiness, 2 Design Review, 3 Build Review, 4 Pre-cutover
+Review). Each checkpoint becomes a bitmask over the catalog's rule index.
+Each instance's passing rules become a bitset of the same width, packed into
+uint64 words. For every instance and checkpoint, one vectorized pass then
+gives:
+
+- passed:   every rule of the checkpoint passes
+- ready:    every rule of this and all earlier checkpoints passes
+- pass_pct: share of the checkpoint's rules passing, where >= 90% is
+            "acceptable" per the Go-Live Readiness Checklist
+
+Checkpoint items whose rule is not in the catalog are listed as unmapped
+and left out of the masks.
+
+Usage:
+    python tools/checkpoint_readiness.py results/*.jsonl --checkpoint 4
+    python tools/checkpoint_readiness.py --store .rule_results --date 2026-01-15 --output readiness.tsv
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from profiling import profile_from_argv
+from rule_catalog import load_catalog, unique_rules
+
+CHECKPOINTS = {
+    1: "Pre-project Readiness",
+    2: "Design Review",
+    3: "Build Review",
+    4: "Pre-cutover Review",
+}
+
+# RAG_KNOWLEDGE_BASE.md checkpoint item -> catalog rule ID (None: no catalog rule yet)
+CHECKPOINT_RULES = {
+    "1.03": "talent_lake_provisioned",
+    "2.01": "scheduling_integration_configured_cs",
+    "2.02": "all_job_req_templates_in_stage_transition_map",
+    "2.03": "stagemap_hired",
+    "2.04": "add_application_sources_referral",
+    "2.05": "custom_domain_configured_cs",
+    "2.06": "employee_hiring_bands",
+    "2.07": "job_bands",
+    "2.08": "hiring_band_equivalence",
+    "2.09": "data_retention_config",
+    "2.10": "source_ats_sync_configured_cs",
+    "2.11": "pcs_logo_configured_cs",
+    "3.01": "employee_location_quality",
+    "3.02": "employee_levels_in_internal_mobility_config_quality",
+    "3.03": "pcsx_base_enabled_cs",
+    "3.04": None,  # SSO configured (sso_config); no catalog rule
+    "3.05": "position_hiring_band_data_quality",
+    "3.06": "role_levels_in_internal_mobility_config_quality",
+    "4.01": "email_config_enabled_cs",
+}
+
+ACCEPTABLE_PASS_PCT = 90
+
+
+def popcount(words):
+    """Set bits per element of a uint64 array."""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(words)
+    bits = np.unpackbits(words[..., None].view(np.uint8), axis=-1)
+    return bits.sum(axis=-1, dtype=np.uint8)
+
+
+class CheckpointMasks:
+    """Catalog rule index plus one bitmask per checkpoint."""
+
+    def __init__(self, rules):
+        self.rule_ids = [r["rule_id"] for r in unique_rules(rules)]
+        self.index = {rule_id: i for i, rule_id in enumerate(self.rule_ids)}
+        self.words = (len(self.rule_ids) + 63) // 64
+        self.checkpoints = sorted(CHECKPOINTS)
+        self.masks = np.zeros((len(self.checkpoints), self.words), dtype=np.uint64)
+        self.unmapped = []
+        for item, rule_id in CHECKPOINT_RULES.items():
+            row = self.checkpoints.index(int(item.split('.')[0]))
+            if rule_id in self.index:
+                self.set_bit(self.masks[row], self.index[rule_id])
+            else:
+                self.unmapped.append(item)
+        self.rule_counts = popcount(self.masks).sum(axis=1)
+        # Cumulative masks: checkpoint N requires every rule up to N.
+        self.cumulative = np.bitwise_or.accumulate(self.masks, axis=0)
+
+    @staticmethod
+    def set_bit(words, position):
+        words[position >> 6] |= np.uint64(1) << np.uint64(position & 63)
+
+    def bitsets(self, passing):
+        """(instances, words) bitsets from {group_id: iterable of passing rule IDs}."""
+        group_ids = list(passing)
+        rows, positions = [], []
+        for row, group_id in enumerate(group_ids):
+            for rule_id in passing[group_id]:
+                position = self.index.get(rule_id)
+                if position is not None:
+                    rows.append(row)
+                    positions.append(position)
+        bits = np.zeros((len(group_ids), self.words), dtype=np.uint64)
+        positions = np.asarray(positions, dtype=np.uint64)
+        np.bitwise_or.at(bits, (np.asarray(rows, dtype=np.intp), (positions >> np.uint64(6)).astype(np.intp)),
+                         np.uint64(1) << (positions & np.uint64(63)))
+        return group_ids, bits
+
+    def evaluate(self, bits):
+        """(passed, ready, pass_pct) arrays of shape (instances, checkpoints)."""
+        hits = bits[:, None, :] & self.masks[None, :, :]
+        passed = (hits == self.masks[None, :, :]).all(axis=2)
+        ready = ((bits[:, None, :] & self.cumulative[None, :, :]) == self.cumulative[None, :, :]).all(axis=2)
+        counts = popcount(hits).sum(axis=2)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            pass_pct = np.where(self.rule_counts > 0, 100.0 * counts / self.rule_counts, np.nan)
+        return passed, ready, pass_pct
+
+
+def passing_from_results(paths):
+    """{group_id: set of passing rule IDs} from result JSONL files (latest record wins)."""
+    statuses = {}
+    for path in paths:
+        default_group = os.path.splitext(os.path.basename(path))[0]
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    statuses.setdefault(record.get("group_id", default_group), {})[record["rule_id"]] = record["status"]
+    return {g: {r for r, s in rules.items() if s == "pass"} for g, rules in statuses.items()}
+
+
+def passing_from_store(store_dir, date):
+    """{group_id: set of passing rule IDs} for one day of the rule results store."""
+    from rule_results_store import PASS, RuleResultsStore
+    store = RuleResultsStore(store_dir)
+    date = date or store.dates()[-1]
+    passing = {}
+    for group_id in store.group_ids(date):
+        codes = np.flatnonzero(store.status_vector(date, group_id) == PASS)
+        passing[group_id] = {store.rule_ids[c] for c in codes}
+    return passing
+
+
+if __name__ == '__main__':
+    profile_from_argv()
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('results', nargs='*', help="Rule result JSONL files")
+    parser.add_argument('--store', help="Read one day from the rule results store instead")
+    parser.add_argument('--date', help="Store date (default: latest)")
+    parser.add_argument('--catalog', action='append', help="Catalog TSV (repeatable)")
+    parser.add_argument('--checkpoint', type=int, choices=sorted(CHECKPOINTS), help="List instances ready for it")
+    parser.add_argument('--output', help="Write per-instance readiness as TSV")
+    args = parser.parse_args()
+    if not args.results and not args.store:
+        parser.error("give result files or --store")
+
+    masks = CheckpointMasks(load_catalog(args.catalog))
+    if masks.unmapped:
+        print(f"Checkpoint items without a catalog rule: {', '.join(masks.unmapped)}", file=sys.stderr)
+    passing = passing_from_store(args.store, args.date) if args.store else passing_from_results(args.results)
+
+    started = time.perf_counter()
+    group_ids, bits = masks.bitsets(passing)
+    packed = time.perf_counter()
+    passed, ready, pass_pct = masks.evaluate(bits)
+    evaluated = time.perf_counter()
+
+    print(f"Evaluated {len(group_ids)} instances in {1000 * (evaluated - packed):.1f} ms "
+          f"(bitsets packed in {1000 * (packed - started):.1f} ms)")
+    for column, checkpoint in enumerate(masks.checkpoints):
+        acceptable = int((pass_pct[:, column] >= ACCEPTABLE_PASS_PCT).sum())
+        print(f"  Checkpoint {checkpoint} ({CHECKPOINTS[checkpoint]}, {masks.rule_counts[column]} rules): "
+              f"{int(passed[:, column].sum())} passed, {acceptable} >= {ACCEPTABLE_PASS_PCT}%, "
+              f"{int(ready[:, column].sum())} ready")
+
+    if args.checkpoint:
+        column = masks.checkpoints.index(args.checkpoint)
+        ready_ids = [g for g, is_ready in zip(group_ids, ready[:, column]) if is_ready]
+        print(f"\nReady for Checkpoint {args.checkpoint}: {len(ready_ids)}")
+        for group_id in ready_ids:
+            print(f"  - {group_id}")
+
+    if args.output:
+        with open(args.output, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f, delimiter='\t')
+            header = ['group_id']
+            for checkpoint in masks.checkpoints:
+                header += [f'cp{checkpoint}_passed', f'cp{checkpoint}_pass_pct', f'cp{checkpoint}_ready']
+            writer.writerow(header)
+            for row, group_id in enumerate(group_ids):
+                values = [group_id]
+                for column in range(len(masks.checkpoints)):
+                    values += [bool(passed[row, column]), round(float(pass_pct[row, column]), 1),
+                               bool(ready[row, column])]
+                writer.writerow(values)
+        print(f"Readiness written to {args.output}", file=sys.stderr)
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Local BM25 search over RAG_KNOWLEDGE_BASE.md and the technical reference.
+
+Splits the markdown documents into chunks at every heading (## Security Rules,
+### Checkpoint 3: Build Review, #### employee_level_quality, ...), ignoring
+'#' lines inside code fences. It then builds an inverted index that is
+persisted as JSON next to the documents. Queries load the index and score
+chunks with BM25, so an analysis can pull the few relevant chunks into its
+context instead of whole files. The index is rebuilt automatically when a
+source document changes.
+
+Usage:
+    python tools/doc_search_index.py "webhook sync lag threshold"
+    python tools/doc_search_index.py "checkpoint 3 build review" -k 3 --text
+    python tools/doc_search_index.py --rebuild
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import sys
+import time
+from collections import Counter
+
+from profiling import profile_from_argv
+
+DOCUMENTATION_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'documentation'))
+
+SOURCE_FILES = [
+    os.path.join(DOCUMENTATION_DIR, 'RAG_KNOWLEDGE_BASE.md'),
+    os.path.join(DOCUMENTATION_DIR, 'INSTANCE_HEALTH_RULES_TECHNICAL_REFERENCE.md'),
+]
+INDEX_PATH = os.path.join(DOCUMENTATION_DIR, '.doc_search_index.json')
+INDEX_VERSION = 1
+
+# BM25 parameters
+K1 = 1.5
+B = 0.75
+
+HEADING_PATTERN = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+(?:_[a-z0-9]+)*')
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how", "in", "is", "it",
+    "of", "on", "or", "that", "the", "this", "to", "was", "what", "when", "which", "with",
+}
+
+
+def tokenize(text):
+    """Lowercase terms; snake_case identifiers also yield their parts."""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if '_' in token:
+            tokens.append(token)
+            tokens.extend(part for part in token.split('_') if part not in STOPWORDS)
+        elif token not in STOPWORDS:
+            tokens.append(token)
+    return tokens
+
+
+def chunk_markdown(path):
+    """Split a markdown file at headings into chunks with their heading path and line range."""
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = f.read().split('\n')
+
+    chunks = []
+    stack = []  # (level, title) of the enclosing headings
+    current = {"heading": [], "start": 1, "lines": []}
+    in_fence = False
+
+    def close(end_line):
+        if any(line.strip() for line in current["lines"]):
+            chunks.append({
+                "file": os.path.basename(path),
+                "heading": current["heading"],
+                "start_line": current["start"],
+                "end_line": end_line,
+                "text": '\n'.join(current["lines"]).strip(),
+            })
+
+    for number, line in enumerate(lines, start=1):
+        if line.lstrip().startswith('```'):
+            in_fence = not in_fence
+        match = None if in_fence else HEADING_PATTERN.match(line)
+        if match:
+            close(number - 1)
+            level = len(match.group(1))
+            while stack and stack[-1][0] >= level:
+                stack.pop()
+            stack.append((level, match.group(2)))
+            current = {"heading": [title for _, title in stack], "start": number, "lines": [line]}
+        else:
+            current["lines"].append(line)
+    close(len(lines))
+    return chunks
+
+
+def source_signature(paths):
+    """Size and mtime of every source, to detect a stale index."""
+    return {os.path.basename(p): [os.path.getsize(p), int(os.path.getmtime(p))] for p in paths}
+
+
+def build_index(paths=None):
+    """Chunk the sources and build the inverted index."""
+    paths = paths or SOURCE_FILES
+    chunks = []
+    for path in paths:
+        chunks.extend(chunk_markdown(path))
+
+    postings = {}
+    lengths = []
+    for chunk_id, chunk in enumerate(chunks):
+        # The heading path is indexed with the body so parent context matches.
+        counts = Counter(tokenize(' '.join(chunk["heading"]) + '\n' + chunk["text"]))
+        lengths.append(sum(counts.values()))
+        for term, tf in counts.items():
+            postings.setdefault(term, []).append([chunk_id, tf])
+
+    return {
+        "version": INDEX_VERSION,
+        "sources": source_signature(paths),
+        "source_paths": paths,
+        "chunks": chunks,
+        "lengths": lengths,
+        "avg_length": sum(lengths) / len(lengths) if lengths else 0.0,
+        "postings": postings,
+    }
+
+
+def save_index(index, path=INDEX_PATH):
+    """Persist the index as compact JSON."""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def load_index(path=INDEX_PATH, paths=None, rebuild=False):
+    """Load the persisted index, rebuilding it if missing or stale."""
+    paths = paths or SOURCE_FILES
+    if not rebuild and os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get("version") == INDEX_VERSION and index.get("sources") == source_signature(paths):
+            return index
+    index = build_index(paths)
+    save_index(index, path)
+    return index
+
+
+def search(index, query, k=5):
+    """Top-k (score, chunk) pairs for a query by BM25."""
+    n_chunks = len(index["chunks"])
+    lengths = index["lengths"]
+    avg_length = index["avg_length"] or 1.0
+    scores = {}
+    for term in set(tokenize(query)):
+        postings = index["postings"].get(term)
+        if not postings:
+            continue
+        idf = math.log(1 + (n_chunks - len(postings) + 0.5) / (len(postings) + 0.5))
+        for chunk_id, tf in postings:
+            norm = K1 * (1 - B + B * lengths[chunk_id] / avg_length)
+            scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * (K1 + 1) / (tf + norm)
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+    return [(round(score, 4), index["chunks"][chunk_id]) for chunk_id, score in ranked]
+
+
+if __name__ == '__main__':
+    profile_from_argv()
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('query', nargs='?', help="Search terms")
+    parser.add_argument('-k', type=int, default=5, help="Number of chunks to return")
+    parser.add_argument('--text', action='store_true', help="Print the chunk text")
+    parser.add_argument('--json', action='store_true', help="Emit results as JSONL")
+    parser.add_argument('--index', default=INDEX_PATH, help="Index file location")
+    parser.add_argument('--rebuild', action='store_true', help="Rebuild the index before querying")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    index = load_index(args.index, rebuild=args.rebuild)
+    loaded = time.perf_counter()
+    if not args.query:
+        print(f"Indexed {len(index['chunks'])} chunks, {len(index['postings'])} terms -> {args.index}")
+        sys.exit(0)
+
+    results = search(index, args.query, args.k)
+    searched = time.perf_counter()
+    for score, chunk in results:
+        if args.json:
+            print(json.dumps({"score": score, **chunk}))
+            continue
+        print(f"{score:7.3f}  {chunk['file']}:{chunk['start_line']}-{chunk['end_line']}  {' > '.join(chunk['heading'])}")
+        if args.text:
+            print(chunk["text"] + '\n')
+    print(f"load {1000 * (loaded - started):.1f} ms, search {1000 * (searched - loaded):.2f} ms", file=sys.stderr)
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Offline embedding index for semantic retrieval of rules and documentation chunks.
+
+Every catalog rule is embedded from its Rule Name, Rule ID, Cursor Generated
+Description and Config Reference. Every heading chunk of the RAG knowledge base
+and technical reference (see doc_search_index.py) is embedded too. Vectors are
+stored in a memory-mapped float32 matrix. A query is one matrix-vector product
+followed by an argpartition top-k.
+
+The embedding function is pluggable (--embedder module:function, taking a list
+of texts and returning an (n, dim) array). The default is a hashing-trick
+embedding of unigrams and bigrams. Re-indexing is incremental: vectors are
+reused for any text whose hash is unchanged, so only new or edited rows are
+embedded.
+
+Usage:
+    python tools/embedding_index.py --build
+    python tools/embedding_index.py "which rules catch missing manager data" -k 5
+    python tools/embedding_index.py --build --embedder my_embeddings:embed
+"""
+
+import argparse
+import hashlib
+import importlib
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from doc_search_index import DOCUMENTATION_DIR, SOURCE_FILES, chunk_markdown, tokenize
+from profiling import profile_from_argv
+from rule_catalog import load_catalog, unique_rules
+
+INDEX_DIR = os.path.join(DOCUMENTATION_DIR, '.embedding_index')
+HASHING_DIM = 1024
+
+
+def hashing_embed(texts, dim=HASHING_DIM):
+    """Hashing-trick baseline: signed unigram and bigram counts, L2-normalized."""
+    vectors = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        tokens = tokenize(text)
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        for feature in features:
+            digest = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'little')
+            vectors[row, digest % dim] += 1.0 if digest >> 63 else -1.0
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    np.divide(vectors, norms, out=vectors, where=norms > 0)
+    return vectors
+
+
+def load_embedder(spec):
+    """Resolve 'module:function' to an embedding callable (default: hashing_embed)."""
+    if not spec:
+        return hashing_embed, f"hashing-{HASHING_DIM}"
+    module_name, _, function_name = spec.partition(':')
+    return getattr(importlib.import_module(module_name), function_name or 'embed'), spec
+
+
+def text_hash(text):
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def rule_items(rules):
+    """Index items for catalog rules."""
+    items = []
+    for rule in unique_rules(rules):
+        text = '\n'.join(rule[f] for f in ("rule_name", "rule_id", "cursor_description", "config_reference") if rule[f])
+        items.append({"id": f"rule:{rule['rule_id']}", "kind": "rule", "rule_id": rule["rule_id"], "text": text})
+    return items
+
+
+def doc_items(paths=None):
+    """Index items for documentation heading chunks."""
+    items = []
+    for path in paths or SOURCE_FILES:
+        for chunk in chunk_markdown(path):
+            items.append({
+                "id": f"doc:{chunk['file']}:{chunk['start_line']}",
+                "kind": "doc",
+                "file": chunk["file"],
+                "heading": chunk["heading"],
+                "start_line": chunk["start_line"],
+                "end_line": chunk["end_line"],
+                "text": ' > '.join(chunk["heading"]) + '\n' + chunk["text"],
+            })
+    return items
+
+
+class EmbeddingIndex:
+    """Items plus their vectors in a memory-mapped float32 matrix."""
+
+    def __init__(self, directory=INDEX_DIR):
+        self.directory = directory
+        self.items_path = os.path.join(directory, 'items.json')
+        self.vectors_path = os.path.join(directory, 'vectors.f32')
+        self.items = []
+        self.embedder_name = None
+        self.matrix = None
+
+    def load(self):
+        """Open an existing index; the matrix stays on disk until touched."""
+        if not os.path.exists(self.items_path):
+            return self
+        with open(self.items_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        self.items = meta["items"]
+        self.embedder_name = meta["embedder"]
+        if self.items:
+            self.matrix = np.memmap(self.vectors_path, dtype=np.float32, mode='r',
+                                    shape=(len(self.items), meta["dim"]))
+        return self
+
+    def build(self, items, embed, embedder_name):
+        """(Re)index items, embedding only texts whose hash is new. Returns the embed count."""
+        reusable = {}
+        if self.matrix is not None and self.embedder_name == embedder_name:
+            reusable = {item["text_hash"]: row for row, item in enumerate(self.items)}
+
+        texts = [item.pop("text") for item in items]
+        for item, text in zip(items, texts):
+            item["text_hash"] = text_hash(text)
+        pending = [row for row, item in enumerate(items) if item["text_hash"] not in reusable]
+        fresh = dict(zip(pending, embed([texts[row] for row in pending]))) if pending else {}
+
+        if fresh:
+            dim = next(iter(fresh.values())).shape[0]
+        elif reusable:
+            dim = self.matrix.shape[1]
+        else:
+            # Nothing to embed and no index from this embedder: ask it for its width.
+            dim = np.asarray(embed([""])).shape[1]
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = self.vectors_path + '.tmp'
+        matrix = np.memmap(tmp_path, dtype=np.float32, mode='w+', shape=(max(len(items), 1), dim))
+        for row, item in enumerate(items):
+            matrix[row] = fresh[row] if row in fresh else self.matrix[reusable[item["text_hash"]]]
+        matrix.flush()
+        del matrix
+        os.replace(tmp_path, self.vectors_path)
+
+        with open(self.items_path, 'w', encoding='utf-8') as f:
+            json.dump({"embedder": embedder_name, "dim": dim, "items": items}, f)
+        self.matrix = None
+        self.load()
+        return len(pending)
+
+    def query(self, vector, k=5, kind=None):
+        """Top-k (score, item) by cosine similarity; vectors are unit length."""
+        if self.matrix is None:
+            return []
+        scores = np.asarray(self.matrix @ vector.astype(np.float32))
+        if kind:
+            mask = np.array([item["kind"] != kind for item in self.items])
+            scores[mask] = -np.inf
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(float(scores[i]), self.items[i]) for i in top if np.isfinite(scores[i])]
+
+
+def build_index(directory=INDEX_DIR, embedder=None, catalog=None):
+    """Collect rule and doc items and update the index incrementally."""
+    embed, embedder_name = load_embedder(embedder)
+    items = rule_items(load_catalog(catalog)) + doc_items()
+    index = EmbeddingIndex(directory).load()
+    embedded = index.build(items, embed, embedder_name)
+    return index, embedded
+
+
+if __name__ == '__main__':
+    profile_from_argv()
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('query', nargs='?', help="Natural-language query")
+    parser.add_argument('-k', type=int, default=5)
+    parser.add_argument('--kind', choices=['rule', 'doc'], help="Only return rules or doc chunks")
+    parser.add_argument('--build', action='store_true', help="Embed new or changed rows before querying")
+    parser.add_argument('--embedder', help="Embedding function as module:function (default: hashing trick)")
+    parser.add_argument('--catalog', action='append', help="Catalog TSV (repeatable)")
+    parser.add_argument('--index-dir', default=INDEX_DIR)
+    args = parser.parse_args()
+
+    if args.build or not os.path.exists(os.path.join(args.index_dir, 'items.json')):
+        started = time.perf_counter()
+        index, embedded = build_index(args.index_dir, args.embedder, args.catalog)
+        print(f"Indexed {len(index.items)} items ({embedded} embedded, {len(index.items) - embedded} reused) "
+              f"in {1000 * (time.perf_counter() - started):.0f} ms", file=sys.stderr)
+    else:
+        index = EmbeddingIndex(args.index_dir).load()
+
+    if args.query:
+        embed, embedder_name = load_embedder(args.embedder)
+        if embedder_name != index.embedder_name:
+            sys.exit(f"Index was built with {index.embedder_name}; rebuild with --build to use {embedder_name}")
+        started = time.perf_counter()
+        results = index.query(embed([args.query])[0], args.k, args.kind)
+        elapsed_ms = 1000 * (time.perf_counter() - started)
+        for score, item in results:
+            if item["kind"] == "rule":
+                print(f"{score:6.3f}  rule  {item['rule_id']}")
+            else:
+                print(f"{score:6.3f}  doc   {item['file']}:{item['start_line']}-{item['end_line']}  {' > '.join(item['heading'])}")
+        print(f"query {elapsed_ms:.2f} ms", file=sys.stderr)
@@ -7,6 +7,9 @@ Based on comprehensive Confluence documentation and codebase review.
 import csv
 import os
 
+from instrumentation import METRICS
+from profiling import profile_from_argv
+
 # Enhanced rule descriptions mapping - Rule ID to enhanced description
 ENHANCED_DESCRIPTIONS = {
     # TM - Skill Assessments
@@ -1445,9 +1448,11 @@ ENHANCED_DESCRIPTIONS = {
 def enhance_descriptions(input_file, output_file):
     """Read TSV file and enhance descriptions based on the mapping."""
     
-    with open(input_file, 'r', encoding='utf-8') as f:
+    with METRICS.stage('parse'), open(input_file, 'r', encoding='utf-8') as f:
         reader = csv.reader(f, delimiter='\t')
         rows = list(reader)
+    METRICS.bytes_read('parse', os.path.getsize(input_file))
+    METRICS.count('parse', 'rows', max(len(rows) - 1, 0))
     
     if not rows:
         print("Error: Empty file")
@@ -1480,28 +1485,32 @@ def enhance_descriptions(input_file, output_file):
     # Process each row
     enhanced_count = 0
     not_enhanced = []
-    for i, row in enumerate(rows[1:], start=1):
-        if len(row) <= max(rule_id_idx, cursor_desc_idx):
-            continue
+    with METRICS.stage('enhance'):
+        for i, row in enumerate(rows[1:], start=1):
+            if len(row) <= max(rule_id_idx, cursor_desc_idx):
+                continue
         
-        rule_id = row[rule_id_idx].strip()
-        rule_name = row[rule_name_idx].strip() if rule_name_idx is not None and len(row) > rule_name_idx else ""
+            rule_id = row[rule_id_idx].strip()
+            rule_name = row[rule_name_idx].strip() if rule_name_idx is not None and len(row) > rule_name_idx else ""
         
-        # Try Rule ID first, then Rule Name if Rule ID is empty
-        lookup_key = rule_id if rule_id else rule_name
+            # Try Rule ID first, then Rule Name if Rule ID is empty
+            lookup_key = rule_id if rule_id else rule_name
         
-        if lookup_key in ENHANCED_DESCRIPTIONS:
-            # Replace newlines with <br> for TSV compatibility
-            enhanced = ENHANCED_DESCRIPTIONS[lookup_key].replace('\n\n', '<br><br>').replace('\n', ' ')
-            row[cursor_desc_idx] = enhanced
-            enhanced_count += 1
-        else:
-            not_enhanced.append(f"Row {i+1}: {lookup_key[:50]}...")
+            if lookup_key in ENHANCED_DESCRIPTIONS:
+                # Replace newlines with <br> for TSV compatibility
+                enhanced = ENHANCED_DESCRIPTIONS[lookup_key].replace('\n\n', '<br><br>').replace('\n', ' ')
+                row[cursor_desc_idx] = enhanced
+                enhanced_count += 1
+            else:
+                not_enhanced.append(f"Row {i+1}: {lookup_key[:50]}...")
+    METRICS.count('enhance', 'enhanced', enhanced_count)
+    METRICS.count('enhance', 'not_enhanced', len(not_enhanced))
     
     # Write output
-    with open(output_file, 'w', encoding='utf-8', newline='') as f:
+    with METRICS.stage('write'), open(output_file, 'w', encoding='utf-8', newline='') as f:
         writer = csv.writer(f, delimiter='\t')
         writer.writerows(rows)
+    METRICS.bytes_written('write', os.path.getsize(output_file))
     
     print(f"Enhanced {enhanced_count} rule descriptions")
     print(f"Output written to {output_file}")
@@ -1513,6 +1522,7 @@ def enhance_descriptions(input_file, output_file):
 
 
 if __name__ == "__main__":
+    profile_from_argv()
     input_file = "/home/ec2-user/de_app_1/documentation/PCS_TM_TA_rules_with_cursor_descriptions.tsv"
     output_file = "/home/ec2-user/de_app_1/documentation/PCS_TM_TA_rules_enhanced_v2.tsv"
     
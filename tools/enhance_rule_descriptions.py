@@ -5,9 +5,13 @@ This script generates human-readable, actionable descriptions for Solution Archi
 and Functional Consultants.
 """
 
+import os
 import pandas as pd
 import re
 
+from instrumentation import METRICS
+from profiling import profile_from_argv
+
 # Path to files
 INPUT_FILE = '/home/ec2-user/de_app_1/documentation/PCS_TM_TA_rules_with_cursor_descriptions.tsv'
 OUTPUT_FILE = '/home/ec2-user/de_app_1/documentation/PCS_TM_TA_rules_with_cursor_descriptions.tsv'
@@ -746,7 +750,9 @@ def generate_enhanced_description(rule_id, existing_desc, original_desc):
 def enhance_descriptions():
     """Enhance all rule descriptions in the TSV."""
     # Read the TSV file
-    df = pd.read_csv(INPUT_FILE, sep='\t', dtype=str)
+    with METRICS.stage('parse'):
+        df = pd.read_csv(INPUT_FILE, sep='\t', dtype=str)
+    METRICS.bytes_read('parse', os.path.getsize(INPUT_FILE))
     
     # Find columns
     rule_id_col = None
@@ -780,10 +786,16 @@ def enhance_descriptions():
             print(f"Enhanced: {rule_id}")
             enhanced_count += 1
     
+    METRICS.count('enhance', 'rows', len(df))
+    METRICS.count('enhance', 'enhanced', enhanced_count)
+    
     # Save the updated TSV
-    df.to_csv(OUTPUT_FILE, sep='\t', index=False)
+    with METRICS.stage('write'):
+        df.to_csv(OUTPUT_FILE, sep='\t', index=False)
+    METRICS.bytes_written('write', os.path.getsize(OUTPUT_FILE))
     print(f"\nEnhanced {enhanced_count} descriptions in {OUTPUT_FILE}")
     print(f"Total rules with enhancements available: {len(ENHANCED_DESCRIPTIONS)}")
 
 if __name__ == '__main__':
+    profile_from_argv()
     enhance_descriptions()
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Environment profiles and pruned per-profile rule plans.
+
+Some rules only apply to certain tenants. email_loopback_prod and
+provision_user_accounts_prod apply to production. email_loopback_non_prod
+and is_pcs_seo_optimization_for_sandbox_true apply to sandboxes.
+stage_advance_using_odata and career_site_source_id apply to SuccessFactors
+tenants, and the RAAS list reports to Workday tenants. Rules can also be
+tied to a SKU.
+
+An instance's profile is resolved once from its fixture:
+
+    {"group_id": "acme-sandbox.com", "environment": "sandbox",
+     "skus": ["Talent Intelligence Platform"], "integration": "workday", ...}
+
+"environment" defaults to sandbox when the group_id says so and to prod
+otherwise. A profile without "skus" or "integration" prunes nothing on that
+axis.
+
+compile_plan() turns the catalog into the rules that apply to a profile. A
+rule whose precondition was pruned is pruned too, so its dependents never
+run ungated. Plans are cached in memory and under <repo>/.rule_plans, keyed
+by the profile, PLAN_FORMAT, a hash of the pruning tables below and the
+catalog files' size and mtime. Editing ENVIRONMENT_PATTERNS or
+INTEGRATION_ALIASES therefore recompiles the plans; bump PLAN_FORMAT when
+compile_plan() itself changes. Plans hold the rule rows themselves, so a
+cached plan is served without parsing a catalog TSV. Tenants that share a
+profile share one plan.
+
+Usage:
+    python tools/environment_profile.py instance.json
+    python tools/environment_profile.py instance.json --show-pruned
+    python tools/rule_scheduler.py instance.json --environment-plan
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+
+from profiling import profile_from_argv
+from rule_catalog import CATALOG_FILES, load_catalog, unique_rules
+from rule_evaluation import load_instance, rule_preconditions
+from rule_record import RuleRecord, json_default
+
+DEFAULT_PLAN_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '.rule_plans'))
+
+# Part of every plan cache key; bump when compile_plan() output changes
+PLAN_FORMAT = "environment-plan/1"
+
+ENVIRONMENTS = ("sandbox", "prod")
+
+# Rule ID tokens marking environment-specific rules, checked in order
+# ("non_prod" before "prod")
+ENVIRONMENT_PATTERNS = [
+    ("sandbox", re.compile(r'(^|_)(non_prod|sandbox)(_|$)')),
+    ("prod", re.compile(r'(^|_)prod(_|$)')),
+]
+
+# ATS integration -> names used for it in config references and rule IDs
+INTEGRATION_ALIASES = {
+    "workday": ["workday", "raas"],
+    "successfactors": ["successfactors", "sf", "odata"],
+    "icims": ["icims"],
+    "jobvite": ["jobvite"],
+    "taleo": ["taleo"],
+    "greenhouse": ["greenhouse"],
+}
+
+# "(SuccessFactors)", "(Workday/Taleo/SF/Greenhouse)" or a leading "Workday →"
+INTEGRATION_NOTE_PATTERN = re.compile(r'\(([^)]*)\)|^\s*([A-Za-z]+)\s*→')
+
+
+def normalize_sku(sku):
+    """SKU name with catalog typos folded ("Talent Managment" -> "Talent Management")."""
+    return re.sub(r'\s+', ' ', sku.replace('Managment', 'Management')).strip().lower()
+
+
+def integration_names(text):
+    """Integrations named in a fragment of text."""
+    words = set(re.split(r'[^a-z0-9]+', text.lower()))
+    return {name for name, aliases in INTEGRATION_ALIASES.items() if words & set(aliases)}
+
+
+def rule_environment(rule):
+    """"sandbox" or "prod" for environment-specific rules, else None."""
+    rule_id = rule["rule_id"].lower()
+    for environment, pattern in ENVIRONMENT_PATTERNS:
+        if pattern.search(rule_id):
+            return environment
+    return None
+
+
+def rule_integrations(rule):
+    """Integrations a rule is specific to, or None when it applies to every ATS."""
+    names = set()
+    for note, leading in INTEGRATION_NOTE_PATTERN.findall(rule.get("config_reference", "")):
+        names |= integration_names(note or leading)
+    names |= {name for name in integration_names(rule["rule_id"].replace('_', ' '))
+              if name in ("workday", "successfactors")}
+    return frozenset(names) or None
+
+
+class EnvironmentProfile:
+    """Environment, enabled SKUs and ATS integration of one instance."""
+
+    def __init__(self, environment, skus=None, integration=None):
+        if environment not in ENVIRONMENTS:
+            raise ValueError(f"environment must be one of {', '.join(ENVIRONMENTS)}, not {environment!r}")
+        self.environment = environment
+        self.skus = None if skus is None else frozenset(normalize_sku(s) for s in skus)
+        self.integration = integration.lower().replace(' ', '') if integration else None
+
+    @classmethod
+    def resolve(cls, instance):
+        """Profile of an instance fixture."""
+        environment = instance.get("environment")
+        if environment is None:
+            environment = "sandbox" if "sandbox" in str(instance.get("group_id", "")).lower() else "prod"
+        elif environment not in ENVIRONMENTS:
+            environment = "sandbox" if environment in ("non_prod", "staging", "test") else "prod"
+        return cls(environment, instance.get("skus"), instance.get("integration"))
+
+    def key(self):
+        """Stable identifier; tenants with equal keys share a plan."""
+        skus = ','.join(sorted(self.skus)) if self.skus is not None else '*'
+        return f"{self.environment}|{skus}|{self.integration or '*'}"
+
+    def as_dict(self):
+        return {
+            "environment": self.environment,
+            "skus": sorted(self.skus) if self.skus is not None else None,
+            "integration": self.integration,
+        }
+
+    def exclusion(self, rule):
+        """Why a rule does not apply to this profile, or None if it does."""
+        environment = rule_environment(rule)
+        if environment and environment != self.environment:
+            return f"{environment}-only rule on a {self.environment} instance"
+        if self.skus is not None and rule.get("sku") and normalize_sku(rule["sku"]) not in self.skus:
+            return f"SKU {rule['sku'].strip()} not enabled"
+        integrations = rule_integrations(rule)
+        if self.integration and integrations and self.integration not in integrations:
+            return f"{'/'.join(sorted(integrations))}-only rule on a {self.integration} instance"
+        return None
+
+
+def catalog_signature(paths):
+    """Cheap version of the catalog files (path, size, mtime), without reading them."""
+    stats = []
+    for path in paths:
+        stat = os.stat(path)
+        stats.append(f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}")
+    return hashlib.blake2b('\n'.join(stats).encode('utf-8'), digest_size=8).hexdigest()
+
+
+def pruning_signature():
+    """Hash of the tables compile_plan() prunes by."""
+    tables = [
+        [(environment, pattern.pattern) for environment, pattern in ENVIRONMENT_PATTERNS],
+        INTEGRATION_ALIASES,
+        INTEGRATION_NOTE_PATTERN.pattern,
+    ]
+    return hashlib.blake2b(json.dumps(tables, sort_keys=True).encode('utf-8'), digest_size=8).hexdigest()
+
+
+def compile_plan(rules, profile):
+    """{"profile", "rules": applicable rule rows, "pruned": {rule_id: reason}} for a profile."""
+    rules = unique_rules(rules)
+    pruned = {}
+    for rule in rules:
+        reason = profile.exclusion(rule)
+        if reason:
+            pruned[rule["rule_id"]] = reason
+    # A pruned precondition prunes its dependents (transitively).
+    changed = True
+    while changed:
+        changed = False
+        for rule in rules:
+            if rule["rule_id"] in pruned:
+                continue
+            for precondition in rule_preconditions(rule):
+                if precondition in pruned:
+                    pruned[rule["rule_id"]] = f"precondition {precondition} pruned"
+                    changed = True
+                    break
+    return {
+        "profile": profile.as_dict(),
+        "rules": [rule for rule in rules if rule["rule_id"] not in pruned],
+        "pruned": pruned,
+    }
+
+
+class PlanCache:
+    """Compiled plans per (profile, catalog version), in memory and on disk."""
+
+    def __init__(self, directory=DEFAULT_PLAN_DIR, catalog_paths=None):
+        self.directory = directory
+        self.catalog_paths = catalog_paths or CATALOG_FILES
+        self._plans = {}
+        self.compiled = 0
+
+    def _path(self, key):
+        name = hashlib.blake2b(key.encode('utf-8'), digest_size=8).hexdigest()
+        return os.path.join(self.directory, f"plan-{name}.json")
+
+    def plan(self, profile):
+        """Compiled plan for a profile, compiling the catalog only on a miss."""
+        key = f"{PLAN_FORMAT}|{pruning_signature()}|{profile.key()}|{catalog_signature(self.catalog_paths)}"
+        plan = self._plans.get(key)
+        if plan is not None:
+            return plan
+        if self.directory:
+            try:
+                with open(self._path(key), 'r', encoding='utf-8') as f:
+                    plan = json.load(f)
+                plan["rules"] = [RuleRecord(**rule) for rule in plan["rules"]]
+            except (OSError, ValueError, TypeError):
+                plan = None
+        if plan is None:
+            plan = compile_plan(load_catalog(self.catalog_paths), profile)
+            self.compiled += 1
+            if self.directory:
+                os.makedirs(self.directory, exist_ok=True)
+                tmp_path = self._path(key) + '.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(plan, f, default=json_default)
+                os.replace(tmp_path, self._path(key))
+        self._plans[key] = plan
+        return plan
+
+    def rules_for(self, instance):
+        """Rule rows that apply to an instance."""
+        return self.plan(EnvironmentProfile.resolve(instance))["rules"]
+
+
+if __name__ == '__main__':
+    profile_from_argv()
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('instance', nargs='+', help="Instance fixture JSON")
+    parser.add_argument('--catalog', action='append', help="Catalog TSV (repeatable)")
+    parser.add_argument('--plan-dir', default=DEFAULT_PLAN_DIR, help="On-disk plan cache ('' to disable)")
+    parser.add_argument('--show-pruned', action='store_true', help="List every pruned rule with its reason")
+    args = parser.parse_args()
+
+    cache = PlanCache(args.plan_dir or None, args.catalog)
+    for path in args.instance:
+        instance = load_instance(path)
+        profile = EnvironmentProfile.resolve(instance)
+        plan = cache.plan(profile)
+        print(f"{instance.get('group_id', path)}: {profile.key()}")
+        print(f"  {len(plan['rules'])} rules planned, {len(plan['pruned'])} pruned")
+        if args.show_pruned:
+            for rule_id, reason in sorted(plan["pruned"].items()):
+                print(f"    - {rule_id}: {reason}")
+    print(f"{cache.compiled} plan(s) compiled for {len(args.instance)} instance(s)", file=sys.stderr)
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Evaluate the high-volume operational rules over email and application events.
+
+Covers num_emails_rule, emails_sent_to_employees, unsubscribe_requests_volume_rule,
+num_rejections_rule and application_failures_rule. By default every count is
+exact. With --approximate, per-recipient counts go into a shared count-min
+sketch, distinct recipients into HyperLogLog and fleet-wide daily volume
+distributions into t-digests (error bounds are documented in sketches.py).
+Only the trailing window of daily counts is kept per group. Memory is then
+bounded by the sketch sizes and the number of group_ids, not by event volume.
+
+Event records (JSONL):
+    {"group_id": "acme.com", "ts": "2026-01-12T08:30:00Z", "event_type": "email_sent",
+     "recipient": "jdoe@acme.com", "recipient_type": "employee", "time_sensitive": false}
+    {"group_id": "acme.com", "ts": "2026-01-12", "event_type": "rejection"}
+
+Event types: email_sent, unsubscribe, rejection, application_failure.
+
+Usage:
+    python tools/evaluate_volume_rules.py email_events.jsonl
+    zcat fleet_events.jsonl.gz | python tools/evaluate_volume_rules.py - --approximate
+"""
+
+import argparse
+import json
+import math
+import sys
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+
+from profiling import profile_from_argv
+from sketches import CountMinSketch, HyperLogLog, TDigest, hll_relative_error
+from stream_operational_health import EVENT_ERRORS, parse_timestamp, stream_events
+
+# Rules that flag a day whose count is more than one standard deviation above
+# the average of the previous seven days (technical reference, Security Rules).
+DAILY_SPIKE_RULES = {
+    "num_emails_rule": "email_sent",
+    "unsubscribe_requests_volume_rule": "unsubscribe",
+    "num_rejections_rule": "rejection",
+    "application_failures_rule": "application_failure",
+}
+
+# An employee should not receive more than two non-time-sensitive emails a month.
+EMPLOYEE_EMAIL_RULE = "emails_sent_to_employees"
+MAX_EMPLOYEE_EMAILS_PER_MONTH = 2
+
+HISTORY_DAYS = 7
+DISTRIBUTION_QUANTILES = (0.5, 0.9, 0.99)
+
+
+def spike_threshold(history):
+    """Mean plus one population standard deviation of the history counts."""
+    if not history:
+        return None
+    mean = sum(history) / len(history)
+    variance = sum((count - mean) ** 2 for count in history) / len(history)
+    return mean + math.sqrt(variance)
+
+
+class VolumeRuleEvaluator:
+    """Accumulates event volumes per group_id, exactly or with sketches."""
+
+    def __init__(self, approximate=False, cms_width=1 << 22, cms_depth=4,
+                 hll_precision=12, tdigest_compression=100):
+        self.approximate = approximate
+        self.hll_precision = hll_precision
+        self.tdigest_compression = tdigest_compression
+        # group_id -> event_type -> day_ordinal -> count
+        self.daily_counts = defaultdict(lambda: defaultdict(Counter))
+        self.latest_day = {}
+        if approximate:
+            self.recipient_counts = CountMinSketch(cms_width, cms_depth)
+            self.recipients = {}
+            self.over_limit = {}
+            self.distributions = {}
+        else:
+            self.recipient_counts = Counter()
+            self.recipients = defaultdict(set)
+            self.over_limit = defaultdict(set)
+            self.distributions = defaultdict(list)
+        self.events_processed = 0
+
+    def _hll(self, table, group_id):
+        """Per-group HyperLogLog, created on first use."""
+        sketch = table.get(group_id)
+        if sketch is None:
+            sketch = table[group_id] = HyperLogLog(self.hll_precision)
+        return sketch
+
+    def _record_distribution(self, event_type, count):
+        """Add one finalized daily count to the fleet distribution."""
+        if self.approximate:
+            digest = self.distributions.get(event_type)
+            if digest is None:
+                digest = self.distributions[event_type] = TDigest(self.tdigest_compression)
+            digest.add(count)
+        else:
+            self.distributions[event_type].append(count)
+
+    def process(self, event):
+        """Apply one event record."""
+        group_id = event.get("group_id")
+        event_type = event.get("event_type")
+        if not group_id or not event_type or "ts" not in event:
+            return
+        seconds = parse_timestamp(event["ts"])
+        day = int(seconds // 86400)
+        self.events_processed += 1
+
+        counts = self.daily_counts[group_id][event_type]
+        counts[day] += 1
+        if day > self.latest_day.get(group_id, day - 1):
+            self.latest_day[group_id] = day
+            if self.approximate:
+                self._prune(group_id, day)
+
+        if (event_type == "email_sent" and event.get("recipient_type") == "employee"
+                and not event.get("time_sensitive", False) and event.get("recipient")):
+            month = datetime.fromtimestamp(seconds, tz=timezone.utc).strftime('%Y-%m')
+            self._record_employee_email(group_id, event["recipient"], month)
+
+    def _prune(self, group_id, latest_day):
+        """Finalize daily counts that fell out of the trailing window."""
+        cutoff = latest_day - HISTORY_DAYS
+        for event_type, counts in self.daily_counts[group_id].items():
+            for day in [d for d in counts if d < cutoff]:
+                self._record_distribution(event_type, counts.pop(day))
+
+    def _record_employee_email(self, group_id, recipient, month):
+        """Count a non-time-sensitive email to an employee for its calendar month (YYYY-MM, UTC)."""
+        key = f"{group_id}\t{recipient}\t{month}"
+        if self.approximate:
+            count = self.recipient_counts.add(key)
+            self._hll(self.recipients, group_id).add(recipient)
+            if count > MAX_EMPLOYEE_EMAILS_PER_MONTH:
+                self._hll(self.over_limit, group_id).add(recipient)
+        else:
+            self.recipient_counts[key] += 1
+            self.recipients[group_id].add(recipient)
+            if self.recipient_counts[key] > MAX_EMPLOYEE_EMAILS_PER_MONTH:
+                self.over_limit[group_id].add(recipient)
+
+    def _distinct(self, table, group_id):
+        """Distinct count for a group from a set or a HyperLogLog."""
+        value = table.get(group_id)
+        if value is None:
+            return 0
+        return value.count() if self.approximate else len(value)
+
+    def results(self):
+        """Yield one rule result per group_id and rule."""
+        for group_id in sorted(self.daily_counts):
+            latest_day = self.latest_day[group_id]
+            for rule_id, event_type in DAILY_SPIKE_RULES.items():
+                counts = self.daily_counts[group_id].get(event_type)
+                if counts is None:
+                    continue
+                today = counts.get(latest_day, 0)
+                history = [counts.get(day, 0) for day in range(latest_day - HISTORY_DAYS, latest_day)]
+                threshold = spike_threshold(history)
+                yield {
+                    "group_id": group_id,
+                    "rule_id": rule_id,
+                    "passed": threshold is None or today <= threshold,
+                    "metric_value": today,
+                    "threshold": round(threshold, 2) if threshold is not None else None,
+                    "approximate": False,
+                }
+
+            recipients = self._distinct(self.recipients, group_id)
+            if recipients:
+                over_limit = self._distinct(self.over_limit, group_id)
+                result = {
+                    "group_id": group_id,
+                    "rule_id": EMPLOYEE_EMAIL_RULE,
+                    "passed": over_limit == 0,
+                    "metric_value": over_limit,
+                    "threshold": 0,
+                    "distinct_recipients": recipients,
+                    "approximate": self.approximate,
+                }
+                if self.approximate:
+                    result["relative_error"] = round(hll_relative_error(self.hll_precision), 4)
+                yield result
+
+    def fleet_distributions(self):
+        """Quantiles of daily event volume per event type across the fleet."""
+        for group_id, by_type in self.daily_counts.items():
+            for event_type, counts in by_type.items():
+                for count in counts.values():
+                    self._record_distribution(event_type, count)
+            by_type.clear()
+
+        summary = {}
+        for event_type, values in self.distributions.items():
+            if self.approximate:
+                summary[event_type] = {
+                    f"p{int(q * 100)}": round(values.quantile(q), 2) for q in DISTRIBUTION_QUANTILES
+                }
+            elif values:
+                ordered = sorted(values)
+                summary[event_type] = {
+                    f"p{int(q * 100)}": ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+                    for q in DISTRIBUTION_QUANTILES
+                }
+        return summary
+
+
+def evaluate(input_stream, output_stream, approximate=False, **sketch_options):
+    """Evaluate all volume rules over an event stream and write JSONL results."""
+    evaluator = VolumeRuleEvaluator(approximate=approximate, **sketch_options)
+    skipped = Counter()
+    for event in stream_events(input_stream, skipped):
+        try:
+            evaluator.process(event)
+        except EVENT_ERRORS as e:
+            print(f"Skipping event with invalid fields ({e})", file=sys.stderr)
+            skipped["invalid"] += 1
+
+    results = list(evaluator.results())
+    for result in results:
+        output_stream.write(json.dumps(result) + '\n')
+    output_stream.write(json.dumps({"fleet_daily_volume": evaluator.fleet_distributions()}) + '\n')
+
+    failed = sum(1 for r in results if not r["passed"])
+    mode = "approximate" if approximate else "exact"
+    print(f"Processed {evaluator.events_processed} events ({mode} mode), skipped {sum(skipped.values())}",
+          file=sys.stderr)
+    print(f"Rule results: {len(results)}, failing: {failed}", file=sys.stderr)
+    return results
+
+
+if __name__ == '__main__':
+    profile_from_argv()
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('input', nargs='?', default='-', help="JSONL event file, or '-' for stdin")
+    parser.add_argument('--approximate', action='store_true', help="Use sketches for bounded memory")
+    parser.add_argument('--cms-width', type=int, default=1 << 22)
+    parser.add_argument('--cms-depth', type=int, default=4)
+    parser.add_argument('--hll-precision', type=int, default=12)
+    parser.add_argument('--tdigest-compression', type=int, default=100)
+    args = parser.parse_args()
+
+    options = {
+        "cms_width": args.cms_width,
+        "cms_depth": args.cms_depth,
+        "hll_precision": args.hll_precision,
+        "tdigest_compression": args.tdigest_compression,
+    }
+    if args.input == '-':
+        evaluate(sys.stdin, sys.stdout, args.approximate, **options)
+    else:
+        with open(args.input, 'r', encoding='utf-8') as f:
+            evaluate(f, sys.stdout, args.approximate, **options)
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Fleet health-score aggregation over rule results from many instances.
+
+Computes pass rates and RAG_KNOWLEDGE_BASE.md health bands per instance,
+and per instance x SKU, product area and feature, with vectorized pandas
+group-bys. The bands are:
+
+    >= 90% Excellent | 75-89% Good | 60-74% Fair | < 60% At Risk
+
+The pass rate is passed / (passed + failed). Skipped, timed-out and errored
+rules are counted but do not move the score. Failed rules are also classified
+into the Critical / High / Medium / Low severity levels.
+
+Rule results are JSONL records with rule_id and status (the output of
+rule_scheduler.py or async_rule_runner.py). group_id is taken from the record,
+or from the file name when the record has none. Features come from
+platform_health_base_config (implementation_quality -> feature_id ->
+linked_rules) when given, otherwise from the catalog's Current Feature
+ID/Name columns.
+
+Usage:
+    python tools/fleet_health_scores.py results/*.jsonl
+    python tools/fleet_health_scores.py results/*.jsonl --platform-health-config platform_health_base_config.json \\
+        --output-dir fleet_scores/
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from profiling import profile_from_argv
+from rule_catalog import load_catalog, unique_rules
+
+BAND_BINS = [-np.inf, 60, 75, 90, np.inf]
+BAND_LABELS = ["At Risk", "Fair", "Good", "Excellent"]
+
+SEVERITY_LEVELS = ["Critical", "High", "Medium", "Low"]
+
+# Rule ID substrings per RAG_KNOWLEDGE_BASE.md "Severity Classification".
+# Critical: blocks go-live (Talent Lake, SSO), compliance risk (data
+# retention, data subject requests).
+CRITICAL_PATTERNS = ["talent_lake", "sso", "saml", "data_retention", "data_subject", "gdpr"]
+
+# High: data quality below threshold, missing integrations, incomplete stage mappings
+HIGH_PATTERNS = ["_quality", "integration", "sync", "webhook", "stage"]
+
+# Medium: branding/customization items (and, by default, non-blocking configuration gaps)
+BRANDING_PATTERNS = ["logo", "theme", "color", "banner", "favicon", "font", "branding"]
+
+# Low: nice-to-have enhancements, optimization opportunities, training follow-ups
+LOW_PATTERNS = ["optimization", "seo", "training", "nice_to_have"]
+
+LEVELS = {
+    "instance": [],
+    "sku": ["sku"],
+    "product_area": ["product_area"],
+    "feature": ["feature_id", "feature_name"],
+}
+
+
+def severity(rule):
+    """Severity of a failing rule per the RAG knowledge base classification."""
+    rule_id = rule["rule_id"]
+    if any(p in rule_id for p in CRITICAL_PATTERNS):
+        return "Critical"
+    if any(p in rule_id for p in BRANDING_PATTERNS):
+        return "Medium"
+    if any(p in rule_id for p in HIGH_PATTERNS):
+        return "High"
+    if any(p in rule_id for p in LOW_PATTERNS):
+        return "Low"
+    return "Medium"
+
+
+def catalog_frame(rules):
+    """One row per rule ID with SKU, product area and failure severity."""
+    unique = unique_rules(rules)
+    return pd.DataFrame({
+        "rule_id": [r["rule_id"] for r in unique],
+        "sku": [r["sku"] or "Unassigned" for r in unique],
+        "product_area": [r["product_area"] or "Unassigned" for r in unique],
+        "severity": pd.Categorical([severity(r) for r in unique], categories=SEVERITY_LEVELS),
+    })
+
+
+def catalog_features(rules):
+    """(feature_id, feature_name, rule_id) rows from the catalog feature columns."""
+    rows = {(r["current_feature_id"], r["current_feature_name"], r["rule_id"])
+            for r in rules if r["current_feature_id"]}
+    return pd.DataFrame(sorted(rows), columns=["feature_id", "feature_name", "rule_id"])
+
+
+def config_features(path):
+    """(feature_id, feature_name, rule_id) rows from platform_health_base_config."""
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    rows = []
+    for feature_id, feature in config.get("implementation_quality", {}).items():
+        for linked in feature.get("linked_rules", []):
+            rule_id = linked["rule_id"] if isinstance(linked, dict) else linked
+            rows.append((feature_id, feature.get("display_name", feature_id), rule_id))
+    return pd.DataFrame(rows, columns=["feature_id", "feature_name", "rule_id"])
+
+
+def load_results(paths):
+    """Rule results from JSONL files as one frame (group_id, rule_id, status)."""
+    frames = []
+    for path in paths:
+        frame = pd.read_json(path, lines=True, dtype={"rule_id": str, "status": str})
+        if frame.empty:
+            continue
+        if "group_id" not in frame:
+            frame["group_id"] = os.path.splitext(os.path.basename(path))[0]
+        if "status" not in frame and "passed" in frame:
+            frame["status"] = np.where(frame["passed"], "pass", "fail")
+        frames.append(frame[["group_id", "rule_id", "status"]])
+    if not frames:
+        return pd.DataFrame(columns=["group_id", "rule_id", "status"])
+    results = pd.concat(frames, ignore_index=True)
+    # Latest result wins if a rule appears twice for an instance.
+    return results.drop_duplicates(["group_id", "rule_id"], keep="last")
+
+
+def band(pass_rate):
+    """Health band for a pass-rate Series (percent)."""
+    return pd.cut(pass_rate, BAND_BINS, right=False, labels=BAND_LABELS)
+
+
+def score(frame, keys):
+    """Pass rate, band and failure severity counts per group of keys."""
+    frame = frame.assign(
+        passed=(frame["status"] == "pass").astype(np.int32),
+        failed=(frame["status"] == "fail").astype(np.int32),
+    )
+    grouped = frame.groupby(keys, observed=True, sort=True)
+    scores = grouped.agg(rules=("rule_id", "size"), passed=("passed", "sum"), failed=("failed", "sum"))
+    evaluated = scores["passed"] + scores["failed"]
+    pass_rate = 100.0 * scores["passed"] / evaluated.where(evaluated > 0)
+    scores["pass_rate"] = pass_rate.round(1)
+    # Band the exact rate; 89.96 is Good, even though it displays as 90.0.
+    scores["band"] = band(pass_rate)
+
+    failures = frame[frame["failed"] == 1]
+    by_severity = failures.groupby(keys + ["severity"], observed=False).size().unstack("severity", fill_value=0)
+    by_severity = by_severity.reindex(columns=SEVERITY_LEVELS, fill_value=0)
+    by_severity.columns = [f"failed_{s.lower()}" for s in SEVERITY_LEVELS]
+    scores = scores.join(by_severity, how="left").fillna({c: 0 for c in by_severity.columns})
+    return scores.astype({c: np.int64 for c in by_severity.columns}).reset_index()
+
+
+def aggregate(results, rules, features=None):
+    """Score tables per level: instance, sku, product_area, feature."""
+    catalog = catalog_frame(rules).set_index("rule_id")
+    # Categorical keys keep the group-bys on integer codes; catalog columns
+    # are mapped once per distinct rule rather than once per result row.
+    frame = results.astype({"group_id": "category", "rule_id": "category", "status": "category"})
+    codes = frame["rule_id"].cat.codes.to_numpy()
+    for column, missing in (("sku", "Unassigned"), ("product_area", "Unassigned"), ("severity", "Medium")):
+        per_rule = catalog[column].astype(str).reindex(frame["rule_id"].cat.categories).fillna(missing)
+        dtype = pd.CategoricalDtype(SEVERITY_LEVELS) if column == "severity" else "category"
+        frame[column] = pd.Categorical(per_rule, dtype=dtype).take(codes)
+    features = catalog_features(rules) if features is None else features
+
+    tables = {}
+    for level, dimensions in LEVELS.items():
+        source = frame.merge(features, on="rule_id", how="inner") if level == "feature" else frame
+        tables[level] = score(source, ["group_id"] + dimensions)
+    return tables
+
+
+def fleet_summary(tables):
+    """Band distribution across instances."""
+    counts = tables["instance"]["band"].value_counts().reindex(BAND_LABELS, fill_value=0)
+    return {label: int(count) for label, count in counts.items()}
+
+
+if __name__ == '__main__':
+    profile_from_argv()
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('results', nargs='+', help="Rule result JSONL files")
+    parser.add_argument('--catalog', action='append', help="Catalog TSV (repeatable)")
+    parser.add_argument('--platform-health-config', help="platform_health_base_config JSON for feature links")
+    parser.add_argument('--output-dir', help="Write one TSV per level here")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    rules = load_catalog(args.catalog)
+    features = config_features(args.platform_health_config) if args.platform_health_config else None
+    results = load_results(args.results)
+    tables = aggregate(results, rules, features)
+    elapsed = time.perf_counter() - started
+
+    print(f"Scored {tables['instance'].shape[0]} instances from {len(results)} rule results in {elapsed:.2f}s")
+    for label, count in fleet_summary(tables).items():
+        print(f"  {label}: {count}")
+
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+        for level, table in tables.items():
+            path = os.path.join(args.output_dir, f"health_scores_by_{level}.tsv")
+            table.to_csv(path, sep='\t', index=False)
+            print(f"Wrote {path}", file=sys.stderr)
+    else:
+        print(tables["instance"].sort_values("pass_rate").head(20).to_string(index=False))
@@ -7,9 +7,15 @@ This script processes the Instance Health Rules TSV and adds a
 """
 
 import csv
+import os
 import re
 import sys
 
+from instrumentation import METRICS
+from profiling import profile_from_argv
+from rule_catalog import COLUMN_MAP
+from rule_record import RuleRecord
+
 # Input data - paste the TSV content or read from file
 INPUT_FILE = '/home/ec2-user/de_app_1/documentation/instance_health_rules_input.tsv'
 OUTPUT_FILE = '/home/ec2-user/de_app_1/documentation/PCS_TM_TA_rules_with_cursor_descriptions.tsv'
@@ -34,8 +40,8 @@ def extract_purpose_impact(description):
     desc = clean_html(description)
     
     # Check if already has [Purpose] format
-    purpose_match = re.search(r'\[Purpose\]\s*(.+?)(?:\[Impact\]|Impact of Failure|$)', desc, re.IGNORECASE | re.DOTALL)
-    impact_match = re.search(r'(?:\[Impact\]|Impact of Failure)\s*(.+?)$', desc, re.IGNORECASE | re.DOTALL)
+    purpose_match = METRICS.regex('extract', 'purpose_tag', re.search(r'\[Purpose\]\s*(.+?)(?:\[Impact\]|Impact of Failure|$)', desc, re.IGNORECASE | re.DOTALL))
+    impact_match = METRICS.regex('extract', 'impact_tag', re.search(r'(?:\[Impact\]|Impact of Failure)\s*(.+?)$', desc, re.IGNORECASE | re.DOTALL))
     
     if purpose_match:
         purpose = purpose_match.group(1).strip()
@@ -49,16 +55,16 @@ def extract_purpose_impact(description):
     else:
         # Try to extract impact
         impact_patterns = [
-            r'Impact of Failure\s*(.+?)$',
-            r'If not configured,?\s*(.+?)$',
-            r'Without this.*?,?\s*(.+?)$',
-            r'If missing,?\s*(.+?)$',
-            r'If not enabled,?\s*(.+?)$',
-            r'Missing.*?can\s*(.+?)$',
+            ('impact_of_failure', r'Impact of Failure\s*(.+?)$'),
+            ('if_not_configured', r'If not configured,?\s*(.+?)$'),
+            ('without_this', r'Without this.*?,?\s*(.+?)$'),
+            ('if_missing', r'If missing,?\s*(.+?)$'),
+            ('if_not_enabled', r'If not enabled,?\s*(.+?)$'),
+            ('missing_can', r'Missing.*?can\s*(.+?)$'),
         ]
         impact = None
-        for pattern in impact_patterns:
-            match = re.search(pattern, desc, re.IGNORECASE | re.DOTALL)
+        for name, pattern in impact_patterns:
+            match = METRICS.regex('extract', name, re.search(pattern, desc, re.IGNORECASE | re.DOTALL))
             if match:
                 impact = match.group(1).strip()
                 break
@@ -67,13 +73,13 @@ def extract_purpose_impact(description):
 
 
 def generate_cursor_description(row):
-    """Generate a standardized Purpose/Impact description for a rule"""
-    rule_name = row.get('Rule Name', '')
-    rule_id = row.get('Rule ID', '')
-    description = row.get('Description', '')
-    product_area = row.get('Product Area', '')
-    feature_alignment = row.get('Feature Alignment', '')
-    updated_desc = row.get('Updated Description (If needed)', '')
+    """Generate a standardized Purpose/Impact description for a rule (a RuleRecord)"""
+    rule_name = row.get('rule_name', '')
+    rule_id = row.get('rule_id', '')
+    description = row.get('description', '')
+    product_area = row.get('product_area', '')
+    feature_alignment = row.get('new_feature', '')
+    updated_desc = row.get('updated_description', '')
     
     # Use updated description if available
     source_desc = updated_desc if updated_desc and updated_desc.strip() and updated_desc.strip() != 'NA' else description
@@ -118,9 +124,10 @@ def generate_cursor_description(row):
 def process_tsv(input_file, output_file):
     """Process the TSV file and add Cursor Generated Description column"""
     
-    with open(input_file, 'r', encoding='utf-8') as f:
+    with METRICS.stage('parse'), open(input_file, 'r', encoding='utf-8') as f:
         # Read all content
         content = f.read()
+    METRICS.bytes_read('parse', os.path.getsize(input_file))
     
     # Split into lines
     lines = content.strip().split('\n')
@@ -173,6 +180,8 @@ def process_tsv(input_file, output_file):
     
     print(f"Description column found at index {desc_index}")
     
+    fields = [COLUMN_MAP.get(col.strip()) for col in header]
+
     # Create new header with Cursor Generated Description after Description
     new_header = header[:desc_index+1] + ['Cursor Generated Description'] + header[desc_index+1:]
     
@@ -181,43 +190,47 @@ def process_tsv(input_file, output_file):
     rules_processed = 0
     
     # Start processing from the row after the header
-    for line_num, line in enumerate(lines[header_row_idx+1:], start=header_row_idx+2):
-        if not line.strip():
-            continue
+    with METRICS.stage('enhance'):
+        for line_num, line in enumerate(lines[header_row_idx+1:], start=header_row_idx+2):
+            if not line.strip():
+                continue
         
-        cols = line.split('\t')
+            cols = line.split('\t')
         
-        # Skip empty rows or rows that are just tabs
-        if len(cols) < 3 or not any(c.strip() for c in cols[:5]):
-            continue
+            # Skip empty rows or rows that are just tabs
+            if len(cols) < 3 or not any(c.strip() for c in cols[:5]):
+                continue
         
-        # Pad columns if needed
-        while len(cols) < len(header):
-            cols.append('')
+            # Pad columns if needed
+            while len(cols) < len(header):
+                cols.append('')
         
-        # Create row dict for easier access
-        row = {header[i]: cols[i] if i < len(cols) else '' for i in range(len(header))}
+            row = RuleRecord.from_columns(fields, cols)
         
-        # Generate cursor description
-        cursor_desc = generate_cursor_description(row)
+            # Generate cursor description
+            cursor_desc = generate_cursor_description(row)
         
-        # Create new row with cursor description inserted
-        new_row = cols[:desc_index+1] + [cursor_desc] + cols[desc_index+1:]
-        output_rows.append(new_row)
-        rules_processed += 1
+            # Create new row with cursor description inserted
+            new_row = cols[:desc_index+1] + [cursor_desc] + cols[desc_index+1:]
+            output_rows.append(new_row)
+            rules_processed += 1
+    METRICS.count('enhance', 'rows', rules_processed)
     
     print(f"Processed {rules_processed} rules")
     
     # Write output
-    with open(output_file, 'w', encoding='utf-8', newline='') as f:
+    with METRICS.stage('write'), open(output_file, 'w', encoding='utf-8', newline='') as f:
         writer = csv.writer(f, delimiter='\t', quoting=csv.QUOTE_MINIMAL)
         for row in output_rows:
             writer.writerow(row)
+    METRICS.count('write', 'rows', len(output_rows) - 1)
+    METRICS.bytes_written('write', os.path.getsize(output_file))
     
     print(f"Output written to {output_file}")
 
 
 if __name__ == '__main__':
+    profile_from_argv()
     if len(sys.argv) > 1:
         INPUT_FILE = sys.argv[1]
     if len(sys.argv) > 2:
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Stream data_audit_log exports into the local rule results store.
+
+Reads CSV, TSV or JSONL exports of data_audit_log (optionally gzipped) one
+row at a time and keeps only entity_type = 'implementation_quality' rows. It
+normalizes each row's metric JSON into metric value, threshold and pass/fail,
+and bulk-writes large batches to rule_results_store.py partitions. Memory
+stays bounded by the batch size whatever the export size. When the buffer
+fills, only the largest (date, group_id) buffers are written, so tenants
+with few rows per flush accumulate into one larger part instead of many
+tiny ones. Rows whose date is not an ISO date are counted and skipped. orjson is used
+for the metric JSON when installed, with the standard json module as the
+fallback.
+
+Export columns are matched by name; the first present name wins:
+
+    group_id | rule: entity_id, rule_id, metric_name | date: t_create, t_update, date
+    metric JSON: data_json, metric_json, metrics, data
+
+Usage:
+    python tools/import_data_audit_log.py data_audit_log_2026_01.csv
+    python tools/import_data_audit_log.py export.jsonl.gz --batch-size 500000 --store /data/rule_results
+"""
+
+import argparse
+import csv
+import gzip
+import json
+import math
+import os
+import sys
+import time
+from collections import Counter
+
+from instrumentation import METRICS
+from profiling import profile_from_argv
+from rule_results_store import DEFAULT_STORE, STATUS_CODES, RuleResultsStore, parse_date
+
+try:
+    import orjson
+    loads = orjson.loads
+except ImportError:
+    loads = json.loads
+
+ENTITY_TYPE = 'implementation_quality'
+RULE_COLUMNS = ['entity_id', 'rule_id', 'metric_name']
+DATE_COLUMNS = ['t_create', 't_update', 'date']
+METRIC_COLUMNS = ['data_json', 'metric_json', 'metrics', 'data']
+
+VALUE_KEYS = ['metric_value', 'value', 'metric']
+THRESHOLD_KEYS = ['threshold', 'metric_threshold', 'min_threshold', 'max_threshold']
+STATUS_KEYS = ['status', 'rule_eval_status', 'eval_status', 'result']
+PASSED_KEYS = ['passed', 'pass', 'is_passing']
+
+# PlatformHealthRuleEvalStatus names and other spellings seen in exports
+STATUS_ALIASES = {
+    'pass': 'pass', 'passed': 'pass', 'success': 'pass', 'true': 'pass',
+    'fail': 'fail', 'failed': 'fail', 'failure': 'fail', 'false': 'fail',
+    'skip': 'skipped', 'skipped': 'skipped', 'not_applicable': 'skipped',
+    'error': 'error', 'timeout': 'timeout',
+}
+
+DEFAULT_BATCH_SIZE = 250_000
+
+
+def open_export(path):
+    """Text stream over a plain or gzipped export."""
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', newline='')
+    return open(path, 'r', encoding='utf-8', newline='')
+
+
+def iter_rows(path, skipped=None):
+    """Yield export rows as dicts, streaming.
+
+    Malformed or non-object JSONL lines are logged with their line number,
+    counted in skipped (a Counter) when given, and skipped.
+    """
+    base = path[:-3] if path.endswith('.gz') else path
+    with open_export(path) as f:
+        if base.endswith(('.jsonl', '.json', '.ndjson')):
+            for line_num, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = loads(line)
+                except ValueError:
+                    row = None
+                if not isinstance(row, dict):
+                    print(f"{path}: skipping malformed line {line_num}", file=sys.stderr)
+                    if skipped is not None:
+                        skipped["malformed"] += 1
+                    continue
+                yield row
+        else:
+            csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+            yield from csv.DictReader(f, delimiter='\t' if base.endswith('.tsv') else ',')
+
+
+def first_present(mapping, keys):
+    for key in keys:
+        value = mapping.get(key)
+        if value not in (None, ''):
+            return value
+    return None
+
+
+def to_float(value):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return math.nan
+    return number if math.isfinite(number) else math.nan
+
+
+def normalize_metrics(raw):
+    """(metric_value, threshold, status) from a row's metric JSON."""
+    if isinstance(raw, (str, bytes)):
+        try:
+            raw = loads(raw)
+        except ValueError:
+            return math.nan, math.nan, 'error'
+    if not isinstance(raw, dict):
+        return to_float(raw), math.nan, 'error'
+    value = to_float(first_present(raw, VALUE_KEYS))
+    threshold = to_float(first_present(raw, THRESHOLD_KEYS))
+
+    status = first_present(raw, STATUS_KEYS)
+    if status is None:
+        passed = first_present(raw, PASSED_KEYS)
+        status = None if passed is None else str(passed)
+    status = STATUS_ALIASES.get(str(status).strip().lower()) if status is not None else None
+    if status is None:
+        if math.isnan(value) or math.isnan(threshold):
+            status = 'error'
+        elif 'max_threshold' in raw:
+            status = 'pass' if value <= threshold else 'fail'
+        else:
+            status = 'pass' if value >= threshold else 'fail'
+    return value, threshold, status
+
+
+class BatchWriter:
+    """Buffers normalized rows per (date, group_id) and flushes them in large parts."""
+
+    def __init__(self, store, batch_size=DEFAULT_BATCH_SIZE):
+        self.store = store
+        self.batch_size = batch_size
+        self.buffers = {}
+        self.buffered = 0
+        self.parts_written = 0
+
+    def add(self, date, group_id, rule_id, value, threshold, status):
+        """Buffer one row; date is a datetime.date."""
+        columns = self.buffers.get((date, group_id))
+        if columns is None:
+            columns = self.buffers[(date, group_id)] = ([], [], [], [])
+        columns[0].append(rule_id)
+        columns[1].append(STATUS_CODES[status])
+        columns[2].append(value)
+        columns[3].append(threshold)
+        self.buffered += 1
+        if self.buffered >= self.batch_size:
+            self.flush(self.batch_size // 2)
+
+    def flush(self, keep=0):
+        """Write buffers as parts, largest first, until at most keep rows stay buffered."""
+        largest_first = sorted(self.buffers, key=lambda key: len(self.buffers[key][0]), reverse=True)
+        with METRICS.stage('import_write'):
+            for key in largest_first:
+                if self.buffered <= keep:
+                    break
+                rule_ids, statuses, values, thresholds = self.buffers.pop(key)
+                date, group_id = key
+                self.store.append_columns(date, group_id, self.store.encode(rule_ids), statuses, values, thresholds)
+                self.buffered -= len(rule_ids)
+                self.parts_written += 1
+                METRICS.count('import_write', 'parts')
+                METRICS.count('import_write', 'rows', len(rule_ids))
+
+
+def import_export(path, store, batch_size=DEFAULT_BATCH_SIZE, progress_every=1_000_000):
+    """Import one export; returns (rows read, rows imported, parts written, skipped counts).
+
+    skipped is a Counter of lines and rows left out: "malformed" JSONL
+    lines and rows with a "bad_date".
+    """
+    writer = BatchWriter(store, batch_size)
+    read = imported = 0
+    skipped = Counter()
+    started = time.perf_counter()
+    METRICS.bytes_read('import', os.path.getsize(path))
+    with METRICS.stage('import'):
+        for row in iter_rows(path, skipped):
+            read += 1
+            entity_type = row.get('entity_type')
+            if entity_type and entity_type != ENTITY_TYPE:
+                continue
+            rule_id = first_present(row, RULE_COLUMNS)
+            group_id = row.get('group_id')
+            date = first_present(row, DATE_COLUMNS)
+            if not rule_id or not group_id or not date:
+                continue
+            try:
+                date = parse_date(date)
+            except ValueError:
+                print(f"{path}: skipping row {read} with invalid date {date!r}", file=sys.stderr)
+                skipped["bad_date"] += 1
+                continue
+            value, threshold, status = normalize_metrics(first_present(row, METRIC_COLUMNS))
+            writer.add(date, group_id, rule_id, value, threshold, status)
+            imported += 1
+            if progress_every and read % progress_every == 0:
+                rate = read / (time.perf_counter() - started)
+                print(f"  {read:,} rows read ({rate:,.0f} rows/s)", file=sys.stderr)
+    writer.flush()
+    METRICS.count('import', 'rows', read)
+    METRICS.count('import', 'imported', imported)
+    METRICS.count('import', 'malformed', skipped["malformed"])
+    METRICS.count('import', 'bad_date', skipped["bad_date"])
+    return read, imported, writer.parts_written, skipped
+
+
+if __name__ == '__main__':
+    profile_from_argv()
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('exports', nargs='+', help="CSV/TSV/JSONL exports, optionally .gz")
+    parser.add_argument('--store', default=DEFAULT_STORE, help="Rule results store directory")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help="Rows buffered per flush")
+    args = parser.parse_args()
+
+    store = RuleResultsStore(args.store)
+    for path in args.exports:
+        started = time.perf_counter()
+        read, imported, parts, skipped = import_export(path, store, args.batch_size)
+        elapsed = time.perf_counter() - started
+        megabytes = os.path.getsize(path) / 1e6
+        print(f"{path}: {imported:,} of {read:,} rows imported into {parts} parts "
+              f"in {elapsed:.1f}s ({megabytes / elapsed if elapsed else 0:.1f} MB/s, "
+              f"JSON parser: {'orjson' if loads is not json.loads else 'json'})"
+              + (f"; {skipped['malformed']:,} malformed lines skipped" if skipped['malformed'] else "")
+              + (f"; {skipped['bad_date']:,} rows with an invalid date skipped" if skipped['bad_date'] else ""))
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Shared per-stage timers and counters for the tools.
+
+Tools record into the process-wide METRICS registry:
+
+    with METRICS.stage('parse'):                  # wall time and call count
+        ...
+    METRICS.count('parse', 'rows', n)             # any named counter
+    METRICS.bytes_read('parse', n) / METRICS.bytes_written('write', n)
+    METRICS.cache('rule_result_cache', hit)       # hit / miss, reported with a hit rate
+    METRICS.regex('extract', 'impact_of_failure', matched)
+
+Recording is a dict update under a lock, cheap enough to leave in nightly
+catalog builds. Nothing is exported unless asked for, either with
+configure() or with environment variables (the older scripts have no
+argparse), read at import:
+
+    RULE_TOOLS_METRICS_JSON=path   structured JSON summary, written at exit
+    RULE_TOOLS_METRICS_PROM=path   Prometheus text format (node_exporter textfile collector)
+    RULE_TOOLS_METRICS_PORT=port   serve /metrics and /metrics.json on 127.0.0.1 while running
+
+Usage:
+    RULE_TOOLS_METRICS_JSON=/tmp/metrics.json python tools/generate_cursor_descriptions.py in.tsv out.tsv
+    python tools/instrumentation.py /tmp/metrics.json     # print a summary as Prometheus text
+"""
+
+import argparse
+import atexit
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PROMETHEUS_PREFIX = 'rule_tools'
+
+
+class Instrumentation:
+    """Per-stage seconds, calls, counters, cache lookups and regex matches."""
+
+    def __init__(self, tool=None):
+        self.tool = tool or os.path.splitext(os.path.basename(sys.argv[0] or 'python'))[0] or 'python'
+        self.started = time.time()
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    def _stage(self, name):
+        entry = self.stages.get(name)
+        if entry is None:
+            entry = self.stages[name] = {"seconds": 0.0, "calls": 0, "counters": {}, "cache": {}, "regex": {}}
+        return entry
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Time a block as one call of a stage."""
+        started = time.perf_counter()
+        try:
+            yield self
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                entry = self._stage(name)
+                entry["seconds"] += elapsed
+                entry["calls"] += 1
+
+    def count(self, stage, counter, value=1):
+        with self._lock:
+            counters = self._stage(stage)["counters"]
+            counters[counter] = counters.get(counter, 0) + value
+
+    def bytes_read(self, stage, size):
+        self.count(stage, 'bytes_read', size)
+
+    def bytes_written(self, stage, size):
+        self.count(stage, 'bytes_written', size)
+
+    def cache(self, stage, hit, value=1):
+        key = 'hits' if hit else 'misses'
+        with self._lock:
+            cache = self._stage(stage)["cache"]
+            cache[key] = cache.get(key, 0) + value
+
+    def regex(self, stage, pattern, matched):
+        """Record one attempt of a named pattern and whether it matched."""
+        with self._lock:
+            counts = self._stage(stage)["regex"].setdefault(pattern, [0, 0])
+            counts[0] += 1
+            counts[1] += bool(matched)
+        return matched
+
+    def reset(self):
+        with self._lock:
+            self.stages = {}
+            self.started = time.time()
+
+    # -- export ------------------------------------------------------------
+
+    def summary(self):
+        """JSON-ready snapshot of every stage."""
+        with self._lock:
+            stages = {}
+            for name, entry in self.stages.items():
+                hits, misses = entry["cache"].get("hits", 0), entry["cache"].get("misses", 0)
+                stages[name] = {
+                    "seconds": round(entry["seconds"], 6),
+                    "calls": entry["calls"],
+                    "counters": dict(entry["counters"]),
+                    "cache": {"hits": hits, "misses": misses,
+                              "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None}
+                    if entry["cache"] else {},
+                    "regex": {p: {"attempts": a, "matches": m} for p, (a, m) in entry["regex"].items()},
+                }
+            return {
+                "tool": self.tool,
+                "pid": os.getpid(),
+                "started_at": time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started)),
+                "elapsed_seconds": round(time.time() - self.started, 3),
+                "stages": stages,
+            }
+
+    def prometheus(self):
+        """Summary in Prometheus text exposition format."""
+        return prometheus_text(self.summary())
+
+    def write_json(self, path):
+        write_atomic(path, json.dumps(self.summary(), indent=2) + '\n')
+
+    def write_prometheus(self, path):
+        write_atomic(path, self.prometheus())
+
+    def serve(self, port, host='127.0.0.1'):
+        """Serve /metrics (Prometheus) and /metrics.json from a daemon thread; returns the server."""
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.startswith('/metrics.json'):
+                    body, content_type = json.dumps(registry.summary()).encode(), 'application/json'
+                elif self.path.startswith('/metrics'):
+                    body, content_type = registry.prometheus().encode(), 'text/plain; version=0.0.4'
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def prometheus_text(summary):
+    """Prometheus text format for a summary() dict."""
+    families = {
+        'stage_seconds_total': ('counter', "Wall time spent in a stage"),
+        'stage_calls_total': ('counter', "Times a stage ran"),
+        'stage_counter_total': ('counter', "Named per-stage counters (rows, bytes, ...)"),
+        'cache_lookups_total': ('counter', "Cache lookups by result"),
+        'regex_attempts_total': ('counter', "Regex pattern attempts"),
+        'regex_matches_total': ('counter', "Regex pattern matches"),
+    }
+    samples = {family: [] for family in families}
+    tool = escape_label(summary["tool"])
+    for stage, entry in summary["stages"].items():
+        base = f'tool="{tool}",stage="{escape_label(stage)}"'
+        samples['stage_seconds_total'].append((base, entry["seconds"]))
+        samples['stage_calls_total'].append((base, entry["calls"]))
+        for counter, value in entry["counters"].items():
+            samples['stage_counter_total'].append((f'{base},counter="{escape_label(counter)}"', value))
+        if entry["cache"]:
+            for result, key in (('hit', 'hits'), ('miss', 'misses')):
+                samples['cache_lookups_total'].append((f'{base},result="{result}"', entry["cache"][key]))
+        for pattern, counts in entry["regex"].items():
+            labels = f'{base},pattern="{escape_label(pattern)}"'
+            samples['regex_attempts_total'].append((labels, counts["attempts"]))
+            samples['regex_matches_total'].append((labels, counts["matches"]))
+
+    lines = []
+    for family, (kind, help_text) in families.items():
+        if not samples[family]:
+            continue
+        name = f'{PROMETHEUS_PREFIX}_{family}'
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+        lines += [f'{name}{{{labels}}} {value}' for labels, value in samples[family]]
+    return '\n'.join(lines) + '\n'
+
+
+def write_atomic(path, text):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+METRICS = Instrumentation()
+_exports = {}
+
+
+def _export_at_exit():
+    if _exports.get("json"):
+        METRICS.write_json(_exports["json"])
+    if _exports.get("prom"):
+        METRICS.write_prometheus(_exports["prom"])
+
+
+def configure(json_path=None, prom_path=None, port=None):
+    """Export METRICS as JSON and/or Prometheus text at exit, and/or serve it on a local port."""
+    if (json_path or prom_path) and not _exports:
+        atexit.register(_export_at_exit)
+    if json_path:
+        _exports["json"] = json_path
+    if prom_path:
+        _exports["prom"] = prom_path
+    if port:
+        _exports["server"] = METRICS.serve(int(port))
+
+
+configure(
+    os.environ.get('RULE_TOOLS_METRICS_JSON'),
+    os.environ.get('RULE_TOOLS_METRICS_PROM'),
+    os.environ.get('RULE_TOOLS_METRICS_PORT'),
+)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('summary', help="JSON summary written via RULE_TOOLS_METRICS_JSON")
+    args = parser.parse_args()
+    with open(args.summary, 'r', encoding='utf-8') as f:
+        sys.stdout.write(prometheus_text(json.load(f)))
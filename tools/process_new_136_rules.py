@@ -5,8 +5,13 @@ Add config references where missing (#N/A) and generate enhanced descriptions.
 """
 
 import csv
+import os
 import re
 
+from instrumentation import METRICS
+from profiling import profile_from_argv
+from rule_record import RuleRecord
+
 # Config reference mappings for rules with #N/A
 CONFIG_REFERENCE_MAP = {
     # AI Rules - Internal Positions
@@ -520,10 +525,9 @@ def generate_fix_instructions(rule_id, product_area):
     return f"Review the configuration settings for this rule in Admin Console or Integration Console."
 
 
-def process_rules():
+def process_rules(input_file='/home/ec2-user/de_app_1/documentation/new_rules_136_input.tsv',
+                  output_file='/home/ec2-user/de_app_1/documentation/new_rules_136_with_enhanced_descriptions.tsv'):
     """Process the 136 new rules and create output TSV."""
-    input_file = '/home/ec2-user/de_app_1/documentation/new_rules_136_input.tsv'
-    output_file = '/home/ec2-user/de_app_1/documentation/new_rules_136_with_enhanced_descriptions.tsv'
     
     rows = []
     
@@ -531,7 +535,7 @@ def process_rules():
     KNOWN_PRODUCT_AREAS = {'AI', 'Security', 'Analytics', 'Talent Management - Core', 'TM Analytics', 'TA Analytics'}
     
     # Use csv reader with proper quoting to handle multiline fields
-    with open(input_file, 'r', newline='', encoding='utf-8') as f:
+    with METRICS.stage('enhance'), open(input_file, 'r', newline='', encoding='utf-8') as f:
         reader = csv.reader(f, delimiter='\t', quotechar='"', quoting=csv.QUOTE_MINIMAL)
         header = next(reader)
         
@@ -578,11 +582,13 @@ def process_rules():
             
             # Skip rows without valid rule_id
             if not rule_id or rule_id == "#N/A":
+                METRICS.count('enhance', 'rows_skipped')
                 continue
             
             # Get or derive config reference
             if config_ref == "#N/A" or not config_ref:
                 config_ref = get_config_reference(rule_id)
+                METRICS.count('enhance', 'config_reference_derived')
             
             # Generate enhanced description
             enhanced_desc = generate_enhanced_description(rule_id, rule_name, description, product_area)
@@ -590,21 +596,21 @@ def process_rules():
             # Get code reference
             code_ref = get_code_reference(rule_id)
             
-            rows.append({
-                "sku": sku,
-                "product_area": product_area,
-                "rule_name": rule_name,
-                "rule_id": rule_id,
-                "config_reference": config_ref,
-                "description": description,
-                "cursor_description": enhanced_desc,
-                "code_reference": code_ref,
-                "current_feature_id": current_feature_id,
-                "current_feature_name": current_feature_name,
-                "action": action,
-                "new_feature": new_feature,
-                "updates": updates,
-            })
+            rows.append(RuleRecord(
+                sku=sku,
+                product_area=product_area,
+                rule_name=rule_name,
+                rule_id=rule_id,
+                config_reference=config_ref,
+                description=description,
+                cursor_description=enhanced_desc,
+                code_reference=code_ref,
+                current_feature_id=current_feature_id,
+                current_feature_name=current_feature_name,
+                action=action,
+                new_feature=new_feature,
+                updates=updates,
+            ))
     
     # Write output file
     output_headers = [
@@ -623,7 +629,10 @@ def process_rules():
         "Updates to rule logic"
     ]
     
-    with open(output_file, 'w', newline='', encoding='utf-8') as f:
+    METRICS.count('enhance', 'rows', len(rows))
+    METRICS.bytes_read('enhance', os.path.getsize(input_file))
+    
+    with METRICS.stage('write'), open(output_file, 'w', newline='', encoding='utf-8') as f:
         writer = csv.writer(f, delimiter='\t')
         writer.writerow(output_headers)
         
@@ -644,6 +653,9 @@ def process_rules():
                 row["updates"],
             ])
     
+    METRICS.count('write', 'rows', len(rows))
+    METRICS.bytes_written('write', os.path.getsize(output_file))
+    
     print(f"Created {output_file}")
     print(f"Total rules processed: {len(rows)}")
     
@@ -658,4 +670,5 @@ def process_rules():
 
 
 if __name__ == "__main__":
+    profile_from_argv()
     process_rules()
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+--profile mode for the tool entry points, with flamegraph-ready output.
+
+Every tool calls profile_from_argv() first thing in its __main__ block. That
+call removes the flags below from sys.argv before the tool parses its own
+arguments, and starts a profiler. The profiler stops at exit and writes
+its reports:
+
+    --profile               sampling profiler (default, low overhead; fine for nightly runs)
+    --profile=cprofile      deterministic cProfile (exact call counts, higher overhead)
+    --profile-dir DIR       where reports go (default: <repo>/.profiles)
+    --profile-interval MS   sampling interval (default 5 ms)
+
+RULE_TOOLS_PROFILE=sample|cprofile turns profiling on without touching the
+command line, for wrappers that cannot change arguments.
+
+The sampling profiler is a daemon thread. Every interval it snapshots the
+stack of every other thread and writes:
+
+    <tool>-<timestamp>.collapsed   "frame;frame;frame count" lines for flamegraph.pl / speedscope
+    <tool>-<timestamp>.top.txt     top-N functions by self and total time, and per-rule attribution
+
+Per-rule attribution charges each sample to the innermost frame that has a
+rule ID in scope. That is a local named rule_id or lookup_key, or a row/rule
+mapping (dict or RuleRecord) with a "rule_id" or "Rule ID" key. The most
+expensive rules then show up by name. cProfile mode writes
+<tool>-<timestamp>.pstats (for snakeviz or pstats) and the top-N report.
+
+Usage:
+    python tools/process_new_136_rules.py --profile
+    python tools/async_rule_runner.py instance.json --profile --profile-interval 2
+    python tools/profiling.py .profiles/process_new_136_rules-20260115-020000.collapsed --top 30
+"""
+
+import argparse
+import atexit
+import collections
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections.abc import Mapping
+
+DEFAULT_PROFILE_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '.profiles'))
+DEFAULT_INTERVAL_MS = 5.0
+DEFAULT_TOP = 25
+MODES = ('sample', 'cprofile')
+
+RULE_LOCALS = ('rule_id', 'lookup_key')
+ROW_LOCALS = ('row', 'rule', 'record')
+ROW_KEYS = ('rule_id', 'Rule ID')
+
+
+def frame_label(code):
+    """Collapsed-stack frame name; never contains ';'."""
+    return f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(';', ',')
+
+
+def rule_in_scope(frame):
+    """Rule ID visible in a frame's locals, or None. Checks names before touching f_locals."""
+    names = frame.f_code.co_varnames
+    if not any(name in names for name in RULE_LOCALS + ROW_LOCALS):
+        return None
+    scope = frame.f_locals
+    for name in RULE_LOCALS:
+        value = scope.get(name)
+        if isinstance(value, str) and value:
+            return value
+    for name in ROW_LOCALS:
+        value = scope.get(name)
+        if isinstance(value, Mapping):
+            for key in ROW_KEYS:
+                if isinstance(value.get(key), str) and value[key]:
+                    return value[key]
+    return None
+
+
+class SamplingProfiler:
+    """Daemon thread that periodically records every other thread's stack."""
+
+    def __init__(self, interval=DEFAULT_INTERVAL_MS / 1000):
+        self.interval = interval
+        self.stacks = collections.Counter()
+        self.rules = collections.Counter()
+        self.samples = 0
+        self.started = self.stopped = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profiling-sampler', daemon=True)
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.stopped = time.perf_counter()
+
+    def _run(self):
+        own = threading.get_ident()
+        main = threading.main_thread().ident
+        names = {}
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                labels, rule_id = [], None
+                while frame is not None:
+                    labels.append(frame_label(frame.f_code))
+                    if rule_id is None:
+                        rule_id = rule_in_scope(frame)
+                    frame = frame.f_back
+                if ident != main:
+                    if ident not in names:
+                        names = {t.ident: t.name for t in threading.enumerate()}
+                    labels.append(f"thread {names.get(ident, ident)}")
+                self.stacks[';'.join(reversed(labels))] += 1
+                if rule_id is not None:
+                    self.rules[rule_id] += 1
+                self.samples += 1
+
+    def seconds_per_sample(self):
+        elapsed = (self.stopped or time.perf_counter()) - self.started
+        return elapsed / self.samples if self.samples else self.interval
+
+    def write_collapsed(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def top_functions(stacks, top=DEFAULT_TOP):
+    """(self, total) Counters of samples per frame from collapsed stacks."""
+    self_counts, total_counts = collections.Counter(), collections.Counter()
+    for stack, count in stacks.items():
+        frames = stack.split(';')
+        self_counts[frames[-1]] += count
+        for label in set(frames):
+            total_counts[label] += count
+    return self_counts.most_common(top), total_counts.most_common(top)
+
+
+def sample_report(stacks, rules, seconds_per_sample, top=DEFAULT_TOP, title=''):
+    """Text report: hot functions by self and total samples, and the costliest rules."""
+    samples = sum(stacks.values())
+    by_self, by_total = top_functions(stacks, top)
+    lines = [f"{title}{samples} samples, ~{seconds_per_sample * 1000:.2f} ms each "
+             f"({samples * seconds_per_sample:.2f}s sampled)", ""]
+    for heading, ranked in (("Hot functions (self)", by_self), ("Hot functions (total)", by_total)):
+        lines.append(heading)
+        for label, count in ranked:
+            lines.append(f"  {100.0 * count / samples:6.1f}%  {count * seconds_per_sample:8.3f}s  {label}")
+        lines.append("")
+    if rules:
+        attributed = sum(rules.values())
+        lines.append(f"Rule attribution ({100.0 * attributed / samples:.1f}% of samples had a rule ID in scope)")
+        for rule_id, count in rules.most_common(top):
+            lines.append(f"  {100.0 * count / samples:6.1f}%  {count * seconds_per_sample:8.3f}s  {rule_id}")
+        lines.append("")
+    return '\n'.join(lines)
+
+
+def cprofile_report(profile, top=DEFAULT_TOP):
+    stream = io.StringIO()
+    stats = pstats.Stats(profile, stream=stream)
+    stats.sort_stats('tottime').print_stats(top)
+    stats.sort_stats('cumulative').print_stats(top)
+    return stream.getvalue()
+
+
+def take_flag(argv, name):
+    """Remove --name / --name=value / --name value from argv; returns the value, True or None."""
+    for i, arg in enumerate(argv):
+        if arg == name:
+            del argv[i]
+            return True
+        if arg.startswith(name + '='):
+            del argv[i]
+            return arg.split('=', 1)[1]
+    return None
+
+
+def take_option(argv, name):
+    """Remove --name value / --name=value from argv; returns the value or None."""
+    for i, arg in enumerate(argv):
+        if arg == name and i + 1 < len(argv):
+            value = argv[i + 1]
+            del argv[i:i + 2]
+            return value
+        if arg.startswith(name + '='):
+            del argv[i]
+            return arg.split('=', 1)[1]
+    return None
+
+
+def profile_from_argv(argv=None):
+    """Start profiling if --profile or RULE_TOOLS_PROFILE asks for it; reports are written at exit."""
+    argv = sys.argv if argv is None else argv
+    mode = take_flag(argv, '--profile')
+    directory = take_option(argv, '--profile-dir') or DEFAULT_PROFILE_DIR
+    interval = float(take_option(argv, '--profile-interval') or DEFAULT_INTERVAL_MS)
+    mode = 'sample' if mode is True else (mode or os.environ.get('RULE_TOOLS_PROFILE'))
+    if not mode:
+        return None
+    if mode not in MODES:
+        sys.exit(f"--profile must be one of {', '.join(MODES)}")
+
+    tool = os.path.splitext(os.path.basename(argv[0] or 'python'))[0]
+    base = os.path.join(directory, f"{tool}-{time.strftime('%Y%m%d-%H%M%S')}")
+    os.makedirs(directory, exist_ok=True)
+
+    if mode == 'cprofile':
+        profiler = cProfile.Profile()
+
+        def finish():
+            profiler.disable()
+            profiler.dump_stats(base + '.pstats')
+            with open(base + '.top.txt', 'w', encoding='utf-8') as f:
+                f.write(cprofile_report(profiler))
+            print(f"Profile written to {base}.pstats and {base}.top.txt", file=sys.stderr)
+
+        atexit.register(finish)
+        profiler.enable()
+        return profiler
+
+    profiler = SamplingProfiler(interval / 1000)
+
+    def finish():
+        profiler.stop()
+        profiler.write_collapsed(base + '.collapsed')
+        report = sample_report(profiler.stacks, profiler.rules, profiler.seconds_per_sample(), title=f"{tool}: ")
+        with open(base + '.top.txt', 'w', encoding='utf-8') as f:
+            f.write(report)
+        print('\n'.join(report.split('\n')[:14]), file=sys.stderr)
+        print(f"Profile written to {base}.collapsed and {base}.top.txt", file=sys.stderr)
+
+    atexit.register(finish)
+    profiler.start()
+    return profiler
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('collapsed', help="Collapsed-stack file from a --profile run")
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP)
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL_MS, help="Sampling interval of the run (ms)")
+    args = parser.parse_args()
+
+    stacks = collections.Counter()
+    with open(args.collapsed, 'r', encoding='utf-8') as f:
+        for line in f:
+            stack, _, count = line.rstrip('\n').rpartition(' ')
+            stacks[stack] += int(count)
+    print(sample_report(stacks, collections.Counter(), args.interval / 1000, args.top))
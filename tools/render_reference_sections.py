@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Render the per-product-area rule sections of the technical reference from the catalog.
+
+Each product area in the processed catalog owns one generated block inside
+its "## <Area> Rules" section of INSTANCE_HEALTH_RULES_TECHNICAL_REFERENCE.md.
+The block holds a rule table and the rule descriptions. Blocks are delimited
+by marker comments that record a hash of the catalog rows they were rendered
+from:
+
+    <!-- BEGIN GENERATED: Security Rules (19 rules, hash 3f2a9c1be07d) -->
+    ...
+    <!-- END GENERATED: Security Rules -->
+
+On each run only areas whose hash changed are re-rendered. The file is only
+rewritten when at least one block changed, so diffs stay limited to the
+affected sections. The hand-written content around the markers is never
+touched. Areas without a section yet get a new section before the Code
+Reference Guide.
+
+Usage:
+    python tools/render_reference_sections.py            # update stale blocks
+    python tools/render_reference_sections.py --check    # exit 1 if any block is stale
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import sys
+
+from profiling import profile_from_argv
+from rule_catalog import DOCUMENTATION_DIR, RULE_FIELDS, load_catalog, unique_rules
+
+REFERENCE_FILE = os.path.join(DOCUMENTATION_DIR, 'INSTANCE_HEALTH_RULES_TECHNICAL_REFERENCE.md')
+
+# Catalog product area -> section title, where it is not simply "<area> Rules"
+SECTION_TITLES = {
+    "AI": "AI/ML Recommendation Rules",
+    "Analytics": "Analytics Data Quality Rules",
+    "Platform": "Talent Intelligence Platform Rules",
+}
+# New sections are inserted before this heading
+NEW_SECTION_ANCHOR = "## Code Reference Guide"
+
+MARKER_PATTERN = re.compile(
+    r'<!-- BEGIN GENERATED: (?P<title>.+?) \((?P<count>\d+) rules, hash (?P<hash>[0-9a-f]+)\) -->\n'
+    r'.*?<!-- END GENERATED: (?P=title) -->\n',
+    re.DOTALL,
+)
+
+
+def section_title(product_area):
+    """Doc section title for a catalog product area."""
+    area = re.sub(r'\s*-\s*', ' - ', product_area.strip())
+    return SECTION_TITLES.get(area, f"{area} Rules")
+
+
+def rules_by_section(rules):
+    """Section title -> rules in catalog order."""
+    sections = {}
+    for rule in unique_rules(rules):
+        if rule["product_area"]:
+            sections.setdefault(section_title(rule["product_area"]), []).append(rule)
+    return sections
+
+
+def rules_hash(rules):
+    """Hash of every catalog field of the rules a block is rendered from."""
+    digest = hashlib.blake2b(digest_size=6)
+    for rule in rules:
+        digest.update('\x1f'.join(rule[field] for field in RULE_FIELDS).encode('utf-8'))
+        digest.update(b'\x1e')
+    return digest.hexdigest()
+
+
+def cell(value):
+    """Markdown table cell text."""
+    return ' '.join(value.split()).replace('|', '\\|') or '-'
+
+
+def render_block(title, rules, block_hash):
+    """Marker-delimited block for one section."""
+    lines = [
+        f"<!-- BEGIN GENERATED: {title} ({len(rules)} rules, hash {block_hash}) -->",
+        "### Catalog Rules",
+        "",
+        "_Generated from the processed rule catalog by `tools/render_reference_sections.py`; "
+        "edit the catalog TSVs, not this block._",
+        "",
+        "| Rule ID | Rule Name | SKU | Config Reference | Code Reference |",
+        "|---------|-----------|-----|------------------|----------------|",
+    ]
+    for rule in rules:
+        lines.append(
+            f"| `{rule['rule_id']}` | {cell(rule['rule_name'])} | {cell(rule['sku'])} "
+            f"| {cell(rule['config_reference'])} | {cell(rule['code_reference'])} |"
+        )
+    lines.append("")
+    for rule in rules:
+        description = ' '.join((rule["cursor_description"] or rule["description"]).split())
+        if description:
+            lines.append(f"- **`{rule['rule_id']}`**: {description}")
+    lines.append(f"<!-- END GENERATED: {title} -->")
+    return '\n'.join(lines) + '\n'
+
+
+def existing_blocks(text):
+    """Section title -> (hash, match) for every generated block in the document."""
+    return {m.group("title"): (m.group("hash"), m) for m in MARKER_PATTERN.finditer(text)}
+
+
+def insert_block(text, title, block):
+    """Place a new block at the end of its section, creating the section if needed."""
+    heading = re.search(rf'^## {re.escape(title)}[ \t]*$', text, re.MULTILINE)
+    if heading:
+        following = re.compile(r'^## ', re.MULTILINE).search(text, heading.end())
+        end = following.start() if following else len(text)
+        # Keep the block above the section's trailing '---' separator.
+        body = text[heading.end():end]
+        separator = re.search(r'\n---\s*\n\s*$', body)
+        position = heading.end() + (separator.start() + 1 if separator else len(body))
+        return text[:position] + '\n' + block + '\n' + text[position:]
+    anchor = text.find(NEW_SECTION_ANCHOR)
+    section = f"## {title}\n\n{block}\n---\n\n"
+    if anchor == -1:
+        return text.rstrip('\n') + '\n\n---\n\n' + section
+    return text[:anchor] + section + text[anchor:]
+
+
+def render_reference(text, rules):
+    """Re-render stale blocks; returns (new text, titles re-rendered)."""
+    changed = []
+    for title, section_rules in rules_by_section(rules).items():
+        block_hash = rules_hash(section_rules)
+        current = existing_blocks(text).get(title)
+        if current and current[0] == block_hash:
+            continue
+        block = render_block(title, section_rules, block_hash)
+        if current:
+            match = current[1]
+            text = text[:match.start()] + block + text[match.end():]
+        else:
+            text = insert_block(text, title, block)
+        changed.append(title)
+    return text, changed
+
+
+if __name__ == '__main__':
+    profile_from_argv()
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--catalog', action='append', help="Catalog TSV (repeatable)")
+    parser.add_argument('--reference', default=REFERENCE_FILE, help="Markdown file to update")
+    parser.add_argument('--check', action='store_true', help="Only report stale sections")
+    args = parser.parse_args()
+
+    with open(args.reference, 'r', encoding='utf-8') as f:
+        original = f.read()
+    updated, changed = render_reference(original, load_catalog(args.catalog))
+
+    if not changed:
+        print("All generated sections are up to date")
+        sys.exit(0)
+    for title in changed:
+        print(f"{'Stale' if args.check else 'Rendered'}: {title}")
+    if args.check:
+        sys.exit(1)
+
+    tmp_path = args.reference + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(updated)
+    os.replace(tmp_path, args.reference)
+    print(f"Updated {len(changed)} sections in {args.reference}")
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Load the processed rule catalog TSVs into a common row format.
+
+The processed catalogs do not share a header layout, and part of
+PCS_TM_TA_rules_with_cursor_descriptions.tsv is shifted one column left
+(no SKU value). Every row is normalized to a RuleRecord (rule_record.py)
+with the same keys process_rules() writes, so other tools can read both
+files without knowing either layout. Descriptions, code and config
+references are shared through a StringStore (string_store.py) for the
+duration of a load_catalog call, so rows that repeat a text hold a single
+copy of it.
+"""
+
+import csv
+import os
+import re
+import sys
+
+from instrumentation import METRICS
+from profiling import profile_from_argv
+from rule_record import RULE_FIELDS, RuleRecord
+from string_store import StringStore
+
+DOCUMENTATION_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'documentation'))
+
+CATALOG_FILES = [
+    os.path.join(DOCUMENTATION_DIR, 'PCS_TM_TA_rules_with_cursor_descriptions.tsv'),
+    os.path.join(DOCUMENTATION_DIR, 'new_rules_136_with_enhanced_descriptions.tsv'),
+]
+
+# Header name -> rule field, covering every processed TSV layout
+COLUMN_MAP = {
+    "SKU": "sku",
+    "Product Area": "product_area",
+    "Rule Name": "rule_name",
+    "Rule ID": "rule_id",
+    "Config Reference": "config_reference",
+    "Description": "description",
+    "Original Description": "description",
+    "Cursor Generated Description": "cursor_description",
+    "Code Reference": "code_reference",
+    "Current Feature ID": "current_feature_id",
+    "Current Feature Name": "current_feature_name",
+    "Action": "action",
+    "Action to be taken": "action",
+    "Feature Alignment": "new_feature",
+    "New Feature Alignment": "new_feature",
+    "Updates to rule logic": "updates",
+    "Updates to rule logic (If needed)": "updates",
+    "Updated Description (If needed)": "updated_description",
+}
+
+RULE_ID_PATTERN = re.compile(r'^[a-z0-9_.]+$')
+
+
+def looks_like_rule_id(value):
+    """Rule IDs are lowercase snake_case (or dotted checkpoint numbers)."""
+    return bool(RULE_ID_PATTERN.match(value.strip()))
+
+
+def alignment_indices(fields):
+    """(rule_id index, cursor_description index) of a header, for align_columns."""
+    return tuple(fields.index(field) if field in fields else None for field in ("rule_id", "cursor_description"))
+
+
+def align_columns(fields, cols, rule_id_idx, cursor_idx):
+    """A data row's columns lined up with the header (fields: the header's rule field per column).
+
+    rule_id_idx and cursor_idx come from alignment_indices(fields), computed
+    once per header. Rows missing the SKU value are shifted one column left;
+    the first column then holds the product area. Those rows come back with
+    an empty SKU cell prepended.
+    """
+    shifted = (
+        rule_id_idx is not None and fields[0] == "sku"
+        and len(cols) > rule_id_idx
+        and not looks_like_rule_id(cols[rule_id_idx])
+        and looks_like_rule_id(cols[rule_id_idx - 1])
+    )
+    if not shifted:
+        return cols
+    cols = [''] + cols
+    # generate_cursor_descriptions.py inserted the cursor column at the header
+    # position, which is one slot late for these rows.
+    if cursor_idx is not None and fields[cursor_idx - 1] == "description" and len(cols) > cursor_idx + 1:
+        cols[cursor_idx], cols[cursor_idx + 1] = cols[cursor_idx + 1], cols[cursor_idx]
+    return cols
+
+
+def read_catalog_file(path, strings=None):
+    """Yield RuleRecords from one processed catalog TSV, text shared through strings when given."""
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        reader = csv.reader(f, delimiter='\t')
+        header = next(reader, None)
+        if header is None:
+            return
+        fields = [COLUMN_MAP.get(col.strip()) for col in header]
+        indices = alignment_indices(fields)
+
+        for cols in reader:
+            if len(cols) < 3 or not any(c.strip() for c in cols):
+                continue
+            row = RuleRecord.from_columns(fields, align_columns(fields, cols, *indices))
+            if not row.rule_id or row.rule_id == "#N/A":
+                continue
+            yield strings.share_fields(row) if strings is not None else row
+
+
+def load_catalog(paths=None, strings=None):
+    """Load every row from the catalog files as RuleRecords.
+
+    Text is shared through strings, or through a StringStore that lives only
+    as long as the returned rows.
+    """
+    strings = StringStore() if strings is None else strings
+    rows = []
+    with METRICS.stage('load_catalog'):
+        for path in paths or CATALOG_FILES:
+            rows.extend(read_catalog_file(path, strings))
+            METRICS.bytes_read('load_catalog', os.path.getsize(path))
+    METRICS.count('load_catalog', 'rows', len(rows))
+    return rows
+
+
+def unique_rules(rows):
+    """First row per rule ID, in catalog order (rules can map to several features)."""
+    seen = {}
+    for row in rows:
+        seen.setdefault(row["rule_id"], row)
+    return list(seen.values())
+
+
+if __name__ == '__main__':
+    profile_from_argv()
+    catalog = load_catalog(sys.argv[1:] or None)
+    print(f"Loaded {len(catalog)} rule rows ({len(unique_rules(catalog))} unique rule IDs)")
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Observed evaluation cost per rule and handler class, persisted between runs.
+
+Every evaluation that goes through the scheduler or async runner with a cost
+model is recorded. The per-rule and per-handler-class averages are
+exponentially weighted, so the model follows tenants as they grow.
+Observations are also bucketed by tenant size class (S/M/L/XL, from the
+instance's snapshot record counts). An estimate for a rule on a tenant size it has
+not been seen on is the rule's overall average, scaled by how much its
+handler class costs at that size. Estimates fall back in this order:
+
+    rule @ size  ->  rule overall x handler size ratio  ->  handler @ size
+    ->  handler overall  ->  BACKEND_COST prior (ms)
+
+BACKEND_COST holds unitless weights. The prior converts them to
+milliseconds at the median ms-per-weight of the rules observed so far
+(PRIOR_MS_PER_WEIGHT before anything is observed), so unobserved rules
+rank on the same scale as observed ones.
+
+RuleGraph uses the estimates to order evaluation cheapest-first for
+interactive views. pack() splits rules across batch workers by longest
+processing time first (LPT): it places the most expensive rule on the
+least-loaded worker, then repeats. That keeps the slowest worker within
+4/3 of optimal.
+
+Usage:
+    python tools/rule_cost_model.py observe results.jsonl --instance instance.json
+    python tools/rule_cost_model.py show --top 20
+    python tools/rule_cost_model.py plan instance.json --workers 4
+"""
+
+import argparse
+import heapq
+import json
+import os
+
+from profiling import profile_from_argv
+from rule_evaluation import BACKEND_COST, rule_backend, rule_handler
+
+DEFAULT_COST_MODEL = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '.rule_costs.json'))
+
+EWMA_ALPHA = 0.3
+ANY_SIZE = "*"
+# Milliseconds per BACKEND_COST weight unit until observations calibrate it
+PRIOR_MS_PER_WEIGHT = 10.0
+# Results whose elapsed time says nothing about the rule's cost
+UNTIMED_STATUSES = {"skipped", "error"}
+
+# Upper bound per size class on records in the larger snapshot (Solr documents
+# or analytics rows; the two mirror the same entities, so they are not summed)
+SIZE_CLASSES = [("S", 10_000), ("M", 100_000), ("L", 500_000), ("XL", float("inf"))]
+
+
+def tenant_size_class(instance):
+    """S/M/L/XL from "size_class", "record_counts" ({source: records}) or the snapshots; None without any."""
+    if instance.get("size_class"):
+        return instance["size_class"]
+    counts = instance.get("record_counts")
+    if counts is None:
+        counts = {source: sum(len(records) for records in instance[source].values())
+                  for source in ("solr", "analytics") if instance.get(source)}
+    if not counts:
+        return None
+    records = max(counts.values())
+    return next(label for label, limit in SIZE_CLASSES if records < limit)
+
+
+def ewma_update(entry, value):
+    """[average, samples] updated with one observation."""
+    if entry is None or entry[1] == 0:
+        return [value, 1]
+    return [entry[0] + EWMA_ALPHA * (value - entry[0]), entry[1] + 1]
+
+
+class RuleCostModel:
+    """EWMA milliseconds per rule and handler class, overall and per tenant size class."""
+
+    def __init__(self, path=DEFAULT_COST_MODEL):
+        self.path = path
+        self.rules = {}
+        self.handlers = {}
+        self.dirty = False
+        self._ms_per_weight = None
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.rules = data.get("rules", {})
+            self.handlers = data.get("handlers", {})
+
+    def observe(self, rule_id, handler, backend, elapsed_ms, size_class=None):
+        """Record one evaluation."""
+        entry = self.rules.setdefault(rule_id, {"handler": handler, "backend": backend, "costs": {}})
+        entry["handler"], entry["backend"] = handler, backend
+        handler_costs = self.handlers.setdefault(handler, {})
+        for key in {ANY_SIZE, size_class or ANY_SIZE}:
+            entry["costs"][key] = ewma_update(entry["costs"].get(key), elapsed_ms)
+            handler_costs[key] = ewma_update(handler_costs.get(key), elapsed_ms)
+        self.dirty = True
+        self._ms_per_weight = None
+
+    def observe_result(self, rule, result, size_class=None):
+        """Record a result record that carries elapsed_ms (skipped and errored rules are ignored)."""
+        if result.get("elapsed_ms") is None or result["status"] in UNTIMED_STATUSES:
+            return
+        backend = result.get("backend") or rule_backend(rule)
+        self.observe(rule["rule_id"], rule_handler(rule, backend), backend, result["elapsed_ms"], size_class)
+
+    def estimate(self, rule_id, handler, backend, size_class=None):
+        """Expected milliseconds for one evaluation."""
+        size = size_class or ANY_SIZE
+        rule_costs = self.rules.get(rule_id, {}).get("costs", {})
+        handler_costs = self.handlers.get(handler, {})
+        if size in rule_costs:
+            return rule_costs[size][0]
+        if ANY_SIZE in rule_costs:
+            overall = rule_costs[ANY_SIZE][0]
+            if size in handler_costs and handler_costs.get(ANY_SIZE, [0])[0] > 0:
+                return overall * handler_costs[size][0] / handler_costs[ANY_SIZE][0]
+            return overall
+        if size in handler_costs:
+            return handler_costs[size][0]
+        if ANY_SIZE in handler_costs:
+            return handler_costs[ANY_SIZE][0]
+        return self.prior(backend)
+
+    def ms_per_weight(self):
+        """Median observed milliseconds per BACKEND_COST weight unit over all rules."""
+        if self._ms_per_weight is None:
+            ratios = sorted(
+                entry["costs"][ANY_SIZE][0] / BACKEND_COST[entry["backend"]]
+                for entry in self.rules.values()
+                if ANY_SIZE in entry["costs"] and BACKEND_COST.get(entry.get("backend"))
+            )
+            self._ms_per_weight = ratios[len(ratios) // 2] if ratios else PRIOR_MS_PER_WEIGHT
+        return self._ms_per_weight
+
+    def prior(self, backend):
+        """Expected milliseconds for a backend with no observations: its weight in observed ms."""
+        return BACKEND_COST[backend] * self.ms_per_weight()
+
+    def save(self, path=None):
+        """Write the model atomically (only if it changed)."""
+        path = path or self.path
+        if not path or not self.dirty:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"rules": self.rules, "handlers": self.handlers}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, path)
+        self.dirty = False
+
+
+def pack(costs, workers):
+    """LPT packing of {rule_id: cost} onto workers; returns (bins, loads)."""
+    workers = max(1, workers)
+    bins = [[] for _ in range(workers)]
+    loads = [0.0] * workers
+    heap = [(0.0, worker) for worker in range(workers)]
+    for rule_id, cost in sorted(costs.items(), key=lambda item: (-item[1], item[0])):
+        load, worker = heapq.heappop(heap)
+        bins[worker].append(rule_id)
+        loads[worker] = load + cost
+        heapq.heappush(heap, (loads[worker], worker))
+    return bins, loads
+
+
+if __name__ == '__main__':
+    profile_from_argv()
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--model', default=DEFAULT_COST_MODEL, help="Cost model JSON")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    observe_cmd = commands.add_parser('observe', help="Record elapsed_ms from rule result JSONL files")
+    observe_cmd.add_argument('results', nargs='+')
+    observe_cmd.add_argument('--instance', help="Instance fixture, for its tenant size class")
+    observe_cmd.add_argument('--catalog', action='append', help="Catalog TSV (repeatable)")
+
+    show_cmd = commands.add_parser('show', help="Most expensive rules and per-handler averages")
+    show_cmd.add_argument('--top', type=int, default=20)
+    show_cmd.add_argument('--size-class', choices=[label for label, _ in SIZE_CLASSES])
+
+    plan_cmd = commands.add_parser('plan', help="Cheapest-first order and LPT worker packing for an instance")
+    plan_cmd.add_argument('instance')
+    plan_cmd.add_argument('--workers', type=int, default=4)
+    plan_cmd.add_argument('--catalog', action='append', help="Catalog TSV (repeatable)")
+    args = parser.parse_args()
+
+    model = RuleCostModel(args.model)
+    if args.command == 'observe':
+        from rule_catalog import load_catalog, unique_rules
+        from rule_evaluation import load_instance
+        rules = {r["rule_id"]: r for r in unique_rules(load_catalog(args.catalog))}
+        size_class = tenant_size_class(load_instance(args.instance)) if args.instance else None
+        observed = 0
+        for path in args.results:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        result = json.loads(line)
+                        rule = rules.get(result["rule_id"], {"rule_id": result["rule_id"]})
+                        if result.get("elapsed_ms") is not None and result["status"] not in UNTIMED_STATUSES:
+                            model.observe_result(rule, result, size_class)
+                            observed += 1
+        model.save()
+        print(f"Recorded {observed} observations ({size_class or 'any size'}) in {args.model}")
+    elif args.command == 'show':
+        size = args.size_class or ANY_SIZE
+        ranked = sorted(
+            ((entry["costs"][size][0], entry["costs"][size][1], rule_id, entry["handler"])
+             for rule_id, entry in model.rules.items() if size in entry["costs"]),
+            reverse=True,
+        )
+        print(f"Most expensive rules ({size}):")
+        for cost, samples, rule_id, handler in ranked[:args.top]:
+            print(f"  {cost:10.3f} ms  {samples:>5} obs  {rule_id} ({handler})")
+        print("\nHandler classes:")
+        for handler, costs in sorted(model.handlers.items(), key=lambda item: -item[1].get(size, [0])[0]):
+            if size in costs:
+                sizes = '  '.join(f"{k}={v[0]:.3f}" for k, v in sorted(costs.items()) if k != ANY_SIZE)
+                print(f"  {costs[size][0]:10.3f} ms  {handler}  {sizes}")
+    elif args.command == 'plan':
+        from rule_catalog import load_catalog
+        from rule_evaluation import load_instance
+        from rule_scheduler import RuleGraph
+        instance = load_instance(args.instance)
+        size_class = tenant_size_class(instance)
+        graph = RuleGraph(load_catalog(args.catalog), cost_model=model, size_class=size_class)
+        costs = {rule_id: graph.cost(rule_id) for rule_id in graph.rules}
+        bins, loads = pack(costs, args.workers)
+        naive = [0.0] * args.workers
+        for position, rule_id in enumerate(graph.rules):
+            naive[position % args.workers] += costs[rule_id]
+        order = graph.evaluation_order()
+        print(f"Size class {size_class or 'unknown'}; {len(order)} rules, estimated {sum(costs.values()):.1f} ms total")
+        print(f"First 10 (cheapest-first): {', '.join(order[:10])}")
+        print(f"LPT makespan on {args.workers} workers: {max(loads):.1f} ms "
+              f"(round-robin: {max(naive):.1f} ms, lower bound: {sum(costs.values()) / args.workers:.1f} ms)")
+        for worker, (rule_ids, load) in enumerate(zip(bins, loads)):
+            print(f"  worker {worker}: {len(rule_ids)} rules, {load:.1f} ms")
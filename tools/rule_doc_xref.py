@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Rule-to-documentation cross-reference index.
+
+Parses the technical reference, RULES_CONTEXT_LOADER.md and the RAG knowledge
+base once. It builds a rule_id -> {doc sections with line ranges, config
+paths, code paths} map:
+
+- Sections are headings titled with a rule ID (### employee_level_quality),
+  or several separated by " / ". They run until the next heading at the
+  same or a higher level.
+- Config paths come from the "Appendix: Rule ID to Config Mapping" table rows.
+- Code paths come from the "Code Reference Guide" table rows.
+- Mentions are rows of tables keyed by rule ID ("| Rule ID |" or
+  "| Rule |" first column) in any other section, and the
+  - **`rule_id`** bullets of the blocks render_reference_sections.py
+  generates.
+
+The map is written next to the catalog (documentation/rule_doc_xref.json)
+and reloaded as a dict for O(1) lookups. It is rebuilt whenever a source
+document changes. The reconciliation report lists catalog rules that no
+document mentions, and documented rules that are not in the catalog TSVs.
+
+Usage:
+    python tools/rule_doc_xref.py                      # build and print the reconciliation report
+    python tools/rule_doc_xref.py employee_level_quality
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+
+from doc_search_index import HEADING_PATTERN
+from profiling import profile_from_argv
+from rule_catalog import DOCUMENTATION_DIR, load_catalog, unique_rules
+
+DOC_FILES = [
+    os.path.join(DOCUMENTATION_DIR, 'INSTANCE_HEALTH_RULES_TECHNICAL_REFERENCE.md'),
+    os.path.join(DOCUMENTATION_DIR, 'RULES_CONTEXT_LOADER.md'),
+    os.path.join(DOCUMENTATION_DIR, 'RAG_KNOWLEDGE_BASE.md'),
+]
+XREF_PATH = os.path.join(DOCUMENTATION_DIR, 'rule_doc_xref.json')
+
+CONFIG_MAPPING_SECTION = "Appendix: Rule ID to Config Mapping"
+CODE_REFERENCE_SECTION = "Code Reference Guide"
+
+RULE_HEADING_PATTERN = re.compile(r'^`?([a-z][a-z0-9]*(?:_[a-z0-9]+)+)`?$')
+TABLE_RULE_PATTERN = re.compile(r'^\|\s*`([a-z][a-z0-9_]*)`\s*\|')
+# - **`rule_id`**: description (render_reference_sections.py blocks)
+BULLET_RULE_PATTERN = re.compile(r'^- \*\*`([a-z][a-z0-9_]*)`\*\*')
+
+
+def table_cells(line):
+    """Cells of a markdown table row, backticks stripped."""
+    return [cell.replace('`', '').strip() for cell in line.strip().strip('|').split('|')]
+
+
+def parse_document(path, xref):
+    """Add one document's rule sections and table references to the xref map."""
+    name = os.path.basename(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = f.read().split('\n')
+
+    headings = []  # (level, title, line number)
+    in_fence = False
+    for number, line in enumerate(lines, start=1):
+        if line.lstrip().startswith('```'):
+            in_fence = not in_fence
+            continue
+        match = None if in_fence else HEADING_PATTERN.match(line)
+        if match:
+            headings.append((len(match.group(1)), match.group(2), number))
+
+    # Rule sections, with their enclosing top-level (##) section for context
+    parent = None
+    for i, (level, title, number) in enumerate(headings):
+        if level <= 2:
+            parent = title
+        # "### email_loopback_prod / email_loopback_non_prod" documents both
+        matches = [RULE_HEADING_PATTERN.match(part.strip()) for part in title.split('/')]
+        if not all(matches):
+            continue
+        end = next((n - 1 for lvl, _, n in headings[i + 1:] if lvl <= level), len(lines))
+        for match in matches:
+            entry = xref.setdefault(match.group(1), new_entry())
+            entry["sections"].append({"file": name, "section": parent, "start_line": number, "end_line": end})
+
+    # Tables and generated bullets: the section a row sits in decides what it maps to
+    section = None
+    header = []
+    in_table = in_fence = False
+    for number, line in enumerate(lines, start=1):
+        if line.lstrip().startswith('```'):
+            in_fence = not in_fence
+            continue
+        if in_fence:
+            continue
+        match = HEADING_PATTERN.match(line)
+        if match and len(match.group(1)) <= 2:
+            section = match.group(2)
+            continue
+        if not line.startswith('|'):
+            in_table = False
+            match = BULLET_RULE_PATTERN.match(line)
+            if match:
+                entry = xref.setdefault(match.group(1), new_entry())
+                entry["mentions"].append({"file": name, "section": section, "line": number})
+            continue
+        if not in_table:
+            in_table = True
+            header = table_cells(line)
+            continue
+        match = TABLE_RULE_PATTERN.match(line)
+        if not match:
+            continue
+        if section not in (CONFIG_MAPPING_SECTION, CODE_REFERENCE_SECTION):
+            # Elsewhere only tables keyed by rule ID; others list configs or files
+            if header[0] in ("Rule ID", "Rule"):
+                entry = xref.setdefault(match.group(1), new_entry())
+                entry["mentions"].append({"file": name, "section": section, "line": number})
+            continue
+        cells = table_cells(line)
+        entry = xref.setdefault(match.group(1), new_entry())
+        if section == CONFIG_MAPPING_SECTION and len(cells) >= 3:
+            entry["config_paths"].append({"path": f"{cells[1]} → {cells[2]}", "file": name, "line": number})
+        elif section == CODE_REFERENCE_SECTION and len(cells) >= 3:
+            path = cells[2]
+            if "Line" in header and header.index("Line") < len(cells):
+                path = f"{path} line {cells[header.index('Line')]}"
+            entry["code_paths"].append({"path": path, "class": cells[1], "file": name, "line": number})
+
+
+def new_entry():
+    """Empty cross-reference entry for one rule."""
+    return {"sections": [], "config_paths": [], "code_paths": [], "mentions": []}
+
+
+def source_signature(paths):
+    """Content hash of every source, so the stored map survives a fresh checkout."""
+    signature = {}
+    for path in paths:
+        with open(path, 'rb') as f:
+            signature[os.path.basename(path)] = hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+    return signature
+
+
+def build_xref(paths=None):
+    """Parse every document into a rule_id -> references map."""
+    paths = paths or DOC_FILES
+    xref = {}
+    for path in paths:
+        parse_document(path, xref)
+    return {"sources": source_signature(paths), "rules": dict(sorted(xref.items()))}
+
+
+def load_xref(path=XREF_PATH, paths=None, rebuild=False):
+    """Load the stored map (rule_id -> references), rebuilding it if stale."""
+    paths = paths or DOC_FILES
+    if not rebuild and os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            stored = json.load(f)
+        if stored.get("sources") == source_signature(paths):
+            return stored["rules"]
+    stored = build_xref(paths)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(stored, f, indent=1, ensure_ascii=False)
+    return stored["rules"]
+
+
+def reconcile(xref, rules):
+    """(catalog rules missing from the docs, documented rules missing from the catalog)."""
+    catalog_ids = {rule["rule_id"] for rule in unique_rules(rules)}
+    missing_from_docs = sorted(catalog_ids - set(xref))
+    missing_from_catalog = sorted(set(xref) - catalog_ids)
+    return missing_from_docs, missing_from_catalog
+
+
+def print_entry(rule_id, entry):
+    print(rule_id)
+    for section in entry["sections"]:
+        print(f"  section  {section['file']}:{section['start_line']}-{section['end_line']}  ({section['section']})")
+    for config in entry["config_paths"]:
+        print(f"  config   {config['path']}  ({config['file']}:{config['line']})")
+    for code in entry["code_paths"]:
+        print(f"  code     {code['path']}  [{code['class']}]  ({code['file']}:{code['line']})")
+    for mention in entry["mentions"]:
+        print(f"  mention  {mention['file']}:{mention['line']}  ({mention['section']})")
+
+
+if __name__ == '__main__':
+    profile_from_argv()
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('rule_ids', nargs='*', help="Rule IDs to look up")
+    parser.add_argument('--catalog', action='append', help="Catalog TSV (repeatable)")
+    parser.add_argument('--rebuild', action='store_true', help="Re-parse the documents")
+    parser.add_argument('--output', default=XREF_PATH, help="Where the map is stored")
+    args = parser.parse_args()
+
+    xref = load_xref(args.output, rebuild=args.rebuild)
+    if args.rule_ids:
+        for rule_id in args.rule_ids:
+            if rule_id in xref:
+                print_entry(rule_id, xref[rule_id])
+            else:
+                print(f"{rule_id}: not documented", file=sys.stderr)
+        sys.exit(0)
+
+    missing_from_docs, missing_from_catalog = reconcile(xref, load_catalog(args.catalog))
+    print(f"Cross-referenced {len(xref)} documented rules -> {args.output}")
+    print(f"\nCatalog rules missing from the docs ({len(missing_from_docs)}):")
+    for rule_id in missing_from_docs:
+        print(f"  - {rule_id}")
+    print(f"\nDocumented rules missing from the catalog ({len(missing_from_catalog)}):")
+    for rule_id in missing_from_catalog:
+        print(f"  - {rule_id}")
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Local rule evaluation against instance fixtures.
+
+Classifies each catalog rule by the backend it needs (gate, config, integration,
+Solr or analytics), works out its preconditions and the config documents it
+reads, and evaluates it against a JSON instance fixture that stands in for the
+real backends:
+
+    {
+        "group_id": "acme-sandbox.com",
+        "environment": "sandbox",
+        "configs": {"ats_config": {"webhook_settings": {"status": "enabled"}}},
+        "gates": {"talent_lake_provisioned": true, "email_loopback_gate": true},
+        "metrics": {"employee_level_quality": {"metric_value": 97.1, "threshold": 95}},
+        "results": {"pcs_logo_configured_cs": {"passed": false}}
+    }
+
+"results" pins a verdict for any rule; otherwise config rules check that the
+referenced field exists, gate rules read "gates" and data, operational and
+integration rules compare "metrics" against their threshold.
+"""
+
+import json
+import re
+
+# Backend types, cheapest first. Weights are relative evaluation cost.
+BACKEND_COST = {
+    "gate": 1,
+    "config": 1,
+    "integration": 10,
+    "solr": 50,
+    "analytics": 200,
+}
+EXPENSIVE_BACKENDS = {"solr", "analytics"}
+
+GATE_RULES = {
+    "talent_lake_provisioned",
+}
+
+# Rule ID substrings for rules served by integration endpoints (RAAS reports,
+# webhook and OAuth settings on the adaptor)
+INTEGRATION_PATTERNS = ["raas", "webhook_enabled", "oauth_enabled"]
+
+# Rule ID substrings for rules backed by Redshift (AnalyticsBaseRule and the
+# operational rules that read the sync, webhook and server logs)
+ANALYTICS_PATTERNS = [
+    "application_", "applications", "funnel", "stagemap", "stage_map", "stage_transition",
+    "email", "hrbp_users", "_data_quality", "employee_location_quality", "employee_title_quality",
+    "employee_job_code_quality", "employee_multiple_profile", "employee_is_alumni", "employee_role_linked",
+    "valid_manager_email", "profile_inferred_gender", "profile_first_name", "profile_last_name",
+    "_consistency", "_discrepancy", "data_subject", "unsubscribe", "role_changes", "profile_data_retention",
+]
+
+# Rule ID substrings for operational rules, which read the Redshift sync,
+# webhook and server logs
+OPERATIONAL_PATTERNS = [
+    "sync_lag", "sync_failure", "webhook_sync", "webhook_event", "num_rejections",
+    "application_failures", "error_rate", "application_submissions", "stage_advances",
+]
+
+# Rule ID substrings for Solr-backed data rules (SolrBaseRule subclasses)
+SOLR_PATTERNS = [
+    "employee_", "profile_", "role_", "course", "project", "internal_positions", "claimed_employee",
+    "mentor_", "position_hiring_band_data_quality", "num_admin_accounts", "position_fq_count",
+]
+
+# Explicit preconditions: the listed rules must pass before the rule is evaluated
+RULE_PRECONDITIONS = {
+    "webhook_event_failure_rule": ["webhook_enabled"],
+    "candidate_webhook_sync_rule": ["webhook_enabled"],
+    "position_webhook_sync_rule": ["webhook_enabled"],
+    "employee_webhook_sync_rule": ["webhook_enabled"],
+}
+
+# Preconditions shared by every rule on a backend
+BACKEND_PRECONDITIONS = {
+    "solr": ["talent_lake_provisioned"],
+    "analytics": ["talent_lake_provisioned"],
+}
+
+# Handler class per non-config backend
+BACKEND_HANDLERS = {
+    "gate": "GateEnabledRule",
+    "integration": "IntegrationConfigHealthRule",
+    "solr": "SolrBaseRule",
+    "analytics": "AnalyticsBaseRule",
+}
+
+# Config rule handler by rule ID / config reference substrings, first match
+# wins; everything else is a ProductConfigHealthFieldExistsRule.
+CONFIG_HANDLER_PATTERNS = [
+    ("ProductConfigHealthTemplateRule", ["template_variables", "jinja", "{{"]),
+    ("ProductConfigHealthListSizeRule", [
+        "_list", "list_", "order", "columns", "filters", "fields", "at least", "tabs", "workflows",
+        "templates_exist", "stages_configured", "sections_defined", "forms_configured", "capabilities",
+    ]),
+    ("ProductConfigHealthCompareValueRule", [
+        "enabled", "disabled", "timezone", "max_", "allowed_", "default_access", "redirect_url",
+    ]),
+]
+
+CONFIG_NAME_PATTERN = re.compile(r'^[a-z][a-z0-9_]*(_config|_configs|_systems|_v2)$')
+FIELD_PATH_PATTERN = re.compile(r'^[a-z_][a-z0-9_.]*$')
+
+
+def rule_backend(rule):
+    """Backend type a rule is evaluated against."""
+    rule_id = rule["rule_id"].lower()
+    code_ref = rule.get("code_reference", "")
+    config_ref = rule.get("config_reference", "")
+
+    if rule_id in GATE_RULES or '_gate' in config_ref:
+        return "gate"
+    if any(p in rule_id for p in INTEGRATION_PATTERNS) or 'integrations_console' in code_ref:
+        return "integration"
+    if 'operational_health' in code_ref or any(p in rule_id for p in OPERATIONAL_PATTERNS):
+        return "analytics"
+    is_data_rule = (
+        'data_health' in code_ref
+        or rule_id.endswith(('_quality', '_rule'))
+        or 'metric_data_json' in rule.get("rule_name", "")
+    )
+    if is_data_rule:
+        if any(p in rule_id for p in ANALYTICS_PATTERNS):
+            return "analytics"
+        if any(p in rule_id for p in SOLR_PATTERNS):
+            return "solr"
+        return "analytics" if 'Analytics' in rule.get("product_area", "") else "solr"
+    return "config"
+
+
+def rule_handler(rule, backend=None):
+    """Handler class (technical reference "Rule Handler Classes") a rule is evaluated by."""
+    backend = backend or rule_backend(rule)
+    if backend != "config":
+        return BACKEND_HANDLERS[backend]
+    text = f"{rule['rule_id']} {rule.get('config_reference', '')}".lower()
+    for handler, patterns in CONFIG_HANDLER_PATTERNS:
+        if any(p in text for p in patterns):
+            return handler
+    return "ProductConfigHealthFieldExistsRule"
+
+
+def rule_preconditions(rule, backend=None):
+    """Rule IDs that must pass before this rule is worth evaluating."""
+    backend = backend or rule_backend(rule)
+    preconditions = list(RULE_PRECONDITIONS.get(rule["rule_id"], []))
+    for precondition in BACKEND_PRECONDITIONS.get(backend, []):
+        if precondition != rule["rule_id"] and precondition not in preconditions:
+            preconditions.append(precondition)
+    return preconditions
+
+
+def config_fields(rule):
+    """(config document, field path or None) pairs parsed from the config reference."""
+    fields = []
+    for part in re.split(r'\s+/\s+', rule.get("config_reference", "")):
+        pieces = [p.strip() for p in part.split('→')]
+        name = pieces[0].split('/')[-1].split(' ')[0]
+        if not CONFIG_NAME_PATTERN.match(name):
+            continue
+        field_path = None
+        if len(pieces) > 1:
+            candidate = pieces[1].split(' ')[0]
+            if FIELD_PATH_PATTERN.match(candidate):
+                field_path = candidate
+        fields.append((name, field_path))
+    return fields
+
+
+def config_inputs(rule):
+    """Config documents a rule reads (its shared inputs)."""
+    names = []
+    for name, _ in config_fields(rule):
+        if name not in names:
+            names.append(name)
+    return names
+
+
+def lookup_field(document, field_path):
+    """Resolve a dotted field path in a config document; None when absent."""
+    value = document
+    for key in field_path.split('.'):
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+
+def make_result(rule, backend, status, metric_value=None, threshold=None, reason=""):
+    """Standard result record shared by every runner."""
+    return {
+        "rule_id": rule["rule_id"],
+        "backend": backend,
+        "status": status,
+        "metric_value": metric_value,
+        "threshold": threshold,
+        "reason": reason,
+    }
+
+
+def evaluate_config_rule(rule, instance):
+    """ProductConfigHealthFieldExistsRule analogue over fixture configs."""
+    fields = config_fields(rule)
+    if not fields:
+        return make_result(rule, "config", "error", reason="no fixture result and no parseable config reference")
+    configs = instance.get("configs", {})
+    for name, field_path in fields:
+        document = configs.get(name)
+        if not document:
+            return make_result(rule, "config", "fail", reason=f"{name} is missing")
+        if field_path and lookup_field(document, field_path) in (None, "", [], {}):
+            return make_result(rule, "config", "fail", reason=f"{name}.{field_path} is not set")
+    return make_result(rule, "config", "pass")
+
+
+def evaluate_gate_rule(rule, instance):
+    """GateEnabledRule analogue over fixture gates."""
+    gates = instance.get("gates", {})
+    gate_name = rule["rule_id"]
+    if gate_name not in gates:
+        match = re.search(r'[a-z0-9_]+_gate', rule.get("config_reference", ""))
+        gate_name = match.group(0) if match else gate_name
+    if gate_name not in gates:
+        return make_result(rule, "gate", "error", reason=f"gate {gate_name} not in fixture")
+    return make_result(rule, "gate", "pass" if gates[gate_name] else "fail", reason=f"gate {gate_name}")
+
+
+def evaluate_metric_rule(rule, instance, backend):
+    """Solr, analytics and integration rules: compare a fixture metric with its threshold."""
+    metric = instance.get("metrics", {}).get(rule["rule_id"])
+    if metric is None:
+        return make_result(rule, backend, "error", reason="no fixture metric")
+    if "passed" in metric:
+        return make_result(rule, backend, "pass" if metric["passed"] else "fail",
+                           metric.get("metric_value"), metric.get("threshold"))
+    value, threshold = metric.get("metric_value"), metric.get("threshold", 95)
+    if metric.get("higher_is_better", True):
+        passed = value is not None and value >= threshold
+    else:
+        passed = value is not None and value <= threshold
+    return make_result(rule, backend, "pass" if passed else "fail", value, threshold)
+
+
+def evaluate_rule(rule, instance, backend=None):
+    """Evaluate one rule against an instance fixture."""
+    backend = backend or rule_backend(rule)
+    pinned = instance.get("results", {}).get(rule["rule_id"])
+    if pinned is not None:
+        return make_result(rule, backend, "pass" if pinned.get("passed") else "fail",
+                           pinned.get("metric_value"), pinned.get("threshold"), pinned.get("reason", ""))
+    if backend == "config":
+        return evaluate_config_rule(rule, instance)
+    if backend == "gate":
+        return evaluate_gate_rule(rule, instance)
+    return evaluate_metric_rule(rule, instance, backend)
+
+
+# Default evaluators per backend; runners accept a replacement mapping so real
+# backends can be swapped in.
+BACKEND_EVALUATORS = {
+    "gate": lambda rule, instance: evaluate_rule(rule, instance, "gate"),
+    "config": lambda rule, instance: evaluate_rule(rule, instance, "config"),
+    "integration": lambda rule, instance: evaluate_rule(rule, instance, "integration"),
+    "solr": lambda rule, instance: evaluate_rule(rule, instance, "solr"),
+    "analytics": lambda rule, instance: evaluate_rule(rule, instance, "analytics"),
+}
+
+
+def load_instance(path):
+    """Load an instance fixture from JSON."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
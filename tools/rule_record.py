@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Compact in-memory rule record shared by every tool.
+
+A RuleRecord holds one catalog row in __slots__. It has no per-row dict, and
+its low-cardinality columns are interned: SKU, product area, action, feature
+IDs and names, code reference and rule ID. A catalog of hundreds of
+thousands of rule-instance rows then shares one copy of each of those
+strings.
+
+Records behave as a mapping keyed by field name, so rule["rule_id"],
+rule.get("config_reference", "") and dict(rule) work as they did on the
+dict rows. Unlike a dict, a record always has every field (default ""), and
+fields cannot be added or removed.
+
+Usage:
+    python tools/rule_record.py            # memory of the catalog as records vs dicts
+"""
+
+import sys
+from collections.abc import MutableMapping
+
+from profiling import profile_from_argv
+
+# Same keys (and order) as the rows built in process_new_136_rules.process_rules()
+RULE_FIELDS = (
+    "sku",
+    "product_area",
+    "rule_name",
+    "rule_id",
+    "config_reference",
+    "description",
+    "cursor_description",
+    "code_reference",
+    "current_feature_id",
+    "current_feature_name",
+    "action",
+    "new_feature",
+    "updates",
+)
+
+# Input-catalog column generate_cursor_descriptions.py prefers over the description
+EXTRA_FIELDS = ("updated_description",)
+RECORD_FIELDS = RULE_FIELDS + EXTRA_FIELDS
+FIELD_SET = frozenset(RECORD_FIELDS)
+
+# Columns with few distinct values across a catalog
+INTERNED_FIELDS = frozenset({
+    "sku", "product_area", "rule_id", "code_reference", "current_feature_id",
+    "current_feature_name", "action", "new_feature",
+})
+
+
+class RuleRecord(MutableMapping):
+    """One catalog row; a mapping over RECORD_FIELDS backed by __slots__."""
+
+    __slots__ = RECORD_FIELDS
+
+    def __init__(self, **fields):
+        for name in RECORD_FIELDS:
+            value = fields.pop(name, "")
+            object.__setattr__(self, name, sys.intern(value) if name in INTERNED_FIELDS and value else value)
+        if fields:
+            raise TypeError(f"unknown rule field(s): {', '.join(sorted(fields))}")
+
+    @classmethod
+    def from_columns(cls, fields, cols):
+        """Record from a TSV row; fields maps each column to a field name (or None to drop it).
+
+        The first non-empty value wins when several columns map to one field.
+        """
+        values = {}
+        for field, value in zip(fields, cols):
+            if field and not values.get(field):
+                values[field] = value.strip()
+        return cls(**values)
+
+    def __getitem__(self, key):
+        if key not in FIELD_SET:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in FIELD_SET else default
+
+    def __setitem__(self, key, value):
+        if key not in FIELD_SET:
+            raise KeyError(key)
+        object.__setattr__(self, key, sys.intern(value) if key in INTERNED_FIELDS and value else value)
+
+    def __delitem__(self, key):
+        raise TypeError("rule record fields cannot be removed")
+
+    def __iter__(self):
+        return iter(RECORD_FIELDS)
+
+    def __len__(self):
+        return len(RECORD_FIELDS)
+
+    def __contains__(self, key):
+        return key in FIELD_SET
+
+    def __repr__(self):
+        return f"RuleRecord(rule_id={self.rule_id!r})"
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in RECORD_FIELDS)
+
+    def __setstate__(self, state):
+        for name, value in zip(RECORD_FIELDS, state):
+            self[name] = value
+
+    def as_dict(self):
+        """Plain dict of every field (for JSON)."""
+        return {name: getattr(self, name) for name in RECORD_FIELDS}
+
+
+def json_default(value):
+    """json.dump default= hook that serializes records as dicts."""
+    if isinstance(value, RuleRecord):
+        return value.as_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+if __name__ == '__main__':
+    profile_from_argv()
+    import tracemalloc
+
+    from rule_catalog import load_catalog
+
+    rows = load_catalog(sys.argv[1:] or None)
+    copies = max(1, 300_000 // len(rows))
+    for label, build in (("dict", lambda r: {k: ''.join(v) for k, v in r.items()}),
+                         ("RuleRecord", lambda r: RuleRecord(**{k: ''.join(v) for k, v in r.items()}))):
+        tracemalloc.start()
+        held = [build(row) for _ in range(copies) for row in rows]
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(f"{label:<10} {len(held):>9,} rows  {size / 1e6:8.1f} MB  {size / len(held):6.0f} B/row")
+        del held
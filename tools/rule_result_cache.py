@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Evaluation-result cache for config rules, keyed by config content hash.
+
+Config rules are evaluated against the current state of config, but configs
+such as ats_config, career_hub_base_config and pcsx_base_config rarely change
+between health-page loads. A cached verdict is keyed by:
+
+    (group_id, rule_id, rule definition version, hash of the config documents the rule reads)
+
+The rule definition version is a hash of the catalog row, so editing a rule
+invalidates it. The input hash covers only the documents named in the rule's
+config reference, so changing ats_config re-evaluates only the rules that
+read ats_config. Entries live in an in-memory LRU, with an optional on-disk
+tier that survives restarts. Only config and gate rules are cached. Data,
+integration and operational rules read live data that the key does not
+cover.
+
+Usage:
+    python tools/rule_result_cache.py instance.json --repeat 3
+    python tools/rule_result_cache.py instance.json --cache-dir .rule_cache
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from instrumentation import METRICS
+from profiling import profile_from_argv
+from rule_catalog import RULE_FIELDS, load_catalog
+from rule_evaluation import BACKEND_EVALUATORS, config_inputs, load_instance
+
+CACHEABLE_BACKENDS = {"config", "gate"}
+DEFAULT_MAX_ENTRIES = 4096
+
+
+def content_hash(value):
+    """Stable short hash of a JSON-serializable value."""
+    encoded = json.dumps(value, sort_keys=True, separators=(',', ':'), default=str).encode('utf-8')
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+def rule_version(rule):
+    """Rule definition version: hash of the catalog row."""
+    return content_hash([rule.get(field, "") for field in RULE_FIELDS])
+
+
+class RuleResultCache:
+    """LRU of rule results with an optional directory-backed second tier."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, directory=None):
+        self.max_entries = max_entries
+        self.directory = directory
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, content_hash(list(key)) + '.json')
+
+    def get(self, key):
+        """Cached result for a key, or None."""
+        result = self._entries.get(key)
+        if result is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            METRICS.cache('rule_result_cache', True)
+            return result
+        if self.directory:
+            try:
+                with open(self._path(key), 'r', encoding='utf-8') as f:
+                    result = json.load(f)
+            except (OSError, ValueError):
+                result = None
+            if result is not None:
+                self._remember(key, result)
+                self.disk_hits += 1
+                METRICS.cache('rule_result_cache', True)
+                METRICS.count('rule_result_cache', 'disk_hits')
+                return result
+        self.misses += 1
+        METRICS.cache('rule_result_cache', False)
+        return None
+
+    def put(self, key, result):
+        """Store a result in memory and, if configured, on disk."""
+        self._remember(key, result)
+        if self.directory:
+            path = self._path(key)
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(result, f)
+            os.replace(tmp_path, path)
+
+    def _remember(self, key, result):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self):
+        """Hit and miss counts."""
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+        }
+
+
+class CachedEvaluators(dict):
+    """BACKEND_EVALUATORS replacement that serves config and gate rules from a cache.
+
+    Pass it anywhere a runner accepts an evaluators mapping (run_schedule).
+    Config document hashes are memoized only inside evaluation_pass(), for
+    one instance that must not change during the pass; outside it every key
+    is hashed from the current document content.
+    """
+
+    def __init__(self, cache, evaluators=None):
+        evaluators = evaluators or BACKEND_EVALUATORS
+        super().__init__(evaluators)
+        self.cache = cache
+        self._versions = {}
+        self._instance = None
+        self._digests = None
+        for backend in CACHEABLE_BACKENDS & set(evaluators):
+            self[backend] = self._wrap(backend, evaluators[backend])
+
+    @contextmanager
+    def evaluation_pass(self, instance):
+        """Memoize config document hashes of instance until the block exits."""
+        self._instance, self._digests = instance, {}
+        try:
+            yield self
+        finally:
+            self._instance, self._digests = None, None
+
+    def _document_digest(self, instance, section, name):
+        """Hash of one config document, computed once per evaluation pass."""
+        if self._digests is None or instance is not self._instance:
+            return content_hash(instance.get(section, {}).get(name))
+        key = (section, name)
+        if key not in self._digests:
+            self._digests[key] = content_hash(instance.get(section, {}).get(name))
+        return self._digests[key]
+
+    def cache_key(self, rule, backend, instance):
+        """(group_id, rule_id, rule version, input hash)."""
+        rule_id = rule["rule_id"]
+        # Keyed by the row's content, so an edited row gets a new version
+        row = tuple(rule.get(field, "") for field in RULE_FIELDS)
+        version = self._versions.get(row)
+        if version is None:
+            version = self._versions[row] = rule_version(rule)
+        inputs = [self._document_digest(instance, "configs", name) for name in config_inputs(rule)]
+        if backend == "gate":
+            inputs.append(content_hash(instance.get("gates", {})))
+        # Fixture-pinned verdicts stand in for state the key cannot see.
+        inputs.append(content_hash(instance.get("results", {}).get(rule_id)))
+        return instance.get("group_id"), rule_id, version, content_hash(inputs)
+
+    def _wrap(self, backend, evaluator):
+        def evaluate(rule, instance):
+            key = self.cache_key(rule, backend, instance)
+            result = self.cache.get(key)
+            if result is None:
+                result = evaluator(rule, instance)
+                self.cache.put(key, result)
+            return dict(result)
+        return evaluate
+
+
+if __name__ == '__main__':
+    profile_from_argv()
+    from rule_scheduler import run_schedule
+
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('instance', help="Instance fixture JSON")
+    parser.add_argument('--catalog', action='append', help="Catalog TSV (repeatable)")
+    parser.add_argument('--cache-dir', help="Directory for the on-disk cache tier")
+    parser.add_argument('--max-entries', type=int, default=DEFAULT_MAX_ENTRIES)
+    parser.add_argument('--repeat', type=int, default=2, help="Number of simulated page loads")
+    args = parser.parse_args()
+
+    rules = load_catalog(args.catalog)
+    evaluators = CachedEvaluators(RuleResultCache(args.max_entries, args.cache_dir))
+    for load in range(1, args.repeat + 1):
+        instance = load_instance(args.instance)
+        started = time.perf_counter()
+        with evaluators.evaluation_pass(instance):
+            run_schedule(rules, instance, evaluators)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        print(f"Load {load}: {elapsed_ms:.1f} ms, cache {evaluators.cache.stats()}", file=sys.stderr)
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Append-only columnar store for daily rule results, with trend queries.
+
+The local counterpart of the data_audit_log history in DB Explorer. Results
+are partitioned by date and group_id:
+
+    <store>/rule_ids.txt                                    dictionary: line n = rule ID code n
+    <store>/date=2026-01-15/group_id=acme.com/part-00000.npz
+
+Each part is a compressed .npz holding four equal-length NumPy columns:
+rule (uint32 dictionary code), status (uint8), metric_value and threshold
+(float32, NaN when absent). Writes only ever add part files. Within a day, the last write for a rule
+wins. Queries read only the partitions they need and work on the dense
+arrays:
+
+- trend:         daily pass rate for an instance, or daily status of one rule
+- regressions:   rules that flipped pass -> fail between two days
+- time-to-green: days from a rule's first failure to its next pass
+- latest:        each rule's most recent stored result (stale results for deadline-bounded runs)
+
+Usage:
+    python tools/rule_results_store.py append 2026-01-15 results.jsonl --group-id acme.com
+    python tools/rule_results_store.py trend acme.com --days 7
+    python tools/rule_results_store.py regressions 2026-01-15
+    python tools/rule_results_store.py time-to-green acme.com
+"""
+
+import argparse
+import datetime
+import json
+import os
+import sys
+import urllib.parse
+import uuid
+
+import numpy as np
+
+from profiling import profile_from_argv
+
+try:
+    import fcntl
+except ImportError:  # not POSIX: dictionary appends are not locked
+    fcntl = None
+
+DEFAULT_STORE = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '.rule_results'))
+
+STATUSES = ["pass", "fail", "skipped", "error", "timeout"]
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+PASS = STATUS_CODES["pass"]
+FAIL = STATUS_CODES["fail"]
+MISSING = 255
+
+
+def parse_date(value):
+    """datetime.date from an ISO date string (or a date)."""
+    return value if isinstance(value, datetime.date) else datetime.date.fromisoformat(str(value)[:10])
+
+
+class RuleResultsStore:
+    """Date/group_id partitioned result columns with a shared rule ID dictionary."""
+
+    def __init__(self, root=DEFAULT_STORE):
+        self.root = root
+        self.dictionary_path = os.path.join(root, 'rule_ids.txt')
+        self.rule_ids = []
+        self.codes = {}
+        os.makedirs(root, exist_ok=True)
+        self.refresh()
+
+    def refresh(self):
+        """Pick up rule IDs other writers appended to the dictionary since it was read."""
+        if os.path.exists(self.dictionary_path):
+            with open(self.dictionary_path, 'r', encoding='utf-8') as f:
+                self._merge_dictionary(f.read())
+
+    def _merge_dictionary(self, text):
+        for rule_id in text.split('\n')[len(self.rule_ids):-1]:
+            self.codes.setdefault(rule_id, len(self.rule_ids))
+            self.rule_ids.append(rule_id)
+
+    # -- writing -----------------------------------------------------------
+
+    def encode(self, rule_ids):
+        """Dictionary codes for rule IDs, appending unseen IDs to the dictionary.
+
+        The append holds an exclusive lock and first re-reads the dictionary,
+        so concurrent writers never hand out the same code twice.
+        """
+        if any(r not in self.codes for r in rule_ids):
+            with open(self.dictionary_path, 'a+', encoding='utf-8') as f:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_EX)
+                f.seek(0)
+                self._merge_dictionary(f.read())
+                new = [r for r in dict.fromkeys(rule_ids) if r not in self.codes]
+                if new:
+                    f.write(''.join(r + '\n' for r in new))
+                    f.flush()
+                    for rule_id in new:
+                        self.codes[rule_id] = len(self.rule_ids)
+                        self.rule_ids.append(rule_id)
+        return np.fromiter((self.codes[r] for r in rule_ids), dtype=np.uint32, count=len(rule_ids))
+
+    def partition_dir(self, date, group_id):
+        return os.path.join(self.root, f"date={parse_date(date).isoformat()}",
+                            f"group_id={urllib.parse.quote(str(group_id), safe='')}")
+
+    def append_columns(self, date, group_id, rule_codes, statuses, metric_values=None, thresholds=None):
+        """Write one part from already-encoded columns; returns its path."""
+        directory = self.partition_dir(date, group_id)
+        os.makedirs(directory, exist_ok=True)
+        size = len(rule_codes)
+        nan = np.full(size, np.nan, dtype=np.float32)
+        tmp_path = os.path.join(directory, f".tmp-{uuid.uuid4().hex}")
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(
+                f,
+                rule=np.asarray(rule_codes, dtype=np.uint32),
+                status=np.asarray(statuses, dtype=np.uint8),
+                metric_value=nan if metric_values is None else np.asarray(metric_values, dtype=np.float32),
+                threshold=nan if thresholds is None else np.asarray(thresholds, dtype=np.float32),
+            )
+        # Claim the next free part number: link() fails if another writer
+        # took the name first, so concurrent appends never overwrite a part.
+        part = len([name for name in os.listdir(directory) if name.startswith('part-')])
+        while True:
+            path = os.path.join(directory, f"part-{part:05d}.npz")
+            try:
+                os.link(tmp_path, path)
+                break
+            except FileExistsError:
+                part += 1
+        os.remove(tmp_path)
+        return path
+
+    def append(self, date, group_id, results):
+        """Append result dicts (rule_id, status, metric_value, threshold) for one instance and day."""
+        results = list(results)
+        if not results:
+            return None
+        return self.append_columns(
+            date, group_id,
+            self.encode([r["rule_id"] for r in results]),
+            [STATUS_CODES.get(r.get("status"), STATUS_CODES["error"]) for r in results],
+            [np.nan if r.get("metric_value") is None else r["metric_value"] for r in results],
+            [np.nan if r.get("threshold") is None else r["threshold"] for r in results],
+        )
+
+    # -- reading -----------------------------------------------------------
+
+    def dates(self):
+        """Every stored date, ascending."""
+        return sorted(parse_date(name[5:]) for name in os.listdir(self.root) if name.startswith('date='))
+
+    def group_ids(self, date):
+        """Instances with results on a date."""
+        directory = os.path.join(self.root, f"date={parse_date(date).isoformat()}")
+        if not os.path.isdir(directory):
+            return []
+        return sorted(urllib.parse.unquote(name[9:]) for name in os.listdir(directory) if name.startswith('group_id='))
+
+    def read_partition(self, date, group_id):
+        """Concatenated columns of one partition, in write order."""
+        directory = self.partition_dir(date, group_id)
+        if not os.path.isdir(directory):
+            return None
+        parts = []
+        for name in sorted(os.listdir(directory)):
+            if name.startswith('part-') and name.endswith('.npz'):
+                with np.load(os.path.join(directory, name)) as part:
+                    parts.append({key: part[key] for key in part.files})
+        if not parts:
+            return None
+        columns = {key: np.concatenate([p[key] for p in parts]) for key in parts[0]}
+        if len(columns["rule"]) and int(columns["rule"].max()) >= len(self.rule_ids):
+            self.refresh()
+        return columns
+
+    def status_vector(self, date, group_id):
+        """Dense status array indexed by rule code (MISSING where no result); last write wins."""
+        columns = self.read_partition(date, group_id)
+        vector = np.full(len(self.rule_ids), MISSING, dtype=np.uint8)
+        if columns is not None:
+            vector[columns["rule"]] = columns["status"]  # later duplicates overwrite earlier ones
+        return vector
+
+    def status_matrix(self, group_id, dates):
+        """(len(dates), n_rules) status matrix for one instance."""
+        vectors = [self.status_vector(d, group_id) for d in dates]
+        # Rule IDs added by another writer meanwhile widen later vectors.
+        width = len(self.rule_ids)
+        return np.stack([np.pad(v, (0, width - len(v)), constant_values=MISSING) for v in vectors]) if vectors else \
+            np.empty((0, width), dtype=np.uint8)
+
+    # -- queries -----------------------------------------------------------
+
+    def latest(self, group_id, rule_ids=None, before=None):
+        """{rule_id: last stored result (with its "date")} for an instance, newest day first.
+
+        Only partitions up to the day all requested rules are found in are read.
+        """
+        wanted = None if rule_ids is None else set(rule_ids)
+        found = {}
+        for date in reversed(self.dates()):
+            if before is not None and date >= parse_date(before):
+                continue
+            columns = self.read_partition(date, group_id)
+            if columns is None:
+                continue
+            # Walk backwards so the last write of the day wins.
+            for code, status, value, threshold in zip(*(columns[k][::-1] for k in
+                                                        ("rule", "status", "metric_value", "threshold"))):
+                rule_id = self.rule_ids[code]
+                if rule_id in found or (wanted is not None and rule_id not in wanted):
+                    continue
+                found[rule_id] = {
+                    "status": STATUSES[status],
+                    "metric_value": None if np.isnan(value) else float(value),
+                    "threshold": None if np.isnan(threshold) else float(threshold),
+                    "date": date.isoformat(),
+                }
+            if wanted is not None and wanted <= found.keys():
+                break
+        return found
+
+    def window(self, end=None, days=7):
+        """Stored dates in the days-long window ending at end (default: latest)."""
+        dates = self.dates()
+        if not dates:
+            return []
+        end = parse_date(end) if end else dates[-1]
+        start = end - datetime.timedelta(days=days - 1)
+        return [d for d in dates if start <= d <= end]
+
+    def trend(self, group_id, rule_id=None, end=None, days=7):
+        """Daily pass rate for an instance, or daily status for one of its rules."""
+        dates = self.window(end, days)
+        matrix = self.status_matrix(group_id, dates)
+        if rule_id is not None:
+            code = self.codes.get(rule_id)
+            column = matrix[:, code] if code is not None else np.full(len(dates), MISSING)
+            return [(d.isoformat(), STATUSES[s] if s != MISSING else None) for d, s in zip(dates, column)]
+        passed = (matrix == PASS).sum(axis=1)
+        evaluated = passed + (matrix == FAIL).sum(axis=1)
+        return [
+            (d.isoformat(), round(100.0 * p / e, 1) if e else None, int(e))
+            for d, p, e in zip(dates, passed, evaluated)
+        ]
+
+    def regressions(self, date, previous=None, group_ids=None):
+        """{group_id: [rule IDs that passed on previous and fail on date]}."""
+        date = parse_date(date)
+        if previous is None:
+            earlier = [d for d in self.dates() if d < date]
+            if not earlier:
+                return {}
+            previous = earlier[-1]
+        flipped = {}
+        for group_id in group_ids or self.group_ids(date):
+            # One matrix, so both rows have the same width even if a
+            # concurrent writer adds rule IDs between the two reads.
+            before, after = self.status_matrix(group_id, [previous, date])
+            codes = np.flatnonzero((before == PASS) & (after == FAIL))
+            if codes.size:
+                flipped[group_id] = [self.rule_ids[c] for c in codes]
+        return flipped
+
+    def time_to_green(self, group_id, end=None, days=90):
+        """{rule_id: {"runs": [days to green...], "open_days": n or None}} over the window.
+
+        A run starts on a day the rule fails after not failing and ends on its
+        next pass. A run still failing at the window end is reported as open.
+        """
+        dates = self.window(end, days)
+        matrix = self.status_matrix(group_id, dates)
+        ever_failed = np.flatnonzero((matrix == FAIL).any(axis=0))
+        report = {}
+        for code in ever_failed:
+            column = matrix[:, code]
+            runs, started = [], None
+            for day, status in zip(dates, column):
+                if status == FAIL and started is None:
+                    started = day
+                elif status == PASS and started is not None:
+                    runs.append((day - started).days)
+                    started = None
+            report[self.rule_ids[code]] = {
+                "runs": runs,
+                "open_days": (dates[-1] - started).days if started is not None else None,
+            }
+        return report
+
+
+if __name__ == '__main__':
+    profile_from_argv()
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--store', default=DEFAULT_STORE, help="Store directory")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    append_cmd = commands.add_parser('append', help="Append a JSONL file of rule results")
+    append_cmd.add_argument('date')
+    append_cmd.add_argument('results')
+    append_cmd.add_argument('--group-id', help="Instance (defaults to each record's group_id)")
+
+    trend_cmd = commands.add_parser('trend', help="Daily pass rate, or one rule's daily status")
+    trend_cmd.add_argument('group_id')
+    trend_cmd.add_argument('--rule')
+    trend_cmd.add_argument('--end')
+    trend_cmd.add_argument('--days', type=int, default=7)
+
+    regressions_cmd = commands.add_parser('regressions', help="Rules that flipped pass -> fail")
+    regressions_cmd.add_argument('date')
+    regressions_cmd.add_argument('--previous', help="Compare against this date (default: previous stored date)")
+
+    ttg_cmd = commands.add_parser('time-to-green', help="Days from first failure to next pass, per rule")
+    ttg_cmd.add_argument('group_id')
+    ttg_cmd.add_argument('--end')
+    ttg_cmd.add_argument('--days', type=int, default=90)
+
+    args = parser.parse_args()
+    store = RuleResultsStore(args.store)
+
+    if args.command == 'append':
+        by_group = {}
+        with open(args.results, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    by_group.setdefault(args.group_id or record.get("group_id"), []).append(record)
+        for group_id, results in by_group.items():
+            path = store.append(args.date, group_id, results)
+            print(f"{group_id}: {len(results)} results -> {path}")
+    elif args.command == 'trend':
+        for row in store.trend(args.group_id, args.rule, args.end, args.days):
+            print('\t'.join('-' if v is None else str(v) for v in row))
+    elif args.command == 'regressions':
+        flipped = store.regressions(args.date, args.previous)
+        for group_id, rule_ids in flipped.items():
+            print(f"{group_id}: {', '.join(rule_ids)}")
+        print(f"{sum(len(r) for r in flipped.values())} regressions across {len(flipped)} instances", file=sys.stderr)
+    elif args.command == 'time-to-green':
+        for rule_id, entry in sorted(store.time_to_green(args.group_id, args.end, args.days).items()):
+            runs = ', '.join(str(d) for d in entry["runs"]) or '-'
+            still_open = f"failing for {entry['open_days']}d" if entry["open_days"] is not None else "green"
+            print(f"{rule_id}\truns: {runs}\t{still_open}")
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Precondition-aware rule scheduler.
+
+Builds a dependency graph over the catalog: each rule depends on its
+precondition rules (webhook_enabled before the webhook rules,
+talent_lake_provisioned before Solr and analytics rules) and on the config
+documents it reads. Rules are evaluated in dependency order, cheapest backend
+first. A rule whose precondition did not pass, or whose input config document
+is absent, is skipped instead of evaluated. The run report lists every
+skipped rule and the backend cost that was avoided.
+
+With --cost-model, the backend weights are replaced by observed costs from
+rule_cost_model.py. Every evaluation updates the model, and the model is
+saved at the end of the run. --environment-plan evaluates only the rules in
+the instance's cached environment plan (environment_profile.py).
+--workers N runs a batch: rules that gate other rules run first, then the
+rest are packed across N workers by observed cost.
+
+Usage:
+    python tools/rule_scheduler.py instance.json
+    python tools/rule_scheduler.py instance.json --output results.jsonl --catalog my_rules.tsv
+    python tools/rule_scheduler.py instance.json --cost-model .rule_costs.json --workers 4
+    python tools/rule_scheduler.py instance.json --environment-plan
+"""
+
+import argparse
+import heapq
+import json
+import sys
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from environment_profile import PlanCache
+from instrumentation import METRICS
+from profiling import profile_from_argv
+from rule_catalog import load_catalog, unique_rules
+from rule_cost_model import UNTIMED_STATUSES, RuleCostModel, pack, tenant_size_class
+from rule_evaluation import (
+    BACKEND_COST,
+    BACKEND_EVALUATORS,
+    EXPENSIVE_BACKENDS,
+    config_inputs,
+    load_instance,
+    make_result,
+    rule_backend,
+    rule_handler,
+    rule_preconditions,
+)
+
+
+class RuleGraph:
+    """Rules with their backend, precondition edges and config inputs."""
+
+    def __init__(self, rules, cost_model=None, size_class=None):
+        self.cost_model = cost_model
+        self.size_class = size_class
+        self.rules = {}
+        self.backends = {}
+        self.handlers = {}
+        self.preconditions = {}
+        self.inputs = {}
+        self.dependents = defaultdict(list)
+        self.order_hint = {}
+
+        for position, rule in enumerate(unique_rules(rules)):
+            rule_id = rule["rule_id"]
+            backend = rule_backend(rule)
+            self.rules[rule_id] = rule
+            self.backends[rule_id] = backend
+            self.handlers[rule_id] = rule_handler(rule, backend)
+            self.inputs[rule_id] = config_inputs(rule)
+            self.order_hint[rule_id] = position
+
+        for rule_id, rule in self.rules.items():
+            # Preconditions that are not in the catalog cannot gate anything.
+            preconditions = [p for p in rule_preconditions(rule, self.backends[rule_id]) if p in self.rules]
+            self.preconditions[rule_id] = preconditions
+            for precondition in preconditions:
+                self.dependents[precondition].append(rule_id)
+
+    def cost(self, rule_id):
+        """Evaluation cost of a rule: observed ms with a cost model, else the backend weight."""
+        if self.cost_model is not None:
+            return self.cost_model.estimate(rule_id, self.handlers[rule_id], self.backends[rule_id], self.size_class)
+        return BACKEND_COST[self.backends[rule_id]]
+
+    def evaluation_order(self):
+        """Topological order over preconditions, cheapest available rule first."""
+        remaining = {rule_id: len(p) for rule_id, p in self.preconditions.items()}
+        ready = [(self.cost(r), self.order_hint[r], r) for r, count in remaining.items() if count == 0]
+        heapq.heapify(ready)
+        order = []
+        while ready:
+            _, _, rule_id = heapq.heappop(ready)
+            order.append(rule_id)
+            for dependent in self.dependents.get(rule_id, ()):
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    heapq.heappush(ready, (self.cost(dependent), self.order_hint[dependent], dependent))
+        if len(order) != len(self.rules):
+            cyclic = sorted(r for r, count in remaining.items() if count > 0)
+            raise ValueError(f"Precondition cycle between rules: {', '.join(cyclic)}")
+        return order
+
+    def skip_reason(self, rule_id, results, instance):
+        """Why a rule should not be evaluated, or None if it should run."""
+        for precondition in self.preconditions[rule_id]:
+            status = results[precondition]["status"]
+            if status != "pass":
+                return f"precondition {precondition} {status}"
+        # Config rules are cheap and report a missing document as a failure;
+        # other backends need the document to mean anything.
+        if self.backends[rule_id] != "config":
+            configs = instance.get("configs", {})
+            for name in self.inputs[rule_id]:
+                if name not in configs:
+                    return f"input config {name} missing"
+        return None
+
+    def worker_plan(self, workers):
+        """(gating rules in evaluation order, LPT bins of the remaining rules) for a batch run."""
+        gating = set(self.dependents)
+        first = [rule_id for rule_id in self.evaluation_order() if rule_id in gating]
+        bins, _ = pack({r: self.cost(r) for r in self.rules if r not in gating}, workers)
+        # Within a worker, cheapest first so partial results arrive early.
+        return first, [sorted(rule_ids, key=lambda r: (self.cost(r), self.order_hint[r])) for rule_ids in bins]
+
+
+def evaluate_scheduled(graph, rule_id, results, instance, evaluators, cost_model=None):
+    """Evaluate or skip one rule, recording its elapsed time in the cost model."""
+    backend = graph.backends[rule_id]
+    rule = graph.rules[rule_id]
+    reason = graph.skip_reason(rule_id, results, instance)
+    if reason:
+        METRICS.count('schedule', 'skipped')
+        return make_result(rule, backend, "skipped", reason=reason)
+    started = time.perf_counter()
+    result = evaluators[backend](rule, instance)
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    METRICS.count('schedule', 'evaluated')
+    if cost_model is not None and result["status"] not in UNTIMED_STATUSES:
+        cost_model.observe(rule_id, graph.handlers[rule_id], backend, result["elapsed_ms"], graph.size_class)
+    return result
+
+
+def run_schedule(rules, instance, evaluators=None, cost_model=None):
+    """Evaluate rules for one instance, skipping those whose preconditions fail.
+
+    Returns (results in evaluation order, run report).
+    """
+    evaluators = evaluators or BACKEND_EVALUATORS
+    graph = RuleGraph(rules, cost_model, tenant_size_class(instance))
+    results = {}
+    ordered = []
+    with METRICS.stage('schedule'):
+        for rule_id in graph.evaluation_order():
+            result = evaluate_scheduled(graph, rule_id, results, instance, evaluators, cost_model)
+            results[rule_id] = result
+            ordered.append(result)
+    return ordered, build_report(instance, ordered)
+
+
+def run_batch(rules, instance, workers, evaluators=None, cost_model=None):
+    """Batch evaluation: gating rules first, then cost-balanced bins on worker threads.
+
+    Returns (results in completion order, run report).
+    """
+    evaluators = evaluators or BACKEND_EVALUATORS
+    graph = RuleGraph(rules, cost_model, tenant_size_class(instance))
+    first, bins = graph.worker_plan(workers)
+    results = {}
+    ordered = []
+
+    # Every precondition is a gating rule, so workers only read finished results.
+    def run_bin(rule_ids):
+        return [evaluate_scheduled(graph, rule_id, results, instance, evaluators, cost_model) for rule_id in rule_ids]
+
+    with METRICS.stage('schedule'):
+        for rule_id in first:
+            results[rule_id] = evaluate_scheduled(graph, rule_id, results, instance, evaluators, cost_model)
+            ordered.append(results[rule_id])
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            for bin_results in pool.map(run_bin, bins):
+                ordered.extend(bin_results)
+    return ordered, build_report(instance, ordered)
+
+
+def build_report(instance, results):
+    """Per-run summary of evaluated and skipped work."""
+    status_counts = Counter(r["status"] for r in results)
+    skipped = [r for r in results if r["status"] == "skipped"]
+    expensive_total = sum(1 for r in results if r["backend"] in EXPENSIVE_BACKENDS)
+    expensive_skipped = sum(1 for r in skipped if r["backend"] in EXPENSIVE_BACKENDS)
+    total_cost = sum(BACKEND_COST[r["backend"]] for r in results)
+    skipped_cost = sum(BACKEND_COST[r["backend"]] for r in skipped)
+    return {
+        "group_id": instance.get("group_id"),
+        "rules": len(results),
+        "status_counts": dict(status_counts),
+        "skipped_by_backend": dict(Counter(r["backend"] for r in skipped)),
+        "expensive_rules": expensive_total,
+        "expensive_rules_skipped": expensive_skipped,
+        "cost_avoided_pct": round(100.0 * skipped_cost / total_cost, 1) if total_cost else 0.0,
+        "skipped": [{"rule_id": r["rule_id"], "backend": r["backend"], "reason": r["reason"]} for r in skipped],
+    }
+
+
+def print_report(report):
+    """Human-readable run report."""
+    print(f"Group: {report['group_id']}")
+    print(f"Rules scheduled: {report['rules']}")
+    for status, count in sorted(report["status_counts"].items()):
+        print(f"  {status}: {count}")
+    print(f"Expensive (Solr/analytics) rules skipped: {report['expensive_rules_skipped']} of {report['expensive_rules']}")
+    print(f"Estimated evaluation cost avoided: {report['cost_avoided_pct']}%")
+    reasons = Counter(entry["reason"] for entry in report["skipped"])
+    if reasons:
+        print("\nSkipped rules by reason:")
+        for reason, count in reasons.most_common():
+            print(f"  - {reason}: {count}")
+
+
+if __name__ == '__main__':
+    profile_from_argv()
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('instance', help="Instance fixture JSON")
+    parser.add_argument('--catalog', action='append', help="Catalog TSV (repeatable; defaults to the processed catalogs)")
+    parser.add_argument('--output', help="Write rule results as JSONL")
+    parser.add_argument('--report', help="Write the run report as JSON")
+    parser.add_argument('--cost-model', help="Order by (and record into) this observed-cost model")
+    parser.add_argument('--workers', type=int, help="Batch run: pack rules across this many workers by cost")
+    parser.add_argument('--environment-plan', action='store_true',
+                        help="Only rules that apply to the instance's environment, SKUs and integration")
+    args = parser.parse_args()
+
+    cost_model = RuleCostModel(args.cost_model) if args.cost_model else None
+    instance = load_instance(args.instance)
+    if args.environment_plan:
+        rules = PlanCache(catalog_paths=args.catalog).rules_for(instance)
+    else:
+        rules = load_catalog(args.catalog)
+    if args.workers:
+        results, report = run_batch(rules, instance, args.workers, cost_model=cost_model)
+    else:
+        results, report = run_schedule(rules, instance, cost_model=cost_model)
+    print_report(report)
+    if cost_model is not None:
+        cost_model.save()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            for result in results:
+                f.write(json.dumps(result) + '\n')
+        print(f"\nResults written to {args.output}")
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.report}", file=sys.stderr)
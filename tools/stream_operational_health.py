@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Streaming evaluator for the operational sync lag and webhook rules.
+
+Consumes sync and webhook event records as JSONL (from a file or stdin, e.g.
+piped from a local log tailer) and keeps a sliding 7-day window per group_id
+and rule. Each event updates one time bucket and expires stale buckets, so the
+cost per event is O(1) amortized no matter how long the log is. Whenever a
+rule's state changes for a group_id, a transition record is written as JSONL.
+
+Event records:
+    {"group_id": "acme.com", "ts": "2026-01-12T08:30:00Z", "event_type": "sync",
+     "entity": "position", "lag_minutes": 42}
+    {"group_id": "acme.com", "ts": 1768206600, "event_type": "webhook_sync",
+     "entity": "candidate", "success": true}
+    {"group_id": "acme.com", "ts": 1768206600, "event_type": "webhook_event",
+     "success": false}
+
+Usage:
+    tail -F sync_events.jsonl | python tools/stream_operational_health.py
+    python tools/stream_operational_health.py events.jsonl --summary
+"""
+
+import argparse
+import json
+import sys
+from collections import Counter, deque
+from datetime import datetime, timezone
+
+from profiling import profile_from_argv
+
+# Rolling-window rules, thresholds from the Integrations Rules section of the
+# technical reference (lag must stay under the threshold for the last 7 days,
+# webhook syncs need at least 90% success).
+OPERATIONAL_RULES = {
+    "position_sync_lag_rule": {
+        "event_type": "sync",
+        "entity": "position",
+        "max_lag_minutes": 60,
+    },
+    "candidate_sync_lag_rule": {
+        "event_type": "sync",
+        "entity": "candidate",
+        "max_lag_minutes": 60,
+    },
+    "employee_sync_lag_rule": {
+        "event_type": "sync",
+        "entity": "employee",
+        "max_lag_minutes": 24 * 60,
+    },
+    "candidate_webhook_sync_rule": {
+        "event_type": "webhook_sync",
+        "entity": "candidate",
+        "min_success_pct": 90,
+    },
+    "position_webhook_sync_rule": {
+        "event_type": "webhook_sync",
+        "entity": "position",
+        "min_success_pct": 90,
+    },
+    # No published threshold; mirrors the webhook sync rules.
+    "webhook_event_failure_rule": {
+        "event_type": "webhook_event",
+        "entity": None,
+        "min_success_pct": 90,
+    },
+}
+
+WINDOW_DAYS = 7
+BUCKET_MINUTES = 60
+
+# Raised by process() for events with an unusable ts or lag_minutes
+EVENT_ERRORS = (ValueError, TypeError, OverflowError)
+
+
+def parse_timestamp(value):
+    """Convert an ISO-8601 string or epoch seconds into epoch seconds (ValueError otherwise)."""
+    if isinstance(value, bool) or value is None:
+        raise ValueError(f"invalid timestamp {value!r}")
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not isinstance(value, str):
+        raise ValueError(f"invalid timestamp {value!r}")
+    text = value.strip()
+    if text.endswith('Z'):
+        text = text[:-1] + '+00:00'
+    parsed = datetime.fromisoformat(text)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def rules_for_event(event):
+    """Return the rule IDs an event contributes to."""
+    event_type = event.get("event_type")
+    entity = event.get("entity")
+    return [
+        rule_id for rule_id, rule in OPERATIONAL_RULES.items()
+        if rule["event_type"] == event_type and rule["entity"] in (None, entity)
+    ]
+
+
+def is_bad_event(rule, event):
+    """Whether an event counts against the rule (lag over threshold or a failure)."""
+    if "max_lag_minutes" in rule:
+        return float(event.get("lag_minutes") or 0) >= rule["max_lag_minutes"]
+    return not event.get("success", False)
+
+
+class SlidingWindow:
+    """Fixed-width time buckets holding (total, bad) counts for one rule and group."""
+
+    def __init__(self, window_seconds, bucket_seconds):
+        self.window_seconds = window_seconds
+        self.bucket_seconds = bucket_seconds
+        self.buckets = deque()  # [bucket_start, total, bad], oldest first
+        self.total = 0
+        self.bad = 0
+
+    def add(self, ts, bad):
+        """Record one event; events older than the window are ignored."""
+        bucket_start = ts - (ts % self.bucket_seconds)
+        if not self.buckets or bucket_start > self.buckets[-1][0]:
+            bucket = [bucket_start, 0, 0]
+            self.buckets.append(bucket)
+        elif bucket_start == self.buckets[-1][0]:
+            bucket = self.buckets[-1]
+        else:
+            # Late event: scan back from the newest bucket (bounded by the
+            # bucket count) and insert a bucket if that slot is empty.
+            if bucket_start <= self.buckets[-1][0] - self.window_seconds:
+                return
+            position = len(self.buckets)
+            while position > 0 and self.buckets[position - 1][0] > bucket_start:
+                position -= 1
+            if position > 0 and self.buckets[position - 1][0] == bucket_start:
+                bucket = self.buckets[position - 1]
+            else:
+                bucket = [bucket_start, 0, 0]
+                self.buckets.insert(position, bucket)
+        bucket[1] += 1
+        bucket[2] += 1 if bad else 0
+        self.total += 1
+        self.bad += 1 if bad else 0
+
+    def expire(self, now):
+        """Drop buckets that have slid out of the window ending at now."""
+        cutoff = now - self.window_seconds
+        while self.buckets and self.buckets[0][0] + self.bucket_seconds <= cutoff:
+            _, total, bad = self.buckets.popleft()
+            self.total -= total
+            self.bad -= bad
+
+
+def evaluate_window(rule, window):
+    """Return (state, metric_value) for a rule given its current window."""
+    if window.total == 0:
+        return "no_data", None
+    if "max_lag_minutes" in rule:
+        # Median lag is under the threshold iff fewer than half the syncs breach it.
+        breach_pct = 100.0 * window.bad / window.total
+        return ("pass" if breach_pct < 50 else "fail"), round(breach_pct, 2)
+    success_pct = 100.0 * (window.total - window.bad) / window.total
+    return ("pass" if success_pct >= rule["min_success_pct"] else "fail"), round(success_pct, 2)
+
+
+class OperationalHealthStream:
+    """Per-group sliding windows for every operational rule, emitting state transitions."""
+
+    def __init__(self, window_days=WINDOW_DAYS, bucket_minutes=BUCKET_MINUTES):
+        self.window_seconds = window_days * 86400
+        self.bucket_seconds = bucket_minutes * 60
+        self.windows = {}   # (group_id, rule_id) -> SlidingWindow
+        self.states = {}    # (group_id, rule_id) -> state
+        self.clocks = {}    # group_id -> latest event ts
+        self.group_rules = {}  # group_id -> rule IDs with a window, in first-seen order
+
+    def process(self, event):
+        """Apply one event and return the list of transitions it caused.
+
+        Raises one of EVENT_ERRORS, before changing any state, for an event
+        whose ts or lag_minutes cannot be read.
+        """
+        group_id = event.get("group_id")
+        if not group_id or "ts" not in event:
+            return []
+        ts = parse_timestamp(event["ts"])
+        touched = {rule_id: is_bad_event(OPERATIONAL_RULES[rule_id], event) for rule_id in rules_for_event(event)}
+        previous_clock = self.clocks.get(group_id)
+        now = ts if previous_clock is None else max(ts, previous_clock)
+        self.clocks[group_id] = now
+
+        group_rules = self.group_rules.setdefault(group_id, [])
+        for rule_id, bad in touched.items():
+            key = (group_id, rule_id)
+            window = self.windows.get(key)
+            if window is None:
+                window = self.windows[key] = SlidingWindow(self.window_seconds, self.bucket_seconds)
+                group_rules.append(rule_id)
+            window.add(ts, bad)
+
+        # When the group clock moves, every window of the group slides, so a
+        # breach clears even if no further event arrives for that rule.
+        advanced = previous_clock is None or now > previous_clock
+        transitions = []
+        for rule_id in (group_rules if advanced else touched):
+            key = (group_id, rule_id)
+            window = self.windows[key]
+            window.expire(now)
+            transition = self._update_state(key, OPERATIONAL_RULES[rule_id], window, now)
+            if transition:
+                transitions.append(transition)
+        return transitions
+
+    def _update_state(self, key, rule, window, now):
+        """Re-evaluate a window and return a transition record if the state changed."""
+        state, metric_value = evaluate_window(rule, window)
+        previous = self.states.get(key)
+        if state == previous:
+            return None
+        self.states[key] = state
+        group_id, rule_id = key
+        return {
+            "ts": datetime.fromtimestamp(now, tz=timezone.utc).isoformat(),
+            "group_id": group_id,
+            "rule_id": rule_id,
+            "previous_state": previous,
+            "state": state,
+            "metric_value": metric_value,
+            "sample_size": window.total,
+        }
+
+    def summary(self):
+        """Current state of every (group_id, rule_id) seen so far."""
+        return [
+            {"group_id": group_id, "rule_id": rule_id, "state": state}
+            for (group_id, rule_id), state in sorted(self.states.items())
+        ]
+
+
+def stream_events(lines, skipped=None):
+    """Yield event objects from JSONL lines, skipping blanks and malformed or non-object records.
+
+    Skipped records are counted in skipped (a Counter) when given.
+    """
+    for line_num, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            event = json.loads(line)
+        except json.JSONDecodeError:
+            event = None
+        if not isinstance(event, dict):
+            print(f"Skipping malformed record on line {line_num}", file=sys.stderr)
+            if skipped is not None:
+                skipped["malformed"] += 1
+            continue
+        yield event
+
+
+def run(input_stream, output_stream, window_days=WINDOW_DAYS, bucket_minutes=BUCKET_MINUTES, summary=False):
+    """Evaluate a stream of events, writing transitions as they happen."""
+    evaluator = OperationalHealthStream(window_days, bucket_minutes)
+    events_processed = 0
+    skipped = Counter()
+    for event in stream_events(input_stream, skipped):
+        try:
+            transitions = evaluator.process(event)
+        except EVENT_ERRORS as e:
+            print(f"Skipping event with invalid fields ({e})", file=sys.stderr)
+            skipped["invalid"] += 1
+            continue
+        for transition in transitions:
+            output_stream.write(json.dumps(transition) + '\n')
+            output_stream.flush()
+        events_processed += 1
+
+    print(f"Processed {events_processed} events, skipped {sum(skipped.values())}"
+          f" ({skipped['malformed']} malformed, {skipped['invalid']} invalid)", file=sys.stderr)
+    if summary:
+        for record in evaluator.summary():
+            output_stream.write(json.dumps(record) + '\n')
+    return evaluator
+
+
+if __name__ == '__main__':
+    profile_from_argv()
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('input', nargs='?', default='-', help="JSONL event file, or '-' for stdin")
+    parser.add_argument('--window-days', type=int, default=WINDOW_DAYS)
+    parser.add_argument('--bucket-minutes', type=int, default=BUCKET_MINUTES)
+    parser.add_argument('--summary', action='store_true', help="Print final rule states at end of input")
+    args = parser.parse_args()
+
+    if args.input == '-':
+        run(sys.stdin, sys.stdout, args.window_days, args.bucket_minutes, args.summary)
+    else:
+        with open(args.input, 'r', encoding='utf-8') as f:
+            run(f, sys.stdout, args.window_days, args.bucket_minutes, args.summary)
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Content-addressed string store for rule text, with a dictionary-compressed pack format.
+
+Catalog rows repeat a lot of text. Fallback sentences such as "**Impact:**
+Rule failure indicates data quality or configuration issues..." appear in
+136 rows, and CODE_REFERENCE_MAP paths and config references repeat across
+rules. Multi-tenant exports repeat whole catalogs per tenant. The store
+keys text by its content:
+
+- In memory, share() returns one canonical str per distinct text.
+  rule_catalog.load_catalog passes descriptions, code and config
+  references through a store scoped to the call, so equal text is held
+  once however many rows carry it.
+- On disk, pack() splits every TSV cell into segments: sentences, and runs
+  ending in <br>. It stores each distinct segment once in a dictionary
+  table, and writes cells as lists of segment indices. Near-identical
+  descriptions that share sentences therefore share storage, and the
+  result is gzip-compressed. Packs are lossless. unpack() restores every
+  file byte for byte and checks its SHA-256.
+
+Pack layout (gzip-compressed JSON):
+
+    {"format": "rule-strings/1",
+     "segments": ["SKU", "Talent Acquisition", ...],
+     "files": [{"name": "new_rules_136_input.tsv", "sha256": "...",
+                "lines": [[0, 1, [7, 8, 9], ...], ...]}]}
+
+A cell is an int (one segment) or a list of segment indices.
+
+Usage:
+    python tools/string_store.py pack documentation/*.tsv --output catalogs.rsp.gz
+    python tools/string_store.py unpack catalogs.rsp.gz --output-dir restored/
+    python tools/string_store.py stats documentation/*.tsv
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+from collections import Counter
+
+from profiling import profile_from_argv
+
+PACK_FORMAT = "rule-strings/1"
+
+# Zero-width boundaries, so segments concatenate back to the exact cell:
+# after sentence punctuation followed by whitespace, and after a run of <br>.
+SEGMENT_BOUNDARY = re.compile(r'(?<=[.!?])(?=\s)|(?<=<br>)(?!<br>)')
+
+# RuleRecord fields whose text is shared through the store when loading catalogs
+SHARED_FIELDS = ("description", "cursor_description", "code_reference", "config_reference",
+                 "updates", "updated_description")
+
+
+def segments(text):
+    """Sentence-level pieces of a cell; ''.join(segments(text)) == text."""
+    return [piece for piece in SEGMENT_BOUNDARY.split(text) if piece] or [text]
+
+
+class StringStore:
+    """Distinct strings keyed by content, each with a stable table index."""
+
+    def __init__(self):
+        self.strings = []
+        self.index = {}
+        self.requests = 0
+        self.requested_chars = 0
+
+    def add(self, text):
+        """Table index of a string, adding it if new."""
+        self.requests += 1
+        self.requested_chars += len(text)
+        position = self.index.get(text)
+        if position is None:
+            position = self.index[text] = len(self.strings)
+            self.strings.append(text)
+        return position
+
+    def share(self, text):
+        """Canonical copy of a string; equal texts come back as the same object."""
+        return self.strings[self.add(text)]
+
+    def share_fields(self, record, fields=SHARED_FIELDS):
+        """Replace a record's text fields with their shared copies; returns the record."""
+        for field in fields:
+            value = record.get(field)
+            if value:
+                record[field] = self.share(value)
+        return record
+
+    def encode(self, text):
+        """Cell as a segment index, or a list of them."""
+        ids = [self.add(piece) for piece in segments(text)]
+        return ids[0] if len(ids) == 1 else ids
+
+    def decode(self, cell):
+        return self.strings[cell] if isinstance(cell, int) else ''.join(self.strings[i] for i in cell)
+
+    def stats(self):
+        stored = sum(len(s) for s in self.strings)
+        return {
+            "strings": len(self.strings),
+            "requests": self.requests,
+            "requested_chars": self.requested_chars,
+            "stored_chars": stored,
+            "dedup_ratio": round(self.requested_chars / stored, 2) if stored else None,
+        }
+
+
+def read_text(path):
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        return f.read()
+
+
+def pack(paths, output):
+    """Write a pack of TSV files; returns (raw bytes, packed bytes, StringStore)."""
+    store = StringStore()
+    files = []
+    raw_bytes = 0
+    # Names relative to the files' common directory, so per-tenant exports
+    # with the same file name stay apart.
+    base = os.path.commonpath([os.path.dirname(os.path.abspath(p)) for p in paths])
+    for path in paths:
+        data = read_text(path)
+        encoded = data.encode('utf-8')
+        raw_bytes += len(encoded)
+        files.append({
+            "name": os.path.relpath(os.path.abspath(path), base),
+            "sha256": hashlib.sha256(encoded).hexdigest(),
+            "lines": [[store.encode(cell) for cell in line.split('\t')] for line in data.split('\n')],
+        })
+    document = {"format": PACK_FORMAT, "segments": store.strings, "files": files}
+    payload = json.dumps(document, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    tmp_path = output + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(gzip.compress(payload, compresslevel=9, mtime=0))
+    os.replace(tmp_path, output)
+    return raw_bytes, os.path.getsize(output), store
+
+
+def unpack(path):
+    """{file name: text} from a pack, verifying each file's SHA-256."""
+    with open(path, 'rb') as f:
+        document = json.loads(gzip.decompress(f.read()))
+    if document.get("format") != PACK_FORMAT:
+        raise ValueError(f"{path} is not a {PACK_FORMAT} pack")
+    store = StringStore()
+    store.strings = document["segments"]
+    restored = {}
+    for entry in document["files"]:
+        text = '\n'.join('\t'.join(store.decode(cell) for cell in line) for line in entry["lines"])
+        if hashlib.sha256(text.encode('utf-8')).hexdigest() != entry["sha256"]:
+            raise ValueError(f"{entry['name']}: checksum mismatch after unpacking")
+        restored[entry["name"]] = text
+    return restored
+
+
+if __name__ == '__main__':
+    profile_from_argv()
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    pack_cmd = commands.add_parser('pack', help="Pack TSV files into one dictionary-compressed file")
+    pack_cmd.add_argument('paths', nargs='+')
+    pack_cmd.add_argument('--output', required=True)
+
+    unpack_cmd = commands.add_parser('unpack', help="Restore the TSV files of a pack")
+    unpack_cmd.add_argument('pack')
+    unpack_cmd.add_argument('--output-dir', required=True)
+
+    stats_cmd = commands.add_parser('stats', help="Duplication in TSV files and the most repeated segments")
+    stats_cmd.add_argument('paths', nargs='+')
+    stats_cmd.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    if args.command == 'pack':
+        raw_bytes, packed_bytes, store = pack(args.paths, args.output)
+        gzipped = len(gzip.compress(b''.join(read_text(p).encode('utf-8') for p in args.paths), 9, mtime=0))
+        print(f"{len(args.paths)} files, {raw_bytes:,} bytes -> {packed_bytes:,} bytes "
+              f"({100.0 * packed_bytes / raw_bytes:.1f}%; gzip alone: {gzipped:,})")
+        print(f"{store.stats()['strings']:,} distinct segments for {store.requests:,} cells and pieces",
+              file=sys.stderr)
+    elif args.command == 'unpack':
+        os.makedirs(args.output_dir, exist_ok=True)
+        for name, text in unpack(args.pack).items():
+            path = os.path.join(args.output_dir, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w', encoding='utf-8', newline='') as f:
+                f.write(text)
+            print(f"Restored {name}")
+    elif args.command == 'stats':
+        store = StringStore()
+        uses = Counter()
+        for path in args.paths:
+            for line in read_text(path).split('\n'):
+                for cell in line.split('\t'):
+                    for piece in segments(cell):
+                        store.add(piece)
+                        uses[piece] += 1
+        stats = store.stats()
+        print(f"{stats['requests']:,} segments, {stats['strings']:,} distinct; "
+              f"{stats['requested_chars']:,} chars -> {stats['stored_chars']:,} stored ({stats['dedup_ratio']}x)")
+        print("\nMost repeated text (by characters saved):")
+        ranked = sorted(uses.items(), key=lambda item: -(item[1] - 1) * len(item[0]))
+        for text, count in ranked[:args.top]:
+            print(f"  {count:>5}x  {(count - 1) * len(text):>8,} chars  {text.strip()[:80]}")
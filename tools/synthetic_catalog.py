@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Generate synthetic rule catalog TSVs of any size for benchmarking.
+
+Rows follow the instance_health_rules_input.tsv layout (title row, then the
+SKU | Product Area | Rule Name | Rule ID | ... header), or the processed
+layout with a Cursor Generated Description column (--layout processed).
+Descriptions are assembled from sentences of the real input catalog, and
+their lengths follow its distribution. They use the same markup mix as the
+real data: <br><br><h5>Impact of Failure</h5> sections, [Purpose]/[Impact]
+tags, "If not configured, ..." phrasing and some empty cells. About 5% of
+rows reuse real rule IDs, so lookups in the enhancement and refinement maps
+still hit. Output is streamed, so 1M-row files need no more memory than 1k.
+
+Usage:
+    python tools/synthetic_catalog.py --rows 100000 --output /tmp/rules_100k.tsv
+    python tools/synthetic_catalog.py --rows 1000 --layout processed --seed 7 --output /tmp/catalog_1k.tsv
+"""
+
+import argparse
+import csv
+import os
+import random
+import re
+import sys
+
+from profiling import profile_from_argv
+from rule_catalog import DOCUMENTATION_DIR, load_catalog
+
+SOURCE_INPUT = os.path.join(DOCUMENTATION_DIR, 'instance_health_rules_input.tsv')
+
+INPUT_HEADER = [
+    "SKU", "Product Area", "Rule Name", "Rule ID", "Config Reference", "Description",
+    "Current Feature ID", "Current Feature Name", "Action to be taken", "Feature Alignment",
+    "Updated Description (If needed)", "Updates to rule logic (If needed)", "Notes", "Required changes", "Progress",
+]
+PROCESSED_HEADER = [
+    "SKU", "Product Area", "Rule Name", "Rule ID", "Config Reference", "Original Description",
+    "Cursor Generated Description", "Code Reference", "Current Feature ID", "Current Feature Name",
+    "Action", "New Feature Alignment", "Updates to rule logic",
+]
+
+SKUS = [
+    ("Talent Managment Core", "Talent Management - Core"),
+    ("Talent Managment Leader Experience Add-on", "Talent Management -Leader Experience"),
+    ("Talent Acquisition", "Talent Acquisition - Core"),
+    ("Talent Acquisition", "Talent Acquisition - PCS"),
+    ("Talent Intelligence Platform", "Integrations"),
+    ("", "Security"),
+    ("", "Analytics"),
+    ("", "AI"),
+]
+CONFIG_DOCS = ["ats_config", "career_hub_base_config", "pcsx_base_config", "ijp_config", "email_config",
+               "scheduling_config", "campaign_config", "integration_systems"]
+ACTIONS = ["Update", "Keep", "Remove", "New"]
+REUSE_RATE = 0.05
+
+FALLBACK_SENTENCES = [
+    "Checks whether the configuration is enabled for the instance",
+    "Validates that at least 95% of employee profiles have the field populated",
+    "Without this configuration, recruiters cannot complete the workflow",
+    "Missing values reduce the accuracy of recommendations and analytics",
+]
+
+
+class DescriptionModel:
+    """Sentence pool and length distribution drawn from the real input catalog."""
+
+    def __init__(self, path=SOURCE_INPUT):
+        self.sentences = []
+        self.lengths = []
+        if os.path.exists(path):
+            with open(path, 'r', newline='', encoding='utf-8') as f:
+                for cols in csv.reader(f, delimiter='\t'):
+                    if len(cols) > 5 and cols[3] and cols[3] != 'Rule ID':
+                        text = re.sub(r'<[^>]+>', ' ', cols[5])
+                        self.lengths.append(len(cols[5]))
+                        self.sentences.extend(s.strip() for s in re.split(r'(?<=\.)\s+', text) if len(s.strip()) > 20)
+        self.sentences = self.sentences or FALLBACK_SENTENCES
+        self.lengths = self.lengths or [160]
+
+    def text(self, rng, target):
+        """Sentences joined up to roughly target characters."""
+        parts, size = [], 0
+        while size < target:
+            sentence = rng.choice(self.sentences)
+            parts.append(sentence)
+            size += len(sentence) + 1
+        return ' '.join(parts)
+
+    def description(self, rng):
+        """One description in a randomly chosen source format."""
+        target = max(40, int(rng.choice(self.lengths) * rng.uniform(0.7, 1.5)))
+        purpose = self.text(rng, target * 0.6)
+        impact = self.text(rng, target * 0.4)
+        style = rng.random()
+        if style < 0.5:
+            return f"{purpose}<br><br><h5>Impact of Failure</h5>{impact}"
+        if style < 0.65:
+            return f"[Purpose] {purpose} [Impact] {impact}"
+        if style < 0.85:
+            return f"{purpose} If not configured, {impact[0].lower()}{impact[1:]}"
+        if style < 0.95:
+            return purpose
+        return ""
+
+
+def synthetic_rows(count, seed=0, layout='input', model=None):
+    """Yield count synthetic rows as column lists for the chosen layout."""
+    rng = random.Random(seed)
+    model = model or DescriptionModel()
+    real_ids = sorted({r["rule_id"] for r in load_catalog()})
+    for i in range(count):
+        sku, area = rng.choice(SKUS)
+        if real_ids and rng.random() < REUSE_RATE:
+            rule_id = rng.choice(real_ids)
+        else:
+            rule_id = f"{area.split()[0].lower()}_{rng.choice(CONFIG_DOCS).split('_')[0]}_rule_{i}"
+        rule_name = rule_id.replace('_', ' ').title()
+        config_doc = rng.choice(CONFIG_DOCS)
+        config_ref = f"{config_doc} → {rng.choice(['enabled', 'settings.enabled', 'product_configs.employee.tabs'])}"
+        description = model.description(rng)
+        feature_id = f"feature_{rng.randrange(40)}"
+        feature_name = feature_id.replace('_', ' ').title()
+        action = rng.choice(ACTIONS)
+        if layout == 'processed':
+            cursor = f"**Purpose:** {model.text(rng, 120)}<br><br>**Impact:** {model.text(rng, 80)}"
+            yield [sku, area, rule_name, rule_id, config_ref, description, cursor,
+                   "www/data_audit/platform_health/", feature_id, feature_name, action, "", ""]
+        else:
+            yield [sku, area, rule_name, rule_id, config_ref, description, feature_id, feature_name,
+                   action, "", "NA", "NA", "", "", ""]
+
+
+def write_catalog(path, count, seed=0, layout='input'):
+    """Stream a synthetic catalog to path; returns bytes written."""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, delimiter='\t', quoting=csv.QUOTE_MINIMAL)
+        if layout == 'input':
+            writer.writerow(['', 'Instance Health Rules'] + [''] * 5 + ['UPDATES'] + [''] * 7)
+            writer.writerow(INPUT_HEADER)
+        else:
+            writer.writerow(PROCESSED_HEADER)
+        writer.writerows(synthetic_rows(count, seed, layout))
+    return os.path.getsize(path)
+
+
+if __name__ == '__main__':
+    profile_from_argv()
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--rows', type=int, default=1000, help="Number of rule rows")
+    parser.add_argument('--layout', choices=['input', 'processed'], default='input')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', required=True, help="TSV path to write")
+    args = parser.parse_args()
+
+    size = write_catalog(args.output, args.rows, args.seed, args.layout)
+    print(f"Wrote {args.rows:,} {args.layout} rows ({size / 1e6:.1f} MB) to {args.output}", file=sys.stderr)